@@ -12,27 +12,46 @@ __version__ = "0.0.1"
 __maintainer__ = "akapkotel"
 __email__ = "btcuserbtc@gmail.com"
 
+import time
+# measured first, to report how long imports took with --profile-startup:
+IMPORTS_STARTED = time.perf_counter()
+
 import os
-import random
+import sys
+import json
+import atexit
+import argparse
 from functools import partial
+from contextlib import ExitStack
 
 from tkinter import *
 from tkinter import ttk
 from tkinter import messagebox as mb
 from tkinter import filedialog as fd
 
-from config_loader.config_loader import load_config_from_file
 from config_files.constants.constants import *
-from translator.translator import setup_translator, translate
+from generator.generator import *
+from generator import instrumentation
+from generator.export import (
+    export, format_jsonl, FORMATS, JSONL, STDOUT, BATCH_SIZE
+)
+from generator.prefetch import CharacterPrefetcher
+from generator.reloader import ConfigReloader, POLL_INTERVAL
+from generator.server import run_server, HOST, PORT
+from generator.library import CharacterLibrary, LIBRARY_PATH, PAGE_SIZE
+from generator.sheets import (
+    parse_sheet, write_sheet, unique_sheet_path, SheetError, IMPORT_WORKERS
+)
+from portrait_cache.portrait_cache import (
+    PortraitCache, generate_thumbnails, report_thumbnails_error,
+    IMAGE_EXTENSIONS, PILLOW_AVAILABLE
+)
+from translator.translator import (
+    setup_translator, translate, available_languages
+)
 
 # constants:
 WINDOW_SIZE = "920x920"
-# categories:
-ETHNICITIES = (WHITE, BLACK, JAPANESE, CHINESE, LATINO)
-SEXES = (MALE, FEMALE)
-AGES = (YOUNG, ADULT, OLD)
-WEIGHTS = (THIN, NORMAL, FAT)
-HEIGHTS = (SHORT, AVERAGE, TALL)
 types_ = {  # associations important for buttons-creation:
     ETHNICITIES: ETHNICITY,
     AGES: AGE,
@@ -44,13 +63,8 @@ types_ = {  # associations important for buttons-creation:
     }
 # values assigned to categories:
 assigned = {AGES: "years", WEIGHTS: "kilograms", HEIGHTS: "centimeters"}
-# statistical distributions:
-POPULATION_HEIGHT = (SHORT,)*2 + (AVERAGE,)*4 + (TALL,)
-POPULATION_WEIGHT = (THIN,)*4 + (NORMAL,)*3 + (FAT,)
 # paths to the directories and files:
-PATH = os.path.dirname(os.path.abspath(__file__))
 ICON_PATH = PATH + "/icon.gif"
-CONFIGS_PATH = PATH + "/config_files/"
 PORTRAITS_PATH = PATH + "/portraits/"
 CHARACTERS_PATH = PATH + "/characters/"
 LANGUAGES_PATH = PATH + "/languages/"
@@ -69,6 +83,34 @@ def pack(widget: Widget, side=None, fill=None, expand=None):
     return widget
 
 
+class StartupProfile:
+    """Times of the consecutive stages of the application start."""
+
+    def __init__(self, started: float):
+        """
+        :param started: float -- time.perf_counter() of the start
+        """
+        self.started = self.last = started
+        self.stages = []
+
+    def mark(self, stage: str):
+        """Record that the stage ended now."""
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def report(self, file=sys.stderr):
+        """Print time of each stage and total time, in milliseconds."""
+        for stage, seconds in self.stages:
+            print(f"{stage:<20}{seconds * 1000:9.1f} ms", file=file)
+        print(f"{'total':<20}{(self.last - self.started) * 1000:9.1f} ms",
+              file=file)
+
+
+STARTUP = StartupProfile(IMPORTS_STARTED)
+STARTUP.mark("import")
+
+
 class MainApplication:
     """Tkinter application."""
 
@@ -78,11 +120,9 @@ class MainApplication:
 
         :param master: Tk instance
         """
-        # two dicts will keep names and surnames for all sexes and races:
-        self.names = self.load_names()
-        self.surnames = self.load_surnames()
-        self.pistols_list = self.load_list_from_file(PISTOLS)
-        self.rifles_list = self.load_list_from_file(RIFLES)
+        # headless generator keeps names, surnames, professions and weapons:
+        self.generator = CharacterGenerator()
+        STARTUP.mark("config load")
         self.portrait = None
         self.short_desc = StringVar()  # character info
         self.description = StringVar()
@@ -94,18 +134,26 @@ class MainApplication:
         self.age, self.years = StringVar(), IntVar()
         self.height, self.centimeters = StringVar(), IntVar()
         self.weight, self.kilograms = StringVar(), IntVar()
-        self.professions = self.load_list_from_file(PROFFESIONS)
         self.profession = StringVar()
         self.profession.set(translate(CHOOSE_PROFESSION))
         # for current character's inventory and weapons:
         self.clothes = StringVar()
         self.pockets = StringVar()
         self.weapons = StringVar()
+        # sheet of the displayed character, None until it is saved or loaded:
+        self.sheet = None
         # hints displayed at the bottom of the window:
         self.hint = StringVar()
 
         self.randomize = {t: BooleanVar() for t in types_.values()}
         for bool_ in self.randomize.values(): bool_.set(True)
+        # characters are drawn in background, for current locks:
+        self.prefetcher = CharacterPrefetcher(self.generator)
+        self.prefetch_update = None  # id of the scheduled update_prefetch
+        # changed config and language files are reloaded while running:
+        self.reloader = ConfigReloader(self.generator,
+                                       languages_path=LANGUAGES_PATH)
+        self.reloader.add_listener(self.replace_generator)
 
         # GUI:
         self.main_frame = master
@@ -197,34 +245,16 @@ class MainApplication:
             rb.variable = self.randomize[types_[category]]
             rb.pack(side=LEFT, fill=BOTH, expand=YES)
 
-        # profession-choice window top-level:
-        self.profession_window = Toplevel()
-        self.profession_window.title(translate(PROF_CHOICE_TITLE))
-
-        self.scrollbar = pack(Scrollbar(self.profession_window,
-                                        orient=VERTICAL), side=RIGHT, fill=Y)
-        self.professions_list = pack(Listbox(self.profession_window,
-                                             yscrollcommand=self.scrollbar.set,
-                                             height=30,
-                                             width=35))
-        self.scrollbar.config(command=self.professions_list.yview)
-        for profession in self.professions:
-            self.professions_list.insert(END, profession.title())
-        self.professions_list.bind("<Button-1>", self.change_profession)
-
-        self.profession_window.protocol('WM_DELETE_WINDOW',
-                                       partial(self.close_window,
-                                               self.profession_window))
-        self.profession_window.withdraw()
+        # profession-choice window is built when it is opened first time:
+        self.profession_window = None
+        self.professions_list = None
 
         self.profession_btn = Button(self.profession_frame,
                                      text=self.profession.get(),
                                      bg=BUTTON_COLOR_OFF,
                                      height=2,
                                      width=len(self.profession.get())+2,
-                                     command=partial(
-                                                self.open_window,
-                                                self.profession_window))
+                                     command=self.open_profession_window)
         self.profession_btn.pack(side=LEFT, fill=BOTH, expand=YES)
         # checkbutton:
         self.profession_boolean = Checkbutton(self.profession_frame,
@@ -290,7 +320,9 @@ class MainApplication:
         [b.pack(side=LEFT) for b in (self.r_n_btn, self.r_s_btn, self.r_b_btn)]
 
         # Portrait section:
-        self.portrait = self.load_image_from_file(BASIC_PORTRAIT)
+        # portraits are read in background and displayed when ready:
+        self.portraits = PortraitCache(self.main_frame)
+        self.portrait = None
         self.portrait_frame = pack(LabelFrame(self.result_frame,
                                               text=translate(PORTRAIT)),
                                    side=LEFT, expand=YES, fill=BOTH)
@@ -299,9 +331,11 @@ class MainApplication:
                                       width=150,
                                       height=150,
                                       borderwidth=1,
-                                      relief=SUNKEN,
-                                      image=self.portrait))
+                                      relief=SUNKEN))
         self.photo_label.bind("<Button-1>", self.open_image)
+        self.portraits.load(PORTRAITS_PATH + BASIC_PORTRAIT,
+                            self.show_portrait)
+        self.prefetch_portraits()
 
         # descriptions section:
         self.short_desc_frame = pack(LabelFrame(self.result_frame,
@@ -320,48 +354,14 @@ class MainApplication:
                                             bg=BUTTON_COLOR_OFF,
                                             command=self.show_full_description)
                                      , side=LEFT, fill=BOTH, expand=YES)
-        # description-editing top-level:
-        self.desc_edit_window = Toplevel()
-        self.desc_edit_window.title(translate(EDIT))
-        self.edit_entry = pack(Text(self.desc_edit_window,
-                                    height=7,
-                                    width=60,
-                                    wrap=WORD,
-                                    background=LABEL_COLOR), side=TOP)
-        self.desc_edit_window.protocol('WM_DELETE_WINDOW',
-                                       partial(self.close_window,
-                                               self.desc_edit_window,
-                                               self.edit_entry))
-        self.desc_edit_window.withdraw()
-        #   button to accept changes:
-        self.save_edit_button = pack(Button(self.desc_edit_window,
-                                            text=translate(SAVE),
-                                            height=1,
-                                            bg=GREEN_COLOR,
-                                            command=partial(
-                                                self.save_changes,
-                                                self.edit_entry,
-                                                self.short_desc)),
-                                     side=RIGHT)
-        #   button to cancel edits:
-        self.edit_cancel_button = pack(Button(self.desc_edit_window,
-                                              text=translate(CANCEL),
-                                              height=1,
-                                              bg=RED_COLOR,
-                                              command=partial(
-                                                  self.close_window,
-                                                  self.desc_edit_window,
-                                                  self.edit_entry)),
-                                       side=RIGHT)
+        # description-editing window is built when it is opened first time:
+        self.desc_edit_window = None
+        self.edit_entry = None
         #   button to show above window:
-        self.edit_desc_button = pack(Button(self.short_desc_frame,
-                                            text=translate(EDIT),
-                                            height=1,
-                                            bg=BUTTON_COLOR_OFF,
-                                            command=partial(
-                                                self.open_window,
-                                                self.desc_edit_window)),
-                                     side=LEFT, fill=BOTH, expand=YES)
+        self.edit_desc_button = pack(
+            Button(self.short_desc_frame, text=translate(EDIT), height=1,
+                   bg=BUTTON_COLOR_OFF, command=self.open_desc_edit_window),
+            side=LEFT, fill=BOTH, expand=YES)
 
         # clothes section:
         self.clothes_frame = pack(LabelFrame(self.main_frame,
@@ -401,42 +401,30 @@ class MainApplication:
         self.weapons_label.bind("<Enter>", self.show_weapons)
         self.weapons_label.bind("<Leave>", self.hide_weapons)
 
-        self.randomize_everything()
-
-    @staticmethod
-    def load_surnames():
+        # queued characters are dropped when locks or locked values change:
+        for variable in tuple(self.randomize.values()) + tuple(
+                self.__dict__[field] for fields in LOCKED_FIELDS.values()
+                for field in fields):
+            variable.trace_add("write", self.schedule_prefetch_update)
+        self.main_frame.after(int(POLL_INTERVAL * 1000),
+                              self.reload_changed_files)
+
+    def reload_changed_files(self):
+        """Reload changed config and language files, checking periodically."""
+        self.reloader.poll()
+        self.main_frame.after(int(POLL_INTERVAL * 1000),
+                              self.reload_changed_files)
+
+    def replace_generator(self, generator: CharacterGenerator):
         """
-        Unpack surnames from txt file and put them into the internal dict for
-        future use.
+        Use generator reloaded after its config files changed.
 
-        :return: dict
+        :param generator: CharacterGenerator
         """
-        dict_ = {}
-        file_name = "surnames.txt"
-        unpacked = load_config_from_file(CONFIGS_PATH, file_name)
-
-        for i in range(len(ETHNICITIES)):
-            dict_[ETHNICITIES[i]] = unpacked[0][ETHNICITIES[i]]
-
-        return dict_
-
-    @staticmethod
-    def load_names():
-        """
-        Unpack names from txt file and put them into the internal dict for
-        future use.
-
-        :return: dict
-        """
-        dict_ = {}
-
-        file_name = "names.txt"
-        unpacked = load_config_from_file(CONFIGS_PATH, file_name)
-
-        for i in range(len(ETHNICITIES)):
-            dict_[ETHNICITIES[i]] = unpacked[i]
-
-        return dict_
+        self.generator = generator
+        self.prefetcher.set_generator(generator)
+        if self.professions_list is not None:
+            self.filter_professions()
 
     @staticmethod
     def display_hint(field: StringVar, hint: str = "", event=Event):
@@ -458,49 +446,77 @@ class MainApplication:
     def new_name(self, *names):
         for name in names:
             if name == 1:
-                self.name.set(self.name_generator())
+                self.name.set(self.generator.name_generator(
+                    self.ethnicity.get(), self.sex.get()))
             elif name == 2:
-                self.surname.set(self.surname_generator())
+                self.surname.set(self.generator.surname_generator(
+                    self.ethnicity.get()))
         self.name_and_surname.set(self.name.get() + " " + self.surname.get())
 
-    def name_generator(self):
-        """Generate random name of required sex and ethnicity."""
-        return random.choice(self.names[self.ethnicity.get()][self.sex.get()])
+    def randomize_everything(self):
+        """
+        Draw new character with the generator and display it. Categories with
+        unchecked "randomize" checkboxes keep their current values.
+        """
+        with instrumentation.measured("randomize"):
+            character = self.prefetcher.take(self.locks(),
+                                             self.get_character())
+            with instrumentation.measured("tk_set"):
+                self.set_character(character)
 
-    def surname_generator(self):
-        """Generate random surname of required ethnicity."""
-        return random.choice(self.surnames[self.ethnicity.get()])
+    def locks(self):
+        """Return categories with unchecked "randomize" checkboxes."""
+        return [t for t, bool_ in self.randomize.items() if not bool_.get()]
 
-    def randomize_everything(self):
-        """"""
-        if self.randomize[ETHNICITY].get():
-            self.ethnicity.set(random.choice(ETHNICITIES))
-        if self.randomize[SEX].get():
-            self.sex.set(random.choice(SEXES))
-        if self.randomize[AGE].get():
-            self.age.set(random.choice(AGES))
-            self.new_age_value()
-        if self.randomize[HEIGHT].get():
-            self.height.set(random.choice(POPULATION_HEIGHT))
-            self.new_height_value()
-        if self.randomize[WEIGHT].get():
-            self.weight.set(random.choice(POPULATION_WEIGHT))
-            self.new_weight_value()
-        if self.randomize[PROFESSION].get():
-            self.get_random_profession()
-        if self.randomize[ARMED].get():
-            self.weapons.set(self.get_random_weapon(PROFESSION))
-        self.new_name(1, 2)
+    def schedule_prefetch_update(self, *trace):
+        """
+        Update prefetcher once, when Tk is idle, instead of for each of the
+        variables set together, e.g. by set_character().
+        """
+        if self.prefetch_update is None:
+            self.prefetch_update = self.main_frame.after_idle(
+                self.update_prefetch)
+
+    def update_prefetch(self):
+        """Make prefetcher draw characters for current locks and values."""
+        self.prefetch_update = None
+        try:
+            self.prefetcher.set_locks(self.locks(), self.get_character())
+        except TclError:
+            pass  # IntVar edited by user is not a number yet
+
+    def get_character(self):
+        """
+        Read current character from the Tk variables.
+
+        :return: Character
+        """
+        return Character(**{f: self.__dict__[f].get() for f in
+                            CHARACTER_FIELDS})
+
+    def set_character(self, character: Character):
+        """
+        Display character record by setting it in the Tk variables.
+
+        :param character: Character
+        """
+        self.sheet = None  # new character is not saved yet
+        for field in CHARACTER_FIELDS:
+            self.__dict__[field].set(getattr(character, field))
+        self.name_and_surname.set(character.name + " " + character.surname)
+        if character.profession:
+            self.profession_btn.config(text=character.profession.title())
 
     def new_age_value(self, event=None):
-        self.years.set(self.random_gaussian(self.age.get()))
+        self.years.set(random_gaussian(self.age.get()))
 
     def new_height_value(self, event=None):
-        self.centimeters.set(self.random_gaussian(self.height.get()))
+        self.centimeters.set(self.generator.random_centimeters(
+            self.height.get(), self.sex.get(), self.ethnicity.get()))
 
     def new_weight_value(self, event=None):
         cm = self.centimeters.get()
-        self.kilograms.set(self.random_gaussian(self.weight.get(), cm))
+        self.kilograms.set(random_gaussian(self.weight.get(), cm))
 
     def show_pockets(self, event):
         self.pockets_label.configure(text=self.pockets.get(),
@@ -518,46 +534,23 @@ class MainApplication:
         self.weapons_label.configure(text=translate(TAKE_LOOK)+"...",
                                      background=GRAY_COLOR)
 
-    def get_random_profession(self):
-        profession_index = random.choice(range(len(self.professions)))
-        self.profession.set(self.professions[profession_index])
-        self.profession_btn.config(text=self.profession.get().title())
-        self.professions_list.current = profession_index
-
-    def get_random_weapon(self, profession: str):
-        """
+    def filter_professions(self, *args):
+        """Show only professions matching text typed in the entry."""
+        self.shown_professions.set(tuple(
+            profession.title() for profession in
+            self.generator.find_professions(self.profession_query.get())))
 
-        :param profession: str --
-        :return: str
-        """
-        weapons = ""
-        weapons += random.choice(self.pistols_list) + "\n\n"
-        weapons += random.choice(self.rifles_list)
-        return weapons
+    def choose_first_profession(self, event):
+        """Choose first of the shown professions."""
+        if self.professions_list.size():
+            self.professions_list.activate(0)
+            self.change_profession(event)
 
     def change_profession(self, event):
         profession = self.professions_list.get(ACTIVE)
         self.profession.set(profession)
         self.profession_btn.configure(text=profession)
 
-    @staticmethod
-    def random_gaussian(parameter: str, cm: int = 0):
-        """
-        Calculate random value for required trait range from categories such
-        us: WEIGHT, HEIGHT and AGE using gaussian distribution.
-
-        :param parameter: str -- name of the trait to be calculated, could be:
-        YOUNG, ADULT, OLD, or: SHORT, AVERAGE, TALL, or: THIN, NORMAL, FAT.
-        :param cm: int -- height of character in centimetres (required only to
-         correctly calculate weight)
-        :return: int -- random value calculated with gaussian distribution
-        """
-        params = {YOUNG: (20, 4), ADULT: (35, 5), OLD: (55, 5),
-                  SHORT: (150, 10), AVERAGE: (175, 10), TALL: (190, 10),
-                  THIN: (cm-110, 5), NORMAL: (cm-95, 5), FAT: (cm-80, 5)}
-        mean, deviation = params[parameter][0], params[parameter][1]
-        return int(random.gauss(mean, deviation))
-
     @staticmethod
     def convert_units(value: int, target: str):
         """
@@ -579,6 +572,81 @@ class MainApplication:
         window.grab_set()
         window.focus_set()
 
+    def open_profession_window(self):
+        """Open profession-choice window, building it on first use."""
+        if self.profession_window is None:
+            self.build_profession_window()
+        self.open_window(self.profession_window)
+        self.profession_entry.focus_set()
+
+    def build_profession_window(self):
+        """
+        Create profession-choice window with the list of all professions.
+        """
+        self.profession_window = Toplevel()
+        self.profession_window.title(translate(PROF_CHOICE_TITLE))
+
+        # typing in the entry filters the list:
+        self.profession_query = StringVar()
+        self.profession_entry = pack(Entry(self.profession_window,
+                                           textvariable=self.profession_query,
+                                           width=35), side=TOP, fill=X)
+        self.profession_query.trace_add("write", self.filter_professions)
+        self.profession_entry.bind("<Return>", self.choose_first_profession)
+        self.shown_professions = Variable()
+        self.scrollbar = pack(Scrollbar(self.profession_window,
+                                        orient=VERTICAL), side=RIGHT, fill=Y)
+        self.professions_list = pack(Listbox(
+            self.profession_window, listvariable=self.shown_professions,
+            yscrollcommand=self.scrollbar.set, height=30, width=35))
+        self.scrollbar.config(command=self.professions_list.yview)
+        self.filter_professions()
+        self.professions_list.bind("<Button-1>", self.change_profession)
+
+        self.profession_window.protocol('WM_DELETE_WINDOW',
+                                       partial(self.close_window,
+                                               self.profession_window))
+
+    def open_desc_edit_window(self):
+        """Open description-editing window, building it on first use."""
+        if self.desc_edit_window is None:
+            self.build_desc_edit_window()
+        self.open_window(self.desc_edit_window)
+
+    def build_desc_edit_window(self):
+        """Create description-editing window with its buttons."""
+        self.desc_edit_window = Toplevel()
+        self.desc_edit_window.title(translate(EDIT))
+        self.edit_entry = pack(Text(self.desc_edit_window,
+                                    height=7,
+                                    width=60,
+                                    wrap=WORD,
+                                    background=LABEL_COLOR), side=TOP)
+        self.desc_edit_window.protocol('WM_DELETE_WINDOW',
+                                       partial(self.close_window,
+                                               self.desc_edit_window,
+                                               self.edit_entry))
+        #   button to accept changes:
+        self.save_edit_button = pack(Button(self.desc_edit_window,
+                                            text=translate(SAVE),
+                                            height=1,
+                                            bg=GREEN_COLOR,
+                                            command=partial(
+                                                self.save_changes,
+                                                self.edit_entry,
+                                                self.short_desc)),
+                                     side=RIGHT)
+        #   button to cancel edits:
+        self.edit_cancel_button = pack(Button(self.desc_edit_window,
+                                              text=translate(CANCEL),
+                                              height=1,
+                                              bg=RED_COLOR,
+                                              command=partial(
+                                                  self.close_window,
+                                                  self.desc_edit_window,
+                                                  self.edit_entry)),
+                                       side=RIGHT)
+
     @staticmethod
     def save_changes(text: Text, attribute: StringVar or IntVar):
         """TODO"""
@@ -602,102 +670,91 @@ class MainApplication:
 
     def open_image(self, event):
         """
-        TODO: image choice by user [x], setting chosen image as
-         self.portrait [x], updating self.photo_label [x]
+        Let user choose the portrait and display it, when it is loaded in
+        background.
         """
         img = fd.askopenfile(initialdir=PORTRAITS_PATH,
                              title=translate(ASK_OPEN_IMAGE),
                              filetypes=())
         if img:
-            path_and_file = img.name.rpartition("/")
-            self.portrait = self.load_image_from_file(path_and_file[2],
-                                                      path_and_file[0] +
-                                                      path_and_file[1])
-            self.photo_label.configure(image=self.portrait)
+            img.close()
+            self.portraits.load(img.name, self.show_portrait)
 
-    @staticmethod
-    def load_image_from_file(file_name: str, file_path: str = None):
+    def show_portrait(self, portrait):
+        """
+        Display loaded portrait, or placeholder portrait if it could not be
+        loaded.
+
+        :param portrait: PhotoImage or None
         """
-        TODO: checking if file exists [x], loading it [x], loading
-         placeholder image instead if requested does not exist [x]
-        :return:
+        if portrait is None:
+            basic_portrait = self.portraits.get(
+                PORTRAITS_PATH + BASIC_PORTRAIT)
+            if basic_portrait is None:
+                return
+            portrait = basic_portrait
+        self.portrait = portrait
+        self.photo_label.configure(image=self.portrait)
+
+    def prefetch_portraits(self):
         """
-        path = file_path if file_path is not None else PORTRAITS_PATH
-        try:
-            os.path.isfile(PORTRAITS_PATH+file_name)
-            portrait = PhotoImage(file=path + file_name)
-        except FileNotFoundError:
-            print(f"Image {file_name} does not exist!")
-            portrait = PhotoImage(file=path + BASIC_PORTRAIT)
-        return portrait
+        Generate missing thumbnails of the portraits and load them to the
+        cache in background, so they are displayed at once when chosen.
+        """
+        if not os.path.isdir(PORTRAITS_PATH):
+            return
+        if PILLOW_AVAILABLE:
+            future = self.portraits.executor.submit(generate_thumbnails,
+                                                    PORTRAITS_PATH)
+            future.add_done_callback(report_thumbnails_error)
+        self.portraits.prefetch(
+            PORTRAITS_PATH + f for f in sorted(os.listdir(PORTRAITS_PATH))
+            if f.lower().endswith(IMAGE_EXTENSIONS))
 
     def load_character_from_file(self):
         """
-        TODO: dialog for user for file choice [ ], search for file [ ] read [ ]
-        :return:
+        Let user choose the character-sheet and display character read from
+        it.
         """
         file = fd.askopenfile(initialdir=CHARACTERS_PATH,
                               title=translate(ASK_OPEN_TITLE),
                               filetypes=())
         if file:
-            with open(file.name, "r") as file:
-                data = file.readlines()
-                categories = (self.name_and_surname, self.ethnicity, self.sex,
-                              self.age, self.years, self.weight,
-                              self.kilograms, self.height, self.centimeters,
-                              self.short_desc, self.description, self.clothes,
-                              self.pockets, self.weapons)
-
-                for i in range(len(data)):
-                    if isinstance(categories[i], IntVar):
-                        categories[i].set(int(data[i].split(" = ")[1]))
-                    else:
-                        categories[i].set(data[i].split(" = ")[1])
+            file.close()
+            try:
+                with open(file.name, "r", encoding="utf-8") as sheet:
+                    character, descriptions = parse_sheet(sheet, file.name)
+            except (OSError, UnicodeDecodeError, SheetError) as error:
+                print(error)
+                return
+            self.set_character(character)
+            self.short_desc.set(descriptions.get("short_desc", ""))
+            self.description.set(descriptions.get("description", ""))
+            self.sheet = file.name
 
     def save_character_to_file(self):
         """
-        Find character-sheets dir, open or create new file named as current
-        character, edit it to fill with current data and close it.
+        Write sheet of the current character and save it in the library.
+        Character saved or loaded before is saved to its own sheet again,
+        new one gets new sheet named as the character, numbered if other
+        character of the same name was saved already.
         """
+        character = self.get_character()
+        sheet = self.sheet
         try:
-            os.path.isdir(CHARACTERS_PATH)
-            file_path = CHARACTERS_PATH
-            file_name = str(self.name_and_surname.get())+".txt"
-            with open(file_path + file_name, "w") as file:
-                categories = (NAME, ETHNICITY, SEX, AGE, "Years", WEIGHT,
-                              KILOGRAMS, HEIGHT, CENTIMETERS, "short_desc",
-                              "description", CLOTHES, WEAPONS)
-                values = (self.name_and_surname, self.ethnicity, self.sex,
-                          self.age, self.years, self.weight, self.kilograms,
-                          self.height, self.centimeters, self.short_desc,
-                          self.description, self.clothes, self.pockets,
-                          self.weapons)
-                for i in range(len(categories)):
-                    line = categories[i].lower() + " = " + str(values[i].get())
-                    file.write(line + "\n")
-        except NotADirectoryError:
-            print(f"Directory {CHARACTERS_PATH} does not exist")
-
-    @staticmethod
-    def load_list_from_file(category: str):
-        """
-        Load simple list of string names from txt file sorted alphabetically to
-        be used by random generators or profession-choice window.
-
-        :param category: str -- type of items to be loaded, could be one of
-        constants: PROFESSIONS, WEAPONS, ITEMS
-        :return: list -- sorted alphabetically
-        """
-        try:
-            os.path.isdir(CONFIGS_PATH)
-            file_path = CONFIGS_PATH
-            file_name = category.lower() + ".txt"
-            items = open(file_path + file_name, "r").readlines()[0].strip("\n")
-            list_of_items = items.split(", ")
-            list_of_items.sort()
-            return list_of_items
-        except NotADirectoryError:
-            print(f"Directory {CONFIGS_PATH} does not exist")
+            if sheet is None:
+                os.makedirs(CHARACTERS_PATH, exist_ok=True)
+                sheet = unique_sheet_path(CHARACTERS_PATH,
+                                          self.name_and_surname.get())
+            write_sheet(sheet, character, short_desc=self.short_desc.get(),
+                        description=self.description.get())
+        except OSError as error:
+            print(f"Could not save {sheet}: {error}")
+            return
+        self.sheet = sheet
+        # sheet saved again replaces its character in the library:
+        with CharacterLibrary() as library:
+            library.save(character, sheet)
 
     def close_application(self):
         """
@@ -706,13 +763,190 @@ class MainApplication:
         """
         if mb.askyesno(translate(QUIT_TITLE), message=translate(QUIT_DIALOG),
                        icon="question"):
+            self.portraits.close()
+            self.prefetcher.stop()
             self.main_frame.destroy()
 
 
+def parse_arguments(arguments=None):
+    """
+    Parse command-line arguments. Without any command GUI is started.
+
+    :param arguments: list -- of str, sys.argv is used if None
+    :return: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each stage of GUI start took")
+    parser.add_argument("--stats", action="store_true",
+                        help="time stages of the generation and print "
+                             "their stats at exit")
+    commands = parser.add_subparsers(dest="command")
+    generate = commands.add_parser("generate", help="stream characters to "
+                                                    "JSONL or CSV")
+    generate.add_argument("--count", type=int, default=1)
+    generate.add_argument("--format", choices=FORMATS, default=JSONL)
+    generate.add_argument("--out", default=STDOUT,
+                          help="output file, '-' for standard output")
+    generate.add_argument("--gzip", action="store_true",
+                          help="compress output with gzip")
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--workers", type=int, default=1,
+                          help="number of processes generating characters")
+    generate.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    # fixed values lock their categories, as unchecked checkboxes do:
+    for category, values in CATEGORIES.items():
+        generate.add_argument("--" + category.lower(), choices=values)
+    generate.add_argument("--profession", default=None)
+    generate.add_argument("--synthesize-names", action="store_true",
+                          help="draw new names and surnames made by Markov "
+                               "chains trained on the banks")
+    generate.add_argument("--name-lengths", type=int, nargs=2,
+                          metavar=("MIN", "MAX"), default=NAME_LENGTHS,
+                          help="lengths of the synthesized names")
+    generate.add_argument("--language", default=None,
+                          choices=available_languages(LANGUAGES_PATH),
+                          help="translate categories, e.g. 'polish'")
+    generate.add_argument("--profile", metavar="FILE", default=None,
+                          help="run generation under cProfile and save its "
+                               "stats to the file")
+    character = commands.add_parser("character", help="recompute character "
+                                                      "of the index and seed")
+    character.add_argument("--seed", type=int, required=True)
+    character.add_argument("--index", type=int, required=True)
+    serve = commands.add_parser("serve", help="serve characters over HTTP")
+    serve.add_argument("--host", default=HOST,
+                       help="interface to listen on, local only by default")
+    serve.add_argument("--port", type=int, default=PORT)
+    serve.add_argument("--reload-interval", type=float, default=POLL_INTERVAL,
+                       help="seconds between checks of changed config and "
+                            "language files, 0 disables reloading")
+    commands.add_parser("thumbnails", help="generate thumbnails of the "
+                                           "portraits, requires Pillow")
+    library = commands.add_parser("library", help="import sheets to the "
+                                                  "library, or query it")
+    library.add_argument("--path", default=LIBRARY_PATH,
+                         help="library database file")
+    library.add_argument("--import", dest="import_", metavar="DIRECTORY",
+                         help="import all txt sheets from the directory "
+                              "and its subdirectories")
+    library.add_argument("--workers", type=int, default=IMPORT_WORKERS,
+                         help="number of threads reading the sheets")
+    for category, values in CATEGORIES.items():
+        library.add_argument("--" + category.lower(), choices=values)
+    for field in ("name", "surname", "profession"):
+        library.add_argument("--" + field, default=None)
+    library.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    library.add_argument("--after", type=int, default=0,
+                         help="id of the last character of previous page")
+    return parser.parse_args(arguments)
+
+
+def generate_characters(arguments):
+    """
+    Stream characters generated without GUI to the file or standard output.
+
+    :param arguments: argparse.Namespace -- parsed "generate" command
+    """
+    base = Character()
+    locks = []
+    for category in tuple(CATEGORIES) + (PROFESSION,):
+        value = getattr(arguments, category.lower())
+        if value is not None:
+            setattr(base, category.lower(), value)
+            locks.append(category)
+    if arguments.stats and arguments.workers > 1:
+        print("Stats are collected only with --workers 1", file=sys.stderr)
+    with ExitStack() as stack:
+        if arguments.profile is not None:
+            stack.enter_context(instrumentation.profiled(arguments.profile))
+        try:
+            export(arguments.count, arguments.format, arguments.out,
+                   arguments.gzip, locks, base, arguments.seed,
+                   arguments.workers, arguments.batch_size,
+                   {"synthesize": arguments.synthesize_names,
+                    "name_lengths": tuple(arguments.name_lengths)},
+                   language=arguments.language)
+        except BrokenPipeError:
+            pass  # output piped to e.g. head, which does not need more
+
+
+def show_character(arguments):
+    """
+    Print, as JSON, character of the index from the population of the seed.
+
+    :param arguments: argparse.Namespace -- parsed "character" command
+    """
+    character = CharacterGenerator().character_at(arguments.seed,
+                                                  arguments.index)
+    print(format_jsonl([character]), end="")
+
+
+def use_library(arguments):
+    """
+    Import sheets to the library, or print, as JSON, one page of the
+    characters matching the arguments.
+
+    :param arguments: argparse.Namespace -- parsed "library" command
+    """
+    with CharacterLibrary(arguments.path) as library:
+        if arguments.import_ is not None:
+            errors = []
+
+            def report(path, error):
+                errors.append(path)
+                print(f"Skipped {path}: {error}", file=sys.stderr)
+
+            count = library.import_sheets(arguments.import_,
+                                          arguments.workers, report)
+            print(f"Imported {count} characters to {arguments.path}, "
+                  f"skipped {len(errors)} sheets")
+            return
+        conditions = {}
+        for field in tuple(c.lower() for c in CATEGORIES) + \
+                ("name", "surname", "profession"):
+            if getattr(arguments, field) is not None:
+                conditions[field] = getattr(arguments, field)
+        for id_, character in library.query(arguments.page_size,
+                                            arguments.after, **conditions):
+            print(json.dumps({"id": id_, **character.as_dict()},
+                             ensure_ascii=False))
+
+
 if __name__ == '__main__':
-    setup_translator(LANGUAGES_PATH, LANGUAGE_FILE)
-    tk = Tk()
-    icon = PhotoImage(file=ICON_PATH)
-    tk.call('wm', 'iconphoto', tk._w, icon)
-    app = MainApplication(tk)
-    tk.mainloop()
+    args = parse_arguments()
+    if args.stats:
+        instrumentation.enable()
+        atexit.register(instrumentation.report)
+    if args.command == "generate":
+        generate_characters(args)
+    elif args.command == "character":
+        show_character(args)
+    elif args.command == "library":
+        use_library(args)
+    elif args.command == "serve":
+        run_server(args.host, args.port,
+                   reload_interval=args.reload_interval)
+    elif args.command == "thumbnails":
+        try:
+            count = generate_thumbnails(PORTRAITS_PATH)
+            print(f"Generated {count} thumbnails in {PORTRAITS_PATH}")
+        except (RuntimeError, FileNotFoundError) as error:
+            print(error, file=sys.stderr)
+    else:
+        setup_translator(LANGUAGES_PATH, LANGUAGE_FILE)
+        STARTUP.mark("translator setup")
+        tk = Tk()
+        icon = PhotoImage(file=ICON_PATH)
+        tk.call('wm', 'iconphoto', tk._w, icon)
+        STARTUP.mark("Tk init")
+        app = MainApplication(tk)
+        STARTUP.mark("widget build")
+        tk.update()
+        STARTUP.mark("first paint")
+        # banks used by the generator are loaded by the first draw:
+        app.randomize_everything()
+        STARTUP.mark("first character")
+        if args.profile_startup:
+            STARTUP.report()
+        tk.mainloop()
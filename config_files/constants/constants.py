@@ -34,4 +34,41 @@ NEW_NAME = "NEW_NAME"
 NEW_SURNAME = "NEW_SURNAME"
 NEW_BOTH = "NEW_BOTH"
 AND = "AND"
-
+GOLD_COLOR = "gold"
+GREEN_COLOR = "pale green"
+RED_COLOR = "tomato"
+GRAY_COLOR = "light gray"
+FILE = "FILE"
+NEW = "NEW"
+BOTH_NAMES = "BOTH_NAMES"
+WEIGHT = "WEIGHT"
+HEIGHT = "HEIGHT"
+SHORT = "SHORT"
+AVERAGE = "AVERAGE"
+TALL = "TALL"
+THIN = "THIN"
+NORMAL = "NORMAL"
+FAT = "FAT"
+CENTIMETERS = "CENTIMETERS"
+KILOGRAMS = "KILOGRAMS"
+RESULT_DESC = "RESULT_DESC"
+ASK_OPEN_IMAGE = "ASK_OPEN_IMAGE"
+ASK_OPEN_TITLE = "ASK_OPEN_FILE"
+PORTRAIT = "PORTRAIT"
+RANDOMIZE_CHECKED = "RANDOMIZE_CHECKED"
+DESCRIPTION = "DESCRIPTION"
+LONG_DESCRIPTION = "LONG_DESCRIPTION"
+CLOTHES = "CLOTHES"
+POCKETS = "POCKETS"
+WEAPONS = "WEAPONS"
+PISTOLS = "PISTOLS"
+RIFLES = "RIFLES"
+TAKE_LOOK = "TAKE_LOOK"
+EDIT = "EDIT"
+CANCEL = "CANCEL"
+PROFESSION = "PROFESSION"
+PROFFESIONS = "PROFESSIONS"
+CHOOSE_PROFESSION = "CHOOSE_PROFESSION"
+PROF_CHOICE_TITLE = "PROF_CHOICE_TITLE"
+IS_ARMED = "IS_ARMED"
+ARMED = "ARMED"
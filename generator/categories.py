@@ -0,0 +1,40 @@
+"""
+Categories of the traits of the characters and their statistical
+distributions, shared by all the samplers of the generator.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+
+from config_files.constants.constants import *
+
+# paths to the directories and files:
+PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIGS_PATH = PATH + "/config_files/"
+
+# categories:
+ETHNICITIES = (WHITE, BLACK, JAPANESE, CHINESE, LATINO)
+SEXES = (MALE, FEMALE)
+AGES = (YOUNG, ADULT, OLD)
+WEIGHTS = (THIN, NORMAL, FAT)
+HEIGHTS = (SHORT, AVERAGE, TALL)
+CATEGORIES = {ETHNICITY: ETHNICITIES,
+              SEX: SEXES,
+              AGE: AGES,
+              HEIGHT: HEIGHTS,
+              WEIGHT: WEIGHTS}
+# statistical distributions used if config file does not override them:
+DEFAULT_WEIGHTS = {category: dict.fromkeys(values, 1.0) for category, values
+                   in CATEGORIES.items()}
+DEFAULT_WEIGHTS[HEIGHT] = {SHORT: 2.0, AVERAGE: 4.0, TALL: 1.0}
+DEFAULT_WEIGHTS[WEIGHT] = {THIN: 4.0, NORMAL: 3.0, FAT: 1.0}
+# mean and deviation of the traits, weight is an offset from height in cm:
+GAUSSIAN_PARAMS = {YOUNG: (20, 4), ADULT: (35, 5), OLD: (55, 5),
+                   SHORT: (150, 10), AVERAGE: (175, 10), TALL: (190, 10),
+                   THIN: (-110, 5), NORMAL: (-95, 5), FAT: (-80, 5)}
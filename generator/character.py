@@ -0,0 +1,220 @@
+"""
+Records of the generated characters. Character is a compact record of one
+character and CharacterStore keeps many of them in columns: categorical and
+text fields as small integer codes and numeric fields in typed arrays, so
+hundreds of thousands of characters could be kept in memory and filtered
+without creating per-row objects.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from generator.categories import *
+
+CHARACTER_FIELDS = ("name", "surname", "ethnicity", "sex", "age", "years",
+                    "height", "centimeters", "weight", "kilograms",
+                    "profession", "clothes", "pockets", "weapons")
+NUMERIC_FIELDS = ("years", "centimeters", "kilograms")
+# categorical fields have codes equal to the indexes of the categories:
+CATEGORICAL_FIELDS = {"ethnicity": ETHNICITIES,
+                      "sex": SEXES,
+                      "age": AGES,
+                      "height": HEIGHTS,
+                      "weight": WEIGHTS}
+# typecodes of the arrays keeping the columns:
+CATEGORY_TYPECODE = "B"
+TEXT_TYPECODE = "I"
+NUMERIC_TYPECODE = "h"
+
+
+class Character:
+    """Record of the character with all the CHARACTER_FIELDS."""
+
+    __slots__ = CHARACTER_FIELDS
+
+    def __init__(self, name: str = "", surname: str = "", ethnicity: str = "",
+                 sex: str = "", age: str = "", years: int = 0,
+                 height: str = "", centimeters: int = 0, weight: str = "",
+                 kilograms: int = 0, profession: str = "", clothes: str = "",
+                 pockets: str = "", weapons: str = ""):
+        self.name = name
+        self.surname = surname
+        self.ethnicity = ethnicity
+        self.sex = sex
+        self.age = age
+        self.years = years
+        self.height = height
+        self.centimeters = centimeters
+        self.weight = weight
+        self.kilograms = kilograms
+        self.profession = profession
+        self.clothes = clothes
+        self.pockets = pockets
+        self.weapons = weapons
+
+    def __repr__(self):
+        return f"Character({self.name} {self.surname}, {self.ethnicity}, " \
+               f"{self.sex}, {self.age}, {self.profession})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Character):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def as_tuple(self):
+        """Return values of the fields in the order of CHARACTER_FIELDS."""
+        return tuple(getattr(self, field) for field in CHARACTER_FIELDS)
+
+    def as_dict(self):
+        """Return {field: value} dict of the character."""
+        return dict(zip(CHARACTER_FIELDS, self.as_tuple()))
+
+
+class CharacterStore:
+    """
+    Columnar storage of the characters. Text fields are interned: each column
+    keeps codes of the values and a vocabulary list shared by all rows.
+    """
+
+    def __init__(self, characters=()):
+        """
+        Create empty columns and fill them with characters.
+
+        :param characters: iterable -- of Character records
+        """
+        self.vocabularies = {}
+        self.codes = {}
+        self.columns = {}
+        for field in CHARACTER_FIELDS:
+            if field in NUMERIC_FIELDS:
+                self.columns[field] = array(NUMERIC_TYPECODE)
+                continue
+            values = list(CATEGORICAL_FIELDS.get(field, ()))
+            self.vocabularies[field] = values
+            self.codes[field] = {v: i for i, v in enumerate(values)}
+            typecode = CATEGORY_TYPECODE if field in CATEGORICAL_FIELDS \
+                else TEXT_TYPECODE
+            self.columns[field] = array(typecode)
+        self.extend(characters)
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def __getitem__(self, row: int):
+        """Build Character record of the row."""
+        return Character(*(self.value(field, row) for field in
+                           CHARACTER_FIELDS))
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def encode(self, field: str, value):
+        """
+        Find code of the value in the column, adding it to the vocabulary if
+        it is new.
+
+        :param field: str -- one of CHARACTER_FIELDS, except NUMERIC_FIELDS
+        :param value: str
+        :return: int
+        """
+        codes = self.codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.vocabularies[field].append(value)
+        return codes[value]
+
+    def value(self, field: str, row: int):
+        """Decode value of the field of the row."""
+        if field in NUMERIC_FIELDS:
+            return self.columns[field][row]
+        return self.vocabularies[field][self.columns[field][row]]
+
+    def column(self, field: str):
+        """
+        Decode all the values of the field.
+
+        :param field: str -- one of CHARACTER_FIELDS
+        :return: list
+        """
+        if field in NUMERIC_FIELDS:
+            return self.columns[field].tolist()
+        return list(map(self.vocabularies[field].__getitem__,
+                        self.columns[field]))
+
+    def append(self, character: Character):
+        """
+        Add the character as the last row.
+
+        :param character: Character
+        """
+        columns = self.columns
+        for field in CHARACTER_FIELDS:
+            value = getattr(character, field)
+            if field in NUMERIC_FIELDS:
+                columns[field].append(value)
+            else:
+                columns[field].append(self.encode(field, value))
+
+    def extend(self, characters):
+        """Add all the characters from the iterable."""
+        for character in characters:
+            self.append(character)
+
+    def filter(self, **conditions):
+        """
+        Find rows matching all the conditions, e.g. OLD LATINO females taller
+        than 180 cm: filter(age=OLD, ethnicity=LATINO, sex=FEMALE,
+        centimeters=(181, None)).
+
+        :param conditions: field=value for text and categorical fields,
+         field=(minimum, maximum) for NUMERIC_FIELDS, where minimum is
+         inclusive, maximum exclusive and None means no limit
+        :return: array -- of the indexes of matching rows
+        """
+        if np is not None and len(self):
+            mask = np.ones(len(self), dtype=bool)
+            for field, condition in conditions.items():
+                column = np.frombuffer(self.columns[field],
+                                       dtype=self.columns[field].typecode)
+                mask &= self._numpy_condition(field, condition, column)
+            rows = array("I")
+            rows.frombytes(np.flatnonzero(mask).astype(np.uint32).tobytes())
+            return rows
+        rows = range(len(self))
+        for field, condition in conditions.items():
+            column = self.columns[field]
+            test = self._python_condition(field, condition)
+            rows = [row for row in rows if test(column[row])]
+        return array("I", rows)
+
+    def _numpy_condition(self, field: str, condition, column):
+        if field in NUMERIC_FIELDS:
+            minimum, maximum = condition
+            mask = np.ones(len(column), dtype=bool)
+            if minimum is not None:
+                mask &= column >= minimum
+            if maximum is not None:
+                mask &= column < maximum
+            return mask
+        code = self.codes[field].get(condition)
+        return column == code if code is not None else \
+            np.zeros(len(column), dtype=bool)
+
+    def _python_condition(self, field: str, condition):
+        if field in NUMERIC_FIELDS:
+            minimum, maximum = condition
+            return lambda value: (minimum is None or value >= minimum) and \
+                                 (maximum is None or value < maximum)
+        code = self.codes[field].get(condition)
+        return lambda value: value == code
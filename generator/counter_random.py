@@ -0,0 +1,38 @@
+"""
+Keyed random generators. Stream of the index-th character of the population
+is a pure function of the (seed, index) key, so any character could be
+recomputed in O(1), without generating characters before it, and it does not
+depend on NumPy, which is used only for unseeded batches. Each stream is
+random.Random (Mersenne Twister generated in C) seeded with the scrambled
+key, which is several times faster than a counter-based generator written
+in Python.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+MASK64 = (1 << 64) - 1
+
+
+def mix64(z: int):
+    """SplitMix64 finalizer, scrambling 64-bit integer."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def character_random(seed: int, index: int):
+    """
+    Return generator of the index-th character of the population.
+
+    :param seed: int -- 64-bit seed of the population
+    :param index: int -- index of the character in the population
+    :return: random.Random
+    """
+    return random.Random(mix64((mix64(seed & MASK64) + index) & MASK64))
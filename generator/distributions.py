@@ -0,0 +1,135 @@
+"""
+Weighted categorical distributions of the traits of the characters. Weights
+are declared in the config file and compiled once into alias-method tables,
+so each draw costs O(1) no matter how many categories there are.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+
+from config_loader.config_loader import load_config_from_file
+from generator.categories import *
+
+DISTRIBUTIONS_FILE = "distributions.txt"
+
+
+class AliasTable:
+    """
+    Vose's alias method: each of n columns keeps probability of returning
+    its own value and an alias value returned otherwise.
+    """
+
+    def __init__(self, values, weights=None):
+        """
+        Compile the table.
+
+        :param values: sequence -- values to be drawn
+        :param weights: sequence -- non-negative weights of the values, all
+         values are equally probable if not provided
+        """
+        self.values = tuple(values)
+        n = len(self.values)
+        if weights is None:
+            weights = (1.0,) * n
+        weights = [float(w) for w in weights]
+        if n == 0 or len(weights) != n or min(weights) < 0 or not sum(weights):
+            raise ValueError("AliasTable requires non-empty values and "
+                             "matching, non-negative, not all zero weights")
+        self.weights = tuple(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.probabilities = [1.0] * n
+        self.aliases = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            lesser, greater = small.pop(), large.pop()
+            self.probabilities[lesser] = scaled[lesser]
+            self.aliases[lesser] = greater
+            scaled[greater] -= 1.0 - scaled[lesser]
+            (small if scaled[greater] < 1.0 else large).append(greater)
+        # columns left in small or large due to rounding errors are full
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw_index(self, rng):
+        """
+        Draw index of the value with one call to the random generator.
+
+        :param rng: random.Random -- source of randomness
+        :return: int
+        """
+        u = rng.random() * len(self.values)
+        i = int(u)
+        return i if u - i < self.probabilities[i] else self.aliases[i]
+
+    def draw(self, rng):
+        """
+        Draw the value.
+
+        :param rng: random.Random -- source of randomness
+        :return: drawn value
+        """
+        return self.values[self.draw_index(rng)]
+
+
+def parse_weights(entries):
+    """
+    Convert entries of the config list, such as "SHORT: 2", into dict.
+
+    :param entries: list -- of "VALUE: weight" strings
+    :return: dict -- {value: float weight}
+    """
+    weights = {}
+    for entry in entries:
+        if not str(entry).strip():
+            continue
+        value, _, weight = str(entry).rpartition(":")
+        weights[value.strip()] = float(weight)
+    return weights
+
+
+def load_distributions(file_name: str = DISTRIBUTIONS_FILE,
+                       file_path: str = None):
+    """
+    Load weights of the categories from the config file, e.g. demographics of
+    the setting. Categories not mentioned in the file keep DEFAULT_WEIGHTS.
+
+    :param file_name: str -- name of the file in config_files directory
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: dict -- {category: {value: weight}}
+    """
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    weights = {c: dict(w) for c, w in DEFAULT_WEIGHTS.items()}
+    if os.path.isfile(file_path + file_name):
+        [section] = load_config_from_file(file_path, file_name)
+        for category, entries in section.items():
+            weights.setdefault(category, {}).update(parse_weights(entries))
+    return weights
+
+
+def compile_distributions(weights: dict, professions: list = ()):
+    """
+    Build alias tables of all the categories. Professions, which are not
+    given any weight, are as probable as profession with weight 1.
+
+    :param weights: dict -- {category: {value: weight}}
+    :param professions: list -- all the professions
+    :return: dict -- {category: AliasTable}
+    """
+    tables = {}
+    for category, values in CATEGORIES.items():
+        tables[category] = AliasTable(
+            values, [weights[category].get(v, 0) for v in values])
+    if professions:
+        profession_weights = weights.get(PROFESSION, {})
+        tables[PROFESSION] = AliasTable(
+            professions, [profession_weights.get(p, 1) for p in professions])
+    return tables
@@ -0,0 +1,155 @@
+"""
+Streaming export of generated characters to JSONL or CSV. Characters are
+generated and written in batches, so memory used stays flat no matter how
+many characters are exported.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import io
+import csv
+import sys
+import gzip
+import json
+from functools import partial
+from contextlib import contextmanager, ExitStack
+
+from generator.categories import PATH
+from generator.character import CHARACTER_FIELDS, CharacterStore
+from generator.parallel import generate_parallel
+from translator.translator import get_catalog, translate_column
+
+JSONL = "jsonl"
+CSV = "csv"
+FORMATS = (JSONL, CSV)
+STDOUT = "-"
+BATCH_SIZE = 10000
+BUFFER_SIZE = 1 << 20
+LANGUAGES_PATH = PATH + "/languages/"
+# fields which values are translated when exported in other language:
+TRANSLATED_FIELDS = ("ethnicity", "sex", "age", "height", "weight",
+                     "profession")
+# free-text fields keep values which have no translation:
+FREE_TEXT_FIELDS = ("profession",)
+
+
+@contextmanager
+def open_output(path: str = STDOUT, compress: bool = False):
+    """
+    Open text stream to the file or standard output, with big buffer and
+    optionally compressed with gzip.
+
+    :param path: str -- path to the file or STDOUT
+    :param compress: bool -- if output should be compressed with gzip
+    :return: io.TextIOWrapper
+    """
+    with ExitStack() as stack:
+        if path == STDOUT:
+            binary = open(sys.stdout.fileno(), "wb", buffering=BUFFER_SIZE,
+                          closefd=False)
+        else:
+            binary = open(path, "wb", buffering=BUFFER_SIZE)
+        stack.enter_context(binary)
+        if compress:
+            binary = stack.enter_context(gzip.GzipFile(fileobj=binary,
+                                                       mode="wb"))
+        yield stack.enter_context(io.TextIOWrapper(binary, encoding="utf-8",
+                                                   newline=""))
+
+
+def translated_rows(characters, language: str,
+                    languages_path: str = LANGUAGES_PATH):
+    """
+    Return values of the characters with TRANSLATED_FIELDS translated. Batch
+    is turned into columns of codes, so each column is translated at once
+    through lookup table of its vocabulary, instead of word by word.
+
+    :param characters: list -- of Character records
+    :param language: str -- name of the language, e.g. "polish"
+    :param languages_path: str -- directory of the language files
+    :return: list -- of tuples of values in the order of CHARACTER_FIELDS
+    """
+    catalog = get_catalog(languages_path)
+    store = CharacterStore(characters)
+    columns = [translate_column(store.columns[field],
+                                store.vocabularies[field], language,
+                                field in FREE_TEXT_FIELDS, catalog)
+               if field in TRANSLATED_FIELDS else store.column(field)
+               for field in CHARACTER_FIELDS]
+    return list(zip(*columns))
+
+
+def character_rows(characters, language: str = None,
+                   languages_path: str = LANGUAGES_PATH):
+    """Return values of the characters, translated if language is given."""
+    if language is None:
+        return [c.as_tuple() for c in characters]
+    return translated_rows(characters, language, languages_path)
+
+
+def format_jsonl(characters, language: str = None):
+    """
+    Serialize each character as JSON object in separate line.
+
+    :param characters: list -- of Character records
+    :param language: str -- language of the categories, untranslated if None
+    :return: str
+    """
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    return "".join([dumps(dict(zip(CHARACTER_FIELDS, row))) + "\n"
+                    for row in character_rows(characters, language)])
+
+
+def format_csv(characters, language: str = None):
+    """
+    Serialize characters as rows of CSV file, without the header.
+
+    :param characters: list -- of Character records
+    :param language: str -- language of the categories, untranslated if None
+    :return: str
+    """
+    rows = io.StringIO()
+    csv.writer(rows).writerows(character_rows(characters, language))
+    return rows.getvalue()
+
+
+FORMATTERS = {JSONL: format_jsonl, CSV: format_csv}
+# csv module ends rows with \r\n by default:
+HEADERS = {JSONL: "", CSV: ",".join(CHARACTER_FIELDS) + "\r\n"}
+
+
+def export(count: int, format_: str = JSONL, path: str = STDOUT,
+           compress: bool = False, locks=(), base=None, seed: int = None,
+           workers: int = 1, batch_size: int = BATCH_SIZE,
+           generator_kwargs: dict = None, language: str = None):
+    """
+    Generate characters and stream them to the file or standard output.
+    Batches are generated and serialized by the workers, output depends only
+    on the seed and row n is the character_at(seed, n).
+
+    :param count: int -- number of characters to export
+    :param format_: str -- JSONL or CSV
+    :param path: str -- path to the output file or STDOUT
+    :param compress: bool -- if output should be compressed with gzip
+    :param locks: iterable -- categories which should not be randomized
+    :param base: Character -- record providing values of locked categories
+    :param seed: int -- master seed of the random generators, random if None
+    :param workers: int -- number of processes generating characters
+    :param batch_size: int -- number of characters generated at once
+    :param generator_kwargs: dict -- arguments of CharacterGenerator
+    :param language: str -- language of the categories, untranslated if None
+    :return: int -- number of written characters
+    """
+    chunks = generate_parallel(count, seed, workers, locks, base, batch_size,
+                               partial(FORMATTERS[format_], language=language),
+                               generator_kwargs)
+    with open_output(path, compress) as output:
+        output.write(HEADERS[format_])
+        for chunk in chunks:
+            output.write(chunk)
+    return count
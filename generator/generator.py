@@ -0,0 +1,622 @@
+"""
+Headless core of the character generator. It draws all the attributes of the
+character (ethnicity, sex, age, height, weight, profession, weapons, clothes,
+pockets, name and surname) without touching tkinter, so characters could be
+generated in big batches, e.g. when pre-generating NPCs for a campaign.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import copy
+import random
+from time import perf_counter
+from itertools import islice
+
+from config_loader.config_loader import load_config_from_file
+from config_files.constants.constants import *
+from generator.categories import *
+from generator import instrumentation
+from generator.character import Character, CHARACTER_FIELDS
+from generator.counter_random import character_random
+from generator.distributions import (
+    load_distributions, compile_distributions, DISTRIBUTIONS_FILE
+)
+from generator.model import load_model, CompiledModel, MODEL_FILE
+from generator.loot import load_loot, LootTables, LOOT_FILE
+from generator.name_pool import load_pool, as_pool
+from generator.search import SearchIndex
+from generator.markov import NameSynthesizer, NAME_LENGTHS
+from generator.unique_names import UniqueNameAllocator
+from generator.vectorized import NUMPY_AVAILABLE, sample_traits
+
+# fields of the character record controlled by each "randomize" checkbox:
+LOCKED_FIELDS = {ETHNICITY: ("ethnicity",),
+                 SEX: ("sex",),
+                 AGE: ("age", "years"),
+                 HEIGHT: ("height", "centimeters"),
+                 WEIGHT: ("weight", "kilograms"),
+                 PROFESSION: ("profession",),
+                 ARMED: ("weapons",)}
+BODY = frozenset((AGE, HEIGHT, WEIGHT))
+# config files with attributes of the generator built from them: the bank
+# itself first, then indexes derived from it, see CharacterGenerator.reloaded:
+BANK_FILES = {"names.txt": ("names", "_names_index", "_names_synthesizer"),
+              "surnames.txt": ("surnames", "_surnames_index",
+                               "_surnames_synthesizer"),
+              PROFFESIONS.lower() + ".txt": ("_professions", "_distributions",
+                                             "_model", "_loot",
+                                             "_professions_index"),
+              PISTOLS.lower() + ".txt": ("_pistols", "_loot"),
+              RIFLES.lower() + ".txt": ("_rifles", "_loot"),
+              DISTRIBUTIONS_FILE: ("_weights", "_distributions", "_model"),
+              MODEL_FILE: ("_rules", "_model"),
+              LOOT_FILE: ("_loot_rules", "_loot")}
+# lazily built attributes with properties building them:
+LAZY_ATTRIBUTES = {"_professions": "professions", "_pistols": "pistols_list",
+                   "_rifles": "rifles_list", "_weights": "weights",
+                   "_rules": "rules", "_distributions": "distributions",
+                   "_model": "model", "_loot": "loot",
+                   "_professions_index": "professions_index",
+                   "_names_index": "names_index",
+                   "_surnames_index": "surnames_index",
+                   "_names_synthesizer": "names_synthesizer",
+                   "_surnames_synthesizer": "surnames_synthesizer"}
+
+
+def random_gaussian(parameter: str, cm: int = 0, rng=random):
+    """
+    Calculate random value for required trait range from categories such
+    us: WEIGHT, HEIGHT and AGE using gaussian distribution.
+
+    :param parameter: str -- name of the trait to be calculated, could be:
+    YOUNG, ADULT, OLD, or: SHORT, AVERAGE, TALL, or: THIN, NORMAL, FAT.
+    :param cm: int -- height of character in centimetres (required only to
+     correctly calculate weight)
+    :param rng: random.Random -- source of randomness, global by default
+    :return: int -- random value calculated with gaussian distribution
+    """
+    mean, deviation = GAUSSIAN_PARAMS[parameter]
+    if parameter in WEIGHTS:
+        mean += cm
+    return int(rng.gauss(mean, deviation))
+
+
+def load_surnames(file_name: str = "surnames.txt", file_path: str = None):
+    """
+    Unpack surnames from txt file and put them into the dict for future use.
+
+    :param file_name: str -- name of the surnames file
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: dict
+    """
+    dict_ = {}
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    unpacked = load_config_from_file(file_path, file_name)
+
+    for i in range(len(ETHNICITIES)):
+        dict_[ETHNICITIES[i]] = unpacked[0][ETHNICITIES[i]]
+
+    return dict_
+
+
+def load_names(file_name: str = "names.txt", file_path: str = None):
+    """
+    Unpack names from txt file and put them into the dict for future use.
+
+    :param file_name: str -- name of the names file
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: dict
+    """
+    dict_ = {}
+
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    unpacked = load_config_from_file(file_path, file_name)
+
+    for i in range(len(ETHNICITIES)):
+        dict_[ETHNICITIES[i]] = unpacked[i]
+
+    return dict_
+
+
+def load_list_from_file(category: str, file_path: str = None):
+    """
+    Load simple list of string names from txt file sorted alphabetically to
+    be used by random generators or profession-choice window.
+
+    :param category: str -- type of items to be loaded, could be one of
+    constants: PROFESSIONS, WEAPONS, ITEMS
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: list -- sorted alphabetically
+    """
+    try:
+        file_path = file_path if file_path is not None else CONFIGS_PATH
+        os.path.isdir(file_path)
+        file_name = category.lower() + ".txt"
+        items = open(file_path + file_name, "r").readlines()[0].strip("\n")
+        list_of_items = items.split(", ")
+        list_of_items.sort()
+        return list_of_items
+    except NotADirectoryError:
+        print(f"Directory {file_path} does not exist")
+
+
+class CharacterGenerator:
+    """
+    Generates characters as plain Character records without any GUI,
+    one-by-one or in batches.
+    """
+
+    def __init__(self, names: dict = None, surnames: dict = None,
+                 professions: list = None, pistols: list = None,
+                 rifles: list = None, weights: dict = None, rules: dict = None,
+                 loot: dict = None, synthesize: bool = False,
+                 name_lengths: tuple = NAME_LENGTHS, rng=None):
+        """
+        Initialize new generator. Each bank not provided is loaded from the
+        config files, lists of professions and weapons when they are used
+        first time.
+
+        :param names: NamePool or dict -- {ethnicity: {sex: [names]}},
+         compiled pool of names.txt by default
+        :param surnames: NamePool or dict -- {ethnicity: [surnames]},
+         compiled pool of surnames.txt by default
+        :param professions: list -- names of the professions
+        :param pistols: list -- names of the small guns
+        :param rifles: list -- names of the long weapons
+        :param weights: dict -- {category: {value: weight}} distributions of
+         the categories, loaded from distributions.txt by default
+        :param rules: dict -- {(target, condition): {value: number}} rules of
+         the conditional model, loaded from model.txt by default
+        :param loot: dict -- {(table, profession): [(parts, weight), ...]}
+         rules of the loot tables, loaded from loot.txt by default
+        :param synthesize: bool -- draw new names and surnames synthesized by
+         Markov chains trained on the banks, instead of names from the banks
+        :param name_lengths: tuple -- minimum and maximum length of the
+         synthesized names and surnames
+        :param rng: random.Random -- source of randomness, global by default
+        """
+        self.names = as_pool(names) if names is not None else \
+            load_pool("names.txt", load_names)
+        self.surnames = as_pool(surnames) if surnames is not None else \
+            load_pool("surnames.txt", load_surnames)
+        # banks given here are never reloaded from the config files:
+        self._provided = frozenset(
+            attribute for attribute, bank in (
+                ("names", names), ("surnames", surnames),
+                ("_professions", professions), ("_pistols", pistols),
+                ("_rifles", rifles), ("_weights", weights),
+                ("_rules", rules), ("_loot_rules", loot))
+            if bank is not None)
+        # lists not provided are loaded on first use, not to slow down start:
+        self._professions = professions
+        self._pistols = pistols
+        self._rifles = rifles
+        self._weights = weights
+        self._rules = rules
+        self._loot_rules = loot
+        self._distributions = None
+        self._model = None
+        self._loot = None
+        self._professions_index = None
+        self._names_index = None
+        self._surnames_index = None
+        self.synthesize = synthesize
+        self.name_lengths = name_lengths
+        self._names_synthesizer = None
+        self._surnames_synthesizer = None
+        self.rng = rng if rng is not None else random
+
+    @property
+    def professions(self):
+        if self._professions is None:
+            self._professions = load_list_from_file(PROFFESIONS)
+        return self._professions
+
+    @property
+    def pistols_list(self):
+        if self._pistols is None:
+            self._pistols = load_list_from_file(PISTOLS)
+        return self._pistols
+
+    @property
+    def rifles_list(self):
+        if self._rifles is None:
+            self._rifles = load_list_from_file(RIFLES)
+        return self._rifles
+
+    @property
+    def weights(self):
+        if self._weights is None:
+            self._weights = load_distributions()
+        return self._weights
+
+    @property
+    def distributions(self):
+        if self._distributions is None:
+            self._distributions = compile_distributions(self.weights,
+                                                        self.professions)
+        return self._distributions
+
+    @property
+    def rules(self):
+        if self._rules is None:
+            self._rules = load_model()
+        return self._rules
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = CompiledModel(self.distributions, self.rules,
+                                        self.professions)
+        return self._model
+
+    @property
+    def loot(self):
+        if self._loot is None:
+            rules = self._loot_rules if self._loot_rules is not None else \
+                load_loot()
+            self._loot = LootTables(rules, self.professions,
+                                    self.pistols_list, self.rifles_list)
+        return self._loot
+
+    @property
+    def professions_index(self):
+        if self._professions_index is None:
+            self._professions_index = SearchIndex(self.professions)
+        return self._professions_index
+
+    @property
+    def names_index(self):
+        if self._names_index is None:
+            self._names_index = SearchIndex(
+                self.names[i] for i in range(len(self.names)))
+        return self._names_index
+
+    @property
+    def surnames_index(self):
+        if self._surnames_index is None:
+            self._surnames_index = SearchIndex(
+                self.surnames[i] for i in range(len(self.surnames)))
+        return self._surnames_index
+
+    @property
+    def names_synthesizer(self):
+        if self._names_synthesizer is None:
+            self._names_synthesizer = self._synthesizer("names", self.names)
+        return self._names_synthesizer
+
+    @property
+    def surnames_synthesizer(self):
+        if self._surnames_synthesizer is None:
+            self._surnames_synthesizer = self._synthesizer("surnames",
+                                                           self.surnames)
+        return self._surnames_synthesizer
+
+    def _synthesizer(self, bank: str, pool):
+        # only chains of the banks loaded from the files are cached:
+        source_file = None if bank in self._provided else \
+            CONFIGS_PATH + bank + ".txt"
+        return NameSynthesizer(pool, source_file, lengths=self.name_lengths)
+
+    def find_professions(self, query: str, limit: int = None):
+        """
+        Find professions starting with the query, then these containing it,
+        ignoring case and accents.
+
+        :param query: str -- e.g. "eng"
+        :param limit: int -- maximum number of results, all if None
+        :return: list -- of str
+        """
+        professions = self.professions
+        return [professions[i] for i in
+                self.professions_index.search(query, limit)]
+
+    def find_names(self, query: str, ethnicity: str = None, sex: str = None,
+                   limit: int = None):
+        """
+        Find names starting with the query, then these containing it.
+
+        :param query: str
+        :param ethnicity: str -- only names of the ethnicity, all if None
+        :param sex: str -- only names of the sex, all if None
+        :param limit: int -- maximum number of results, all if None
+        :return: list -- of str
+        """
+        keys = None
+        if ethnicity is not None or sex is not None:
+            keys = [(e, s) for e in ((ethnicity,) if ethnicity else
+                                     ETHNICITIES)
+                    for s in ((sex,) if sex else SEXES)]
+        return self._find(self.names, self.names_index, query, keys, limit)
+
+    def find_surnames(self, query: str, ethnicity: str = None,
+                      limit: int = None):
+        """
+        Find surnames starting with the query, then these containing it.
+
+        :param query: str
+        :param ethnicity: str -- only surnames of the ethnicity, all if None
+        :param limit: int -- maximum number of results, all if None
+        :return: list -- of str
+        """
+        keys = None if ethnicity is None else [(ethnicity,)]
+        return self._find(self.surnames, self.surnames_index, query, keys,
+                          limit)
+
+    @staticmethod
+    def _find(pool, index: SearchIndex, query: str, keys, limit: int):
+        string_ids = index.iter_search(query)
+        if keys is not None:
+            string_ids = (i for i in string_ids if
+                          any(pool.contains_id(i, *key) for key in keys))
+        return [pool[i] for i in islice(string_ids, limit)]
+
+    def reloaded(self, file_names):
+        """
+        Return copy of the generator with banks of the changed config files
+        loaded again and only indexes derived from them rebuilt, sharing all
+        the others. This generator is not modified, so batches drawn by it
+        stay consistent, and the copy could replace it with one assignment.
+
+        :param file_names: iterable -- of str, names of the changed files in
+         CONFIGS_PATH, e.g. "names.txt", other files are ignored
+        :return: CharacterGenerator
+        """
+        generator = copy.copy(self)
+        built = [attribute for attribute in LAZY_ATTRIBUTES
+                 if getattr(self, attribute) is not None]
+        for file_name in file_names:
+            attributes = BANK_FILES.get(file_name, ())
+            if not attributes or attributes[0] in self._provided:
+                continue
+            if attributes[0] == "names":
+                generator.names = load_pool(file_name, load_names)
+            elif attributes[0] == "surnames":
+                generator.surnames = load_pool(file_name, load_surnames)
+            for attribute in attributes:
+                if attribute in LAZY_ATTRIBUTES:
+                    setattr(generator, attribute, None)
+        # rebuild at once what was already built, so errors in the files are
+        # raised here and the copy never loads anything while drawing:
+        for attribute in built:
+            getattr(generator, LAZY_ATTRIBUTES[attribute])
+        return generator
+
+    def name_generator(self, ethnicity: str, sex: str, rng=None):
+        """Generate random name of required sex and ethnicity."""
+        if self.synthesize:
+            return self.names_synthesizer.draw(rng or self.rng, ethnicity,
+                                               sex)
+        return self.names.draw(rng or self.rng, ethnicity, sex)
+
+    def surname_generator(self, ethnicity: str, rng=None):
+        """Generate random surname of required ethnicity."""
+        if self.synthesize:
+            return self.surnames_synthesizer.draw(rng or self.rng, ethnicity)
+        return self.surnames.draw(rng or self.rng, ethnicity)
+
+    def get_random_profession(self, rng=None):
+        """
+        Draw random profession.
+
+        :param rng: random.Random -- source of randomness, self.rng if None
+        :return: tuple -- index of the profession on the list and its name
+        """
+        if not self.professions:
+            return None, ""
+        profession_index = self.distributions[PROFESSION].draw_index(
+            rng or self.rng)
+        return profession_index, self.professions[profession_index]
+
+    def get_random_weapon(self, profession: str, rng=None):
+        """
+        Draw the weapons carried by the character.
+
+        :param profession: str -- profession of the character
+        :param rng: random.Random -- source of randomness, self.rng if None
+        :return: str
+        """
+        code = self.model.profession_codes.get(profession)
+        return self.loot.roll(WEAPONS, code, rng or self.rng)
+
+    def new_character(self, locks=(), base: Character = None,
+                      traits: tuple = None, rng=None, allocator=None):
+        """
+        Randomize every attribute of the character, except these locked,
+        which are copied from the base record, exactly as unchecked
+        "randomize" checkboxes in the application work.
+
+        :param locks: iterable -- categories which should not be randomized:
+         ETHNICITY, SEX, AGE, HEIGHT, WEIGHT, PROFESSION, ARMED
+        :param base: Character -- record providing values of locked
+         categories, if only a band is given (e.g. AGE without years), exact
+         value is drawn
+        :param traits: tuple -- age, years, height, centimeters, weight and
+         kilograms drawn in advance, used instead of drawing them one-by-one
+        :param rng: random.Random -- source of randomness, self.rng if None
+        :param allocator: UniqueNameAllocator -- if provided, full names are
+         allocated by it and never repeat
+        :return: Character -- new character record
+        """
+        rng, model = rng or self.rng, self.model
+        # stages are timed only if instrumentation is enabled:
+        timing = instrumentation.ENABLED
+        if timing:
+            started = perf_counter()
+        character = Character()
+        if base is not None:
+            for category in locks:
+                for field in LOCKED_FIELDS[category]:
+                    setattr(character, field, getattr(base, field))
+
+        # attributes are drawn in model.SAMPLING_ORDER, as each of them could
+        # depend on these drawn before:
+        if ETHNICITY not in locks:
+            character.ethnicity = model.ethnicity.draw(rng)
+        if SEX not in locks:
+            character.sex = model.sex.draw(rng)
+        if timing:
+            started = instrumentation.record("ethnicity_sex", started)
+        if traits is not None:
+            (character.age, character.years, character.height,
+             character.centimeters, character.weight,
+             character.kilograms) = traits
+            offset = model.height_offset(character.sex, character.ethnicity)
+            character.centimeters += offset
+            character.kilograms += offset
+        else:
+            self.randomize_body(character, locks, rng)
+        if timing:
+            started = instrumentation.record("body", started)
+        if PROFESSION not in locks:
+            profession_code, character.profession = model.draw_profession(
+                character.age, rng)
+        else:
+            profession_code = model.profession_codes.get(character.profession)
+        if timing:
+            started = instrumentation.record("profession", started)
+        if ARMED not in locks:
+            character.weapons = self.loot.roll(
+                WEAPONS, profession_code, rng) \
+                if model.is_armed(profession_code, rng) else ""
+        if timing:
+            started = instrumentation.record("weapon", started)
+        character.clothes = self.loot.roll(CLOTHES, profession_code, rng)
+        character.pockets = self.loot.roll(POCKETS, profession_code, rng)
+        if timing:
+            started = instrumentation.record("loot", started)
+        if allocator is not None:
+            character.name, character.surname = allocator.allocate(
+                character.ethnicity, character.sex)
+        else:
+            character.name = self.name_generator(character.ethnicity,
+                                                 character.sex, rng)
+            character.surname = self.surname_generator(character.ethnicity,
+                                                       rng)
+        if timing:
+            instrumentation.record("names", started)
+        return character
+
+    def randomize_body(self, character: Character, locks=(), rng=None):
+        """
+        Draw age, height and weight of the character, except these locked.
+
+        :param character: Character -- character record to be updated
+        :param locks: iterable -- categories which should not be randomized
+        :param rng: random.Random -- source of randomness, self.rng if None
+        """
+        rng, model = rng or self.rng, self.model
+        if AGE not in locks:
+            character.age = model.age.draw(rng)
+        if AGE not in locks or not character.years:
+            character.years = random_gaussian(character.age, rng=rng)
+        if HEIGHT not in locks:
+            character.height = model.height.draw(rng)
+        if HEIGHT not in locks or not character.centimeters:
+            character.centimeters = self.random_centimeters(
+                character.height, character.sex, character.ethnicity, rng)
+        if WEIGHT not in locks:
+            character.weight = model.weight.draw(rng)
+        if WEIGHT not in locks or not character.kilograms:
+            character.kilograms = random_gaussian(
+                character.weight, character.centimeters, rng)
+
+    def random_centimeters(self, height: str, sex: str, ethnicity: str,
+                           rng=None):
+        """
+        Draw height in cm of the character of the height category, shifted
+        by the offset of its sex and ethnicity in the model.
+
+        :param height: str -- SHORT, AVERAGE or TALL
+        :param sex: str -- sex of the character
+        :param ethnicity: str -- ethnicity of the character
+        :param rng: random.Random -- source of randomness, self.rng if None
+        :return: int
+        """
+        return random_gaussian(height, rng=rng or self.rng) + \
+            self.model.height_offset(sex, ethnicity)
+
+    def generate(self, n: int, locks=(), base: Character = None,
+                 allocator=None):
+        """
+        Generate batch of characters. If NumPy is available and body traits
+        are not locked, they are drawn for the whole batch at once.
+
+        :param n: int -- number of characters to generate
+        :param locks: iterable -- categories which should not be randomized
+        :param base: Character -- record providing values of locked
+         categories
+        :param allocator: UniqueNameAllocator -- if provided, full names are
+         allocated by it and never repeat
+        :return: list -- of Character records
+        """
+        locks = frozenset(locks)
+        if not NUMPY_AVAILABLE or locks & BODY:
+            return [self.new_character(locks, base, allocator=allocator)
+                    for _ in range(n)]
+        with instrumentation.measured("batch_traits"):
+            body = sample_traits(n, self.rng.getrandbits(64),
+                                 self.distributions)
+        body = zip(*(
+            [AGES[i] for i in body["age"].tolist()],
+            body["years"].tolist(),
+            [HEIGHTS[i] for i in body["height"].tolist()],
+            body["centimeters"].tolist(),
+            [WEIGHTS[i] for i in body["weight"].tolist()],
+            body["kilograms"].tolist()))
+        return [self.new_character(locks, base, traits, allocator=allocator)
+                for traits in body]
+
+    def character_at(self, seed: int, index: int, locks=(),
+                     base: Character = None):
+        """
+        Recompute index-th character of the population of the seed in O(1).
+        The same (seed, index) pair always gives the same character, as long
+        as banks, distributions, locks and base do not change.
+
+        :param seed: int -- 64-bit seed of the population
+        :param index: int -- index of the character in the population
+        :param locks: iterable -- categories which should not be randomized
+        :param base: Character -- record providing values of locked
+         categories
+        :return: Character
+        """
+        return self.new_character(locks, base,
+                                  rng=character_random(seed, index))
+
+    def generate_range(self, seed: int, start: int, n: int, locks=(),
+                       base: Character = None):
+        """
+        Generate characters of indexes from start to start + n of the
+        population of the seed, each one the same as from character_at().
+
+        :param seed: int -- 64-bit seed of the population
+        :param start: int -- index of the first character
+        :param n: int -- number of characters
+        :param locks: iterable -- categories which should not be randomized
+        :param base: Character -- record providing values of locked
+         categories
+        :return: list -- of Character records
+        """
+        locks = frozenset(locks)
+        return [self.new_character(locks, base,
+                                   rng=character_random(seed, i))
+                for i in range(start, start + n)]
+
+    def unique_names(self, seed: int = None):
+        """
+        Create allocator of unique full names from the banks of generator,
+        e.g. to populate a town in which no two characters share full name.
+
+        :param seed: int -- seed of the order of the names, drawn if None
+        :return: UniqueNameAllocator
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        return UniqueNameAllocator(self.names, self.surnames, seed)
@@ -0,0 +1,161 @@
+"""
+Lightweight instrumentation of the stages of the generation: call counts,
+cumulative times and percentiles of each stage. It is off by default and
+then costs one check of a flag for each stage. Optional cProfile hook could
+wrap batch runs when more detail is needed.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import sys
+import random
+import cProfile
+import threading
+from time import perf_counter
+from contextlib import contextmanager
+
+# checked by the instrumented code, use enable() and disable() to set it:
+ENABLED = False
+# number of durations kept for each stage to compute percentiles:
+SAMPLES = 10000
+PERCENTILES = (50, 90, 99)
+
+_lock = threading.Lock()
+_stages = {}  # {stage: StageStats}
+
+
+class StageStats:
+    """Number of calls, total time and sample of durations of one stage."""
+
+    __slots__ = ("count", "total", "samples", "rng")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = []
+        # own generator, as draws of the global one would change characters
+        # generated with it when stats are collected:
+        self.rng = random.Random()
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        if len(self.samples) < SAMPLES:
+            self.samples.append(duration)
+        else:  # reservoir sampling keeps the sample uniform:
+            index = self.rng.randrange(self.count)
+            if index < SAMPLES:
+                self.samples[index] = duration
+
+    def percentile(self, percent: float):
+        """Return duration longer than percent of sampled durations."""
+        samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, len(samples) * percent // 100)]
+
+    def as_dict(self):
+        stats = {"count": self.count, "total": self.total,
+                 "mean": self.total / self.count if self.count else 0.0}
+        stats.update((f"p{percent}", self.percentile(percent))
+                     for percent in PERCENTILES)
+        return stats
+
+
+def enable():
+    """Start collecting stats of the stages."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    """Stop collecting stats, already collected are kept."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Forget all collected stats."""
+    with _lock:
+        _stages.clear()
+
+
+def record(stage: str, started: float):
+    """
+    Add duration of the stage which started at given time. Call it only if
+    ENABLED is True.
+
+    :param stage: str -- name of the stage
+    :param started: float -- perf_counter() at the start of the stage
+    :return: float -- perf_counter() now, start of the next stage
+    """
+    now = perf_counter()
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.add(now - started)
+    return now
+
+
+@contextmanager
+def measured(stage: str):
+    """Record duration of the with-block as the stage, if ENABLED."""
+    if not ENABLED:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, started)
+
+
+def stats():
+    """
+    Return collected stats.
+
+    :return: dict -- {stage: {"count", "total", "mean", "p50", ...}}, times
+     in seconds
+    """
+    with _lock:
+        return {stage: stats.as_dict() for stage, stats in _stages.items()}
+
+
+def report(file=sys.stderr):
+    """Print collected stats as table, times in microseconds."""
+    header = f"{'stage':<20}{'count':>10}{'total ms':>12}{'mean us':>10}" + \
+             "".join(f"{f'p{p} us':>10}" for p in PERCENTILES)
+    print(header, file=file)
+    for stage, stage_stats in sorted(stats().items(),
+                                     key=lambda item: -item[1]["total"]):
+        print(f"{stage:<20}{stage_stats['count']:>10}"
+              f"{stage_stats['total'] * 1e3:>12.1f}"
+              f"{stage_stats['mean'] * 1e6:>10.2f}" +
+              "".join(f"{stage_stats[f'p{p}'] * 1e6:>10.2f}"
+                      for p in PERCENTILES), file=file)
+
+
+@contextmanager
+def profiled(file_path: str = None):
+    """
+    Run the with-block under cProfile. Stats are saved to the file, which
+    could be read by pstats or snakeviz, or printed if file_path is None.
+
+    :param file_path: str -- path to the output file
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if file_path is not None:
+            profile.dump_stats(file_path)
+        else:
+            profile.print_stats("cumulative")
@@ -0,0 +1,272 @@
+"""
+Library of the saved characters in local SQLite database. Characters are
+identified by their row id, so characters with the same names do not
+overwrite each other, and could be queried by indexed categories and names
+page by page, instead of listing directory of txt files. Characters saved
+or imported with their sheets are also found by path of the sheet, so
+saving or importing the sheet again updates its character instead of adding
+a new one.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import sqlite3
+from itertools import islice
+
+from generator.categories import PATH
+from generator.character import Character, CHARACTER_FIELDS, NUMERIC_FIELDS
+from generator.sheets import read_sheets, IMPORT_WORKERS
+
+LIBRARY_PATH = PATH + "/characters/library.sqlite3"
+MEMORY = ":memory:"
+PAGE_SIZE = 100
+INSERT_BATCH_SIZE = 10000
+INDEXES = {"ethnicity": ("ethnicity",),
+           "sex": ("sex",),
+           "age": ("age",),
+           "profession": ("profession",),
+           "full_name": ("name", "surname")}
+SCHEMA = "CREATE TABLE IF NOT EXISTS characters (id INTEGER PRIMARY KEY, " + \
+         ", ".join(f"{field} INTEGER NOT NULL" if field in NUMERIC_FIELDS
+                   else f"{field} TEXT NOT NULL" for field in
+                   CHARACTER_FIELDS) + ");\n" + \
+         "".join(f"CREATE INDEX IF NOT EXISTS characters_{name} ON "
+                 f"characters ({', '.join(columns)});\n"
+                 for name, columns in INDEXES.items()) + \
+         "CREATE TABLE IF NOT EXISTS sheets (path TEXT PRIMARY KEY, " \
+         "id INTEGER NOT NULL);\n" \
+         "CREATE INDEX IF NOT EXISTS sheets_id ON sheets (id);\n"
+INSERT = f"INSERT INTO characters ({', '.join(CHARACTER_FIELDS)}) VALUES " \
+         f"({', '.join('?' * len(CHARACTER_FIELDS))})"
+UPDATE = f"UPDATE characters SET " \
+         f"{', '.join(field + ' = ?' for field in CHARACTER_FIELDS)} " \
+         f"WHERE id = ?"
+SELECT = f"SELECT id, {', '.join(CHARACTER_FIELDS)} FROM characters"
+
+
+class CharacterLibrary:
+    """SQLite database of the characters."""
+
+    def __init__(self, path: str = LIBRARY_PATH):
+        """
+        Open the database, creating it if it does not exist.
+
+        :param path: str -- path to the database file, or MEMORY
+        """
+        if path != MEMORY:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, character: Character):
+        """
+        Save the character in the library.
+
+        :param character: Character
+        :return: int -- id of the character
+        """
+        with self.connection:
+            return self.connection.execute(INSERT,
+                                           character.as_tuple()).lastrowid
+
+    def save(self, character: Character, sheet: str):
+        """
+        Save the character of the sheet file, replacing character saved
+        previously with the same sheet.
+
+        :param character: Character
+        :param sheet: str -- path to the sheet file of the character
+        :return: int -- id of the character
+        """
+        with self.connection:
+            return self._save(character, sheet)
+
+    def save_many(self, sheets, batch_size: int = INSERT_BATCH_SIZE):
+        """
+        Save characters of the sheet files, each batch of them in one
+        transaction, see save().
+
+        :param sheets: iterable -- of (path, Character) tuples
+        :param batch_size: int -- number of characters saved at once
+        :return: int -- number of saved characters
+        """
+        sheets = iter(sheets)
+        count = 0
+        while True:
+            batch = list(islice(sheets, batch_size))
+            if not batch:
+                return count
+            with self.connection:
+                for sheet, character in batch:
+                    self._save(character, sheet)
+            count += len(batch)
+
+    def _save(self, character: Character, sheet: str):
+        sheet = os.path.abspath(sheet)
+        row = self.connection.execute(
+            "SELECT id FROM sheets WHERE path = ?", (sheet,)).fetchone()
+        if row is not None:
+            self.connection.execute(UPDATE, character.as_tuple() + (row[0],))
+            return row[0]
+        id_ = self.connection.execute(INSERT, character.as_tuple()).lastrowid
+        self.connection.execute("INSERT INTO sheets (path, id) VALUES (?, ?)",
+                                (sheet, id_))
+        return id_
+
+    def add_many(self, characters, batch_size: int = INSERT_BATCH_SIZE):
+        """
+        Save all the characters, each batch of them in one transaction.
+
+        :param characters: iterable -- of Character records
+        :param batch_size: int -- number of characters inserted at once
+        :return: int -- number of saved characters
+        """
+        rows = (character.as_tuple() for character in characters)
+        count = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return count
+            with self.connection:
+                self.connection.executemany(INSERT, batch)
+            count += len(batch)
+
+    def get(self, id_: int):
+        """
+        Return character of the id.
+
+        :param id_: int
+        :return: Character
+        :raises KeyError: if there is no character of the id
+        """
+        row = self.connection.execute(SELECT + " WHERE id = ?",
+                                      (id_,)).fetchone()
+        if row is None:
+            raise KeyError(id_)
+        return Character(*row[1:])
+
+    def remove(self, id_: int):
+        """Delete character of the id from the library."""
+        with self.connection:
+            self.connection.execute("DELETE FROM characters WHERE id = ?",
+                                    (id_,))
+            self.connection.execute("DELETE FROM sheets WHERE id = ?",
+                                    (id_,))
+
+    def count(self, **conditions):
+        """
+        Count characters matching all the conditions.
+
+        :param conditions: see query()
+        :return: int
+        """
+        where, parameters = self._where(conditions)
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM characters" + where,
+            parameters).fetchone()[0]
+
+    def query(self, page_size: int = PAGE_SIZE, after: int = 0, **conditions):
+        """
+        Return one page of the characters matching all the conditions, in
+        order of their ids. Next page starts after the last id of the
+        previous one, so each page is found in the index, without scanning
+        all the previous pages.
+
+        :param page_size: int -- maximum number of the characters
+        :param after: int -- id of the last character of previous page
+        :param conditions: field=value for text fields, field=(values, ...)
+         to match any of the values, field=(minimum, maximum) for
+         NUMERIC_FIELDS, where minimum is inclusive, maximum exclusive and
+         None means no limit
+        :return: list -- of (id, Character) tuples
+        """
+        where, parameters = self._where(conditions, after)
+        rows = self.connection.execute(
+            SELECT + where + " ORDER BY id LIMIT ?", parameters + [page_size])
+        return [(row[0], Character(*row[1:])) for row in rows]
+
+    def pages(self, page_size: int = PAGE_SIZE, **conditions):
+        """
+        Yield all the pages of the characters matching the conditions.
+
+        :param page_size: int -- maximum number of the characters in a page
+        :param conditions: see query()
+        """
+        after = 0
+        while True:
+            page = self.query(page_size, after, **conditions)
+            if not page:
+                return
+            yield page
+            after = page[-1][0]
+
+    @staticmethod
+    def _where(conditions: dict, after: int = 0):
+        clauses, parameters = [], []
+        if after:
+            clauses.append("id > ?")
+            parameters.append(after)
+        for field, condition in conditions.items():
+            if field not in CHARACTER_FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+            if field in NUMERIC_FIELDS:
+                minimum, maximum = condition
+                if minimum is not None:
+                    clauses.append(f"{field} >= ?")
+                    parameters.append(minimum)
+                if maximum is not None:
+                    clauses.append(f"{field} < ?")
+                    parameters.append(maximum)
+            elif isinstance(condition, (tuple, list, set, frozenset)):
+                condition = tuple(condition)
+                clauses.append(
+                    f"{field} IN ({', '.join('?' * len(condition))})")
+                parameters.extend(condition)
+            else:
+                clauses.append(f"{field} = ?")
+                parameters.append(condition)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, parameters
+
+    def import_sheets(self, directory: str, workers: int = IMPORT_WORKERS,
+                      on_error=None):
+        """
+        Save in the library characters from all the txt sheets found in the
+        directory tree. Sheets which could not be read are skipped, sheets
+        imported or saved before replace their characters, see save().
+
+        :param directory: str -- path to the directory with the sheets
+        :param workers: int -- number of threads reading the sheets
+        :param on_error: callable -- called with path and exception of each
+         skipped sheet
+        :return: int -- number of imported characters
+        """
+        def sheets():
+            for path, result in read_sheets(directory, workers):
+                if isinstance(result, Exception):
+                    if on_error is not None:
+                        on_error(path, result)
+                else:
+                    yield path, result
+        return self.save_many(sheets())
@@ -0,0 +1,228 @@
+"""
+Loot tables equipping characters with weapons, clothes and pocket items.
+Tables are loaded from the config file and compiled once into a flat list of
+alias-sampled tables referring to each other by indexes, so equipping a
+character costs a few table draws, no matter how big the tables are.
+
+Config file has one section with "TABLE = [entry: weight, ...]" rules, where
+entry is one or more parts joined with " + ", all given together, and each
+part is an item, "@TABLE" reference to other table or NONE. Part could have
+quantity range, e.g. "coins x1-20" or "@POCKET_ITEM x1-3", drawing the
+table so many times. Tables of WEAPONS, CLOTHES and POCKETS could be given
+separately for the professions as "WEAPONS | soldier = [...]", e.g.:
+
+    CLOTHES = [@HEAD + @TORSO + @LEGS + @FEET]
+    HEAD = [NONE: 6, cap: 2, hat: 1]
+    POCKETS = [@POCKET_ITEM x1-3: 4, NONE: 1]
+    WEAPONS | soldier = [@RIFLE + @PISTOL: 2, @RIFLE: 3]
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import re
+
+from config_loader.config_loader import load_config_from_file
+from generator.categories import *
+from generator.distributions import AliasTable
+
+LOOT_FILE = "loot.txt"
+CONDITION = "|"
+REFERENCE = "@"
+BUNDLE = " + "
+NO_ITEM = "NONE"
+# tables built from the weapon banks, pistols.txt and rifles.txt:
+PISTOL, RIFLE = "PISTOL", "RIFLE"
+LOOT_CATEGORIES = (WEAPONS, CLOTHES, POCKETS)
+# items of the category are joined with the separator:
+SEPARATORS = {WEAPONS: "\n\n", CLOTHES: ", ", POCKETS: ", "}
+# rules used if config file does not exist, as before loot tables:
+DEFAULT_RULES = {(WEAPONS, None): [(((PISTOL, True, 1, 1),
+                                     (RIFLE, True, 1, 1)), 1.0)]}
+PART = re.compile(r"^(@?)(.+?)(?: x(\d+)(?:-(\d+))?)?$")
+
+
+def parse_part(text: str):
+    """
+    Parse one part of the entry, e.g. "coins x1-20" or "@HEAD".
+
+    :return: tuple -- name, if it is reference, minimum and maximum quantity,
+     or None for NONE
+    """
+    text = text.strip()
+    if text == NO_ITEM:
+        return None
+    reference, name, minimum, maximum = PART.match(text).groups()
+    minimum = int(minimum) if minimum else 1
+    maximum = int(maximum) if maximum else minimum
+    if minimum > maximum:
+        raise ValueError(f"Invalid quantity range of {text}")
+    return name.strip(), bool(reference), minimum, maximum
+
+
+def parse_entries(entries):
+    """
+    Parse entries of the table, such as "@RIFLE + @PISTOL: 2".
+
+    :param entries: list -- of "PART + PART: weight" strings
+    :return: list -- of (parts, weight) tuples
+    """
+    parsed = []
+    for entry in entries:
+        entry = str(entry).strip()
+        if not entry:
+            continue
+        text, separator, weight = entry.rpartition(":")
+        try:
+            weight = float(weight) if separator else None
+        except ValueError:  # colon is a part of the item name
+            weight = None
+        if weight is None:
+            text, weight = entry, 1.0
+        parts = tuple(part for part in map(parse_part, text.split(BUNDLE))
+                      if part is not None)
+        parsed.append((parts, weight))
+    return parsed
+
+
+def load_loot(file_name: str = LOOT_FILE, file_path: str = None):
+    """
+    Load rules of the loot tables from the config file.
+
+    :param file_name: str -- name of the file in config_files directory
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: dict -- {(table, profession): [(parts, weight), ...]}, where
+     profession is None for tables common to all professions
+    """
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    if not os.path.isfile(file_path + file_name):
+        return dict(DEFAULT_RULES)
+    [section] = load_config_from_file(file_path, file_name)
+    rules = {}
+    for key, entries in section.items():
+        table, _, profession = key.partition(CONDITION)
+        rules[(table.strip(), profession.strip().lower() or None)] = \
+            parse_entries(entries if isinstance(entries, list) else [entries])
+    return rules
+
+
+class LootTables:
+    """
+    Compiled loot tables. Each table is an AliasTable of the entries, each
+    entry a tuple of parts: (item or index of the table, is it a table,
+    minimum, maximum).
+    """
+
+    def __init__(self, rules: dict, professions=(), pistols=(), rifles=()):
+        """
+        :param rules: dict -- {(table, profession): [(parts, weight), ...]}
+        :param professions: list -- all the professions, codes of which are
+         used to find their tables
+        :param pistols: list -- names of the small guns, PISTOL table
+        :param rifles: list -- names of the long weapons, RIFLE table
+        """
+        rules = dict(rules)
+        for name, items in ((PISTOL, pistols), (RIFLE, rifles)):
+            if (name, None) not in rules:
+                rules[(name, None)] = [(((item, False, 1, 1),), 1.0)
+                                       for item in items]
+        self.names = list(rules)
+        self.indexes = {key: index for index, key in enumerate(self.names)}
+        self.tables = [self._compile(rules[key], key) for key in self.names]
+        self._check_cycles()
+        # index of the table of the category at [profession code], the last
+        # one for unknown profession:
+        self.by_profession = {}
+        for category in LOOT_CATEGORIES:
+            default = self.indexes.get((category, None))
+            self.by_profession[category] = [
+                self.indexes.get((category, p.lower()), default)
+                for p in professions] + [default]
+
+    def _compile(self, entries, key):
+        entries = [(tuple(self._resolve(part, key) for part in parts), weight)
+                   for parts, weight in entries if weight > 0]
+        if not entries:
+            return None
+        return AliasTable([parts for parts, _ in entries],
+                          [weight for _, weight in entries])
+
+    def _resolve(self, part, key):
+        name, reference, minimum, maximum = part
+        if not reference:
+            return name, False, minimum, maximum
+        if (name, None) not in self.indexes:
+            raise ValueError(f"Loot table {key[0]} refers to unknown "
+                             f"table {name}")
+        return self.indexes[(name, None)], True, minimum, maximum
+
+    def _check_cycles(self):
+        visiting, done = set(), set()
+
+        def visit(index):
+            if index in done:
+                return
+            if index in visiting:
+                raise ValueError(f"Loot table {self.names[index][0]} refers "
+                                 f"to itself")
+            visiting.add(index)
+            table = self.tables[index]
+            for parts in table.values if table is not None else ():
+                for target, reference, _, _ in parts:
+                    if reference:
+                        visit(target)
+            visiting.discard(index)
+            done.add(index)
+
+        for index in range(len(self.tables)):
+            visit(index)
+
+    def roll_table(self, index: int, rng, items: list):
+        """
+        Draw one entry of the table and append its items to the list.
+
+        :param index: int -- index of the table
+        :param rng: random.Random -- source of randomness
+        :param items: list -- of (item, quantity) tuples to be extended
+        """
+        table = self.tables[index]
+        if table is None:
+            return
+        for target, reference, minimum, maximum in table.draw(rng):
+            quantity = minimum if minimum == maximum else \
+                rng.randint(minimum, maximum)
+            if reference:
+                for _ in range(quantity):
+                    self.roll_table(target, rng, items)
+            else:
+                items.append((target, quantity))
+
+    def roll(self, category: str, profession_code: int, rng):
+        """
+        Draw items of the category for the character of the profession.
+
+        :param category: str -- WEAPONS, CLOTHES or POCKETS
+        :param profession_code: int -- index of the profession, None if it
+         is unknown
+        :param rng: random.Random -- source of randomness
+        :return: str -- names of the items joined with the SEPARATORS, each
+         item once, with total quantity if more than one was drawn, e.g.
+         "rifle magazine ×3"
+        """
+        tables = self.by_profession[category]
+        index = tables[-1 if profession_code is None else profession_code]
+        if index is None:
+            return ""
+        items = []
+        self.roll_table(index, rng, items)
+        totals = {}  # items drawn by many entries are summed, in draw order
+        for item, quantity in items:
+            totals[item] = totals.get(item, 0) + quantity
+        return SEPARATORS[category].join(
+            [item if quantity == 1 else f"{item} ×{quantity}"
+             for item, quantity in totals.items()])
@@ -0,0 +1,200 @@
+"""
+Synthesis of new names with character-level Markov chains. For each pool of
+the bank (e.g. CHINESE FEMALE names) the chain is trained on its names: the
+next letter is drawn according to how often it followed previous ORDER
+letters in the pool. If these letters were followed by less than
+MIN_CHOICES letters, shorter context is used instead, otherwise small pools
+would only repeat their names. Names already in the bank are rejected, so
+only new ones are returned.
+
+Trained transitions are cached on disk with hash of the source text file,
+and reused until the file changes. Each context is compiled into AliasTable
+when it is used first time, so drawing a name costs one O(1) draw per letter.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import marshal
+import hashlib
+from collections import Counter
+
+from generator.distributions import AliasTable
+from generator.name_pool import CACHE_PATH, KEY_SEPARATOR, pool_key
+
+MARKOV_VERSION = 1
+MARKOV_EXTENSION = ".markov"
+ORDER = 3  # maximum number of previous letters deciding the next one
+MIN_CHOICES = 2  # shorter context is used if there are fewer next letters
+NAME_LENGTHS = (3, 12)  # minimum and maximum length of synthesized names
+MAX_ATTEMPTS = 50  # drawn names rejected before falling back to the bank
+BOUNDARY = "\n"  # pads start of the name and ends it, never part of a name
+
+
+def file_hash(file_path: str):
+    """Return SHA-256 hex digest of the content of the file."""
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def train(names, order: int = ORDER):
+    """
+    Count which letters follow each context of 1 to order letters in the
+    names.
+
+    :param names: iterable -- of str
+    :param order: int -- maximum length of the contexts
+    :return: dict -- {context: (next letters, their counts)}
+    """
+    counters = {}
+    for name in names:
+        for length in range(1, order + 1):
+            padded = BOUNDARY * length + name + BOUNDARY
+            for i in range(len(name) + 1):
+                context = padded[i:i + length]
+                if context not in counters:
+                    counters[context] = Counter()
+                counters[context][padded[i + length]] += 1
+    return {context: ("".join(counter), list(counter.values()))
+            for context, counter in counters.items()}
+
+
+class MarkovChain:
+    """
+    Compiled transitions of one pool.
+    """
+
+    def __init__(self, transitions: dict, order: int = ORDER):
+        """
+        :param transitions: dict -- {context: (next letters, their counts)},
+         see train()
+        :param order: int -- maximum length of the contexts
+        """
+        self.order = order
+        self.transitions = transitions
+        self.tables = {}  # {context: AliasTable} compiled on first use
+
+    def next_table(self, name: str):
+        """
+        Return table of the letters following the longest end of the name
+        with at least MIN_CHOICES of them.
+
+        :param name: str -- padded with order BOUNDARY characters
+        :return: AliasTable
+        """
+        transitions = self.transitions
+        for length in range(self.order, 0, -1):
+            context = name[-length:]
+            if context in transitions and (
+                    length == 1 or
+                    len(transitions[context][0]) >= MIN_CHOICES):
+                break
+        table = self.tables.get(context)
+        if table is None:
+            letters, counts = transitions[context]
+            table = self.tables[context] = AliasTable(letters, counts)
+        return table
+
+    def draw(self, rng, max_length: int):
+        """
+        Draw letters until the end of the name.
+
+        :param rng: random.Random -- source of randomness
+        :param max_length: int -- drawing stops as soon as name gets longer
+        :return: str -- or None if name got too long
+        """
+        order = self.order
+        name = BOUNDARY * order
+        while True:
+            letter = self.next_table(name).draw(rng)
+            if letter == BOUNDARY:
+                return name[order:]
+            name += letter
+            if len(name) - order > max_length:
+                return None
+
+
+class NameSynthesizer:
+    """
+    Markov chains of all the pools of the bank, drawing names not present
+    in the bank.
+    """
+
+    def __init__(self, pool, source_file: str = None, order: int = ORDER,
+                 lengths: tuple = NAME_LENGTHS, cache_path: str = None):
+        """
+        :param pool: NamePool -- bank of names the chains are trained on
+        :param source_file: str -- path of the text file of the bank, if
+         given, trained transitions are cached and reused until it changes
+        :param order: int -- maximum number of previous letters deciding the
+         next one
+        :param lengths: tuple -- minimum and maximum length of the names
+        :param cache_path: str -- directory of the cache, CACHE_PATH default
+        """
+        self.pool = pool
+        self.order = order
+        self.min_length, self.max_length = lengths
+        cache_path = cache_path if cache_path is not None else CACHE_PATH
+        transitions = None
+        if source_file is not None:
+            name = os.path.splitext(os.path.basename(source_file))[0]
+            cache_file = f"{cache_path}{name}.{order}{MARKOV_EXTENSION}"
+            source_hash = file_hash(source_file)
+            transitions = self.load_cache(cache_file, source_hash)
+        if transitions is None:
+            transitions = {key: train(pool.names(*key.split(KEY_SEPARATOR)),
+                                      order) for key in pool.pools}
+            if source_file is not None:
+                self.save_cache(cache_file, source_hash, transitions)
+        self.chains = {key: MarkovChain(pool_transitions, order) for
+                       key, pool_transitions in transitions.items()}
+
+    def load_cache(self, cache_file: str, source_hash: str):
+        """
+        :return: dict -- cached transitions, None if cache is missing or was
+         trained on other version of the source file
+        """
+        try:
+            with open(cache_file, "rb") as file:
+                # reading whole file at once is much faster than load(file):
+                version, hash_, order, transitions = marshal.loads(file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if (version, hash_, order) != (MARKOV_VERSION, source_hash,
+                                       self.order):
+            return None
+        return transitions
+
+    def save_cache(self, cache_file: str, source_hash: str,
+                   transitions: dict):
+        """Write the cache atomically, as compiled pools are written."""
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temporary_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            marshal.dump((MARKOV_VERSION, source_hash, self.order,
+                          transitions), file)
+        os.replace(temporary_file, cache_file)
+
+    def draw(self, rng, *key):
+        """
+        Synthesize name of the pool, which is not present in the bank. If
+        none is found in MAX_ATTEMPTS, name from the bank is drawn instead.
+
+        :param rng: random.Random -- source of randomness
+        :param key: str -- ethnicity and sex, or only ethnicity
+        :return: str
+        """
+        chain = self.chains[pool_key(*key)]
+        pool, min_length, max_length = self.pool, self.min_length, \
+            self.max_length
+        for _ in range(MAX_ATTEMPTS):
+            name = chain.draw(rng, max_length)
+            if name is not None and len(name) >= min_length and \
+                    pool.string_id(name) is None:
+                return name
+        return pool.draw(rng, *key)
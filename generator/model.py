@@ -0,0 +1,134 @@
+"""
+Conditional model of the attributes, making characters correlated: mean
+height depends on sex and ethnicity, profession on age and probability of
+being armed on profession. Rules are loaded from the config file and
+compiled once into flat lookup tables, in fixed SAMPLING_ORDER, so drawing
+an attribute is a table lookup indexed by codes of the attributes drawn
+before it.
+
+Config file has one section with "TARGET | CONDITION = [value: number]"
+rules, e.g.:
+
+    HEIGHT | FEMALE = [WHITE: -10, JAPANESE: -16]
+    PROFESSION | OLD = [retired: 5, student: 0]
+    ARMED = [DEFAULT: 0.4, soldier: 0.95]
+
+HEIGHT rules give offsets in cm of each ethnicity of the sex, PROFESSION
+rules multiply weights of the professions at the age and ARMED rule gives
+probability that character of the profession is armed.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+
+from config_loader.config_loader import load_config_from_file
+from generator.categories import *
+from generator.distributions import AliasTable, parse_weights
+
+MODEL_FILE = "model.txt"
+CONDITION = "|"
+DEFAULT = "DEFAULT"
+# each attribute could depend only on attributes drawn before it:
+SAMPLING_ORDER = (ETHNICITY, SEX, AGE, HEIGHT, WEIGHT, PROFESSION, ARMED)
+# probability of being armed, if config does not give any:
+ARMED_PROBABILITY = 1.0
+
+
+def load_model(file_name: str = MODEL_FILE, file_path: str = None):
+    """
+    Load rules of the conditional model from the config file.
+
+    :param file_name: str -- name of the file in config_files directory
+    :param file_path: str -- directory of the file, CONFIGS_PATH by default
+    :return: dict -- {(target, condition): {value: number}}, condition is
+     None for unconditional rules, empty if file does not exist
+    """
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    rules = {}
+    if os.path.isfile(file_path + file_name):
+        [section] = load_config_from_file(file_path, file_name)
+        for key, entries in section.items():
+            target, _, condition = key.partition(CONDITION)
+            rules[(target.strip(), condition.strip() or None)] = \
+                parse_weights(entries)
+    return rules
+
+
+class CompiledModel:
+    """
+    Flat lookup tables of the conditional model. Tables are indexed by codes
+    of the categories, which are their indexes in CATEGORIES.
+    """
+
+    def __init__(self, distributions: dict, rules: dict, professions=()):
+        """
+        :param distributions: dict -- {category: AliasTable} unconditional
+         distributions, see compile_distributions()
+        :param rules: dict -- {(target, condition): {value: number}}
+        :param professions: list -- all the professions
+        """
+        self.codes = {category: {value: code for code, value in
+                                 enumerate(values)}
+                      for category, values in CATEGORIES.items()}
+        self.ethnicity = distributions[ETHNICITY]
+        self.sex = distributions[SEX]
+        self.age = distributions[AGE]
+        self.height = distributions[HEIGHT]
+        self.weight = distributions[WEIGHT]
+        # cm added to the height, at [sex code * ethnicities + ethnicity code]:
+        self.height_offsets = [
+            int(rules.get((HEIGHT, sex), {}).get(ethnicity, 0))
+            for sex in SEXES for ethnicity in ETHNICITIES]
+        self.professions = list(professions)
+        self.profession_codes = {p: code for code, p in
+                                 enumerate(self.professions)}
+        # profession tables at [age code]:
+        self.professions_by_age = []
+        if self.professions:
+            weights = distributions[PROFESSION].weights
+            for age in AGES:
+                multipliers = {p.lower(): m for p, m in
+                               rules.get((PROFESSION, age), {}).items()}
+                self.professions_by_age.append(AliasTable(
+                    self.professions,
+                    [w * multipliers.get(p.lower(), 1)
+                     for p, w in zip(self.professions, weights)]))
+        armed = {p.lower(): chance for p, chance in
+                 rules.get((ARMED, None), {}).items()}
+        self.armed_default = armed.get(DEFAULT.lower(), ARMED_PROBABILITY)
+        # probability of being armed at [profession code]:
+        self.armed_probabilities = [armed.get(p.lower(), self.armed_default)
+                                    for p in self.professions]
+
+    def height_offset(self, sex: str, ethnicity: str):
+        """Return cm added to the mean height of the sex and ethnicity."""
+        sex_code = self.codes[SEX].get(sex)
+        ethnicity_code = self.codes[ETHNICITY].get(ethnicity)
+        if sex_code is None or ethnicity_code is None:
+            return 0
+        return self.height_offsets[sex_code * len(ETHNICITIES) +
+                                   ethnicity_code]
+
+    def draw_profession(self, age: str, rng):
+        """
+        Draw profession of the character of the age.
+
+        :return: tuple -- code of the profession and its name
+        """
+        if not self.professions_by_age:
+            return None, ""
+        code = self.professions_by_age[self.codes[AGE].get(age, 0)]\
+            .draw_index(rng)
+        return code, self.professions[code]
+
+    def is_armed(self, profession_code: int, rng):
+        """Draw if character of the profession carries weapons."""
+        probability = self.armed_default if profession_code is None else \
+            self.armed_probabilities[profession_code]
+        return rng.random() < probability
@@ -0,0 +1,361 @@
+"""
+Binary pools of names and surnames. Text banks from config_files are compiled
+once into a file made of a shared table of unique strings and, for each
+pool, an array of indexes into that table. The file is read through mmap and
+names are decoded only when drawn, so no per-name Python objects are kept in
+memory and names repeated in many pools (e.g. WHITE and BLACK) are stored
+once.
+
+Entries of the banks could have weights, e.g. "John: 3", duplicated entries
+of the same pool are merged into one entry.
+
+Layout of the pool file (little-endian):
+    header: MAGIC, version, source file mtime in ns, number of pools, number
+     of unique strings, number of indexes
+    directory: for each pool its key length, key, first index, size and first
+     weight (UNWEIGHTED if all names of the pool are equally probable)
+    strings: number of strings + 1 uint32 offsets of the strings in the blob
+    indexes: uint32 indexes of the strings of all the pools, each pool sorted
+    weights: float32 weight of each index of the weighted pools
+    blob: all the unique strings encoded in UTF-8 and sorted
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+from generator.categories import *
+from generator.distributions import AliasTable
+
+MAGIC = b"RCGP"
+POOL_VERSION = 2
+HEADER = struct.Struct("<4sIqIIII")
+POOL_ENTRY = struct.Struct("<III")
+UNWEIGHTED = 0xFFFFFFFF
+CACHE_PATH = CONFIGS_PATH + "cache/"
+KEY_SEPARATOR = ":"
+WEIGHT_SEPARATOR = ":"
+
+
+def pool_key(*key):
+    """Join ethnicity and sex (or only ethnicity) into the key of a pool."""
+    return KEY_SEPARATOR.join(key)
+
+
+def flatten_banks(banks: dict):
+    """
+    Convert nested dicts of names into dict of pools.
+
+    :param banks: dict -- {ethnicity: [names]} or {ethnicity: {sex: [names]}}
+    :return: dict -- {key: [names]}
+    """
+    pools = {}
+    for ethnicity, names in banks.items():
+        if isinstance(names, dict):
+            for sex, names_ in names.items():
+                pools[pool_key(ethnicity, sex)] = names_
+        else:
+            pools[pool_key(ethnicity)] = names
+    return pools
+
+
+def parse_entry(entry: str):
+    """
+    Split entry of the bank into name and its weight, 1 if not provided.
+
+    :param entry: str -- e.g. "John" or "John: 3"
+    :return: tuple -- name and float weight
+    """
+    name, separator, weight = entry.rpartition(WEIGHT_SEPARATOR)
+    try:
+        return name.strip(), float(weight)
+    except ValueError:
+        return entry.strip(), 1.0
+
+
+def serialize_pools(pools: dict, source_mtime: int = 0):
+    """
+    Convert names into bytes of the pool file.
+
+    :param pools: dict -- {key: [names]}
+    :param source_mtime: int -- mtime (ns) of the text file of the names
+    :return: bytes
+    """
+    parsed = {}
+    for key, entries in pools.items():
+        weights = {}
+        for entry in entries:
+            name, weight = parse_entry(entry)
+            if name:
+                weights[name] = weight  # duplicates do not skew the draw
+        parsed[key] = weights
+    strings = sorted({name for weights in parsed.values() for name in weights},
+                     key=lambda name: name.encode("utf-8"))
+    string_ids = {name: i for i, name in enumerate(strings)}
+
+    directory, offsets, blob = bytearray(), array("I", [0]), bytearray()
+    indexes, weights_ = array("I"), array("f")
+    for key, weights in parsed.items():
+        encoded_key = key.encode("utf-8")
+        names = sorted(weights, key=string_ids.get)
+        weighted = any(weight != 1.0 for weight in weights.values())
+        directory += struct.pack("<H", len(encoded_key)) + encoded_key
+        directory += POOL_ENTRY.pack(len(indexes), len(names),
+                                     len(weights_) if weighted else UNWEIGHTED)
+        indexes.extend(string_ids[name] for name in names)
+        if weighted:
+            weights_.extend(weights[name] for name in names)
+    for name in strings:
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+
+    header = HEADER.pack(MAGIC, POOL_VERSION, source_mtime, len(parsed),
+                         len(strings), len(indexes), len(weights_))
+    # arrays are aligned to 4 bytes:
+    padding = b"\0" * (-(len(header) + len(directory)) % 4)
+    return b"".join((header, directory, padding, offsets.tobytes(),
+                     indexes.tobytes(), weights_.tobytes(), blob))
+
+
+class NamePool:
+    """
+    Read-only pools of names, addressed by keys such as "WHITE:MALE" for names
+    or "WHITE" for surnames, sharing one table of unique strings.
+    """
+
+    def __init__(self, buffer):
+        """
+        Read the directory of the pools from the buffer.
+
+        :param buffer: bytes or mmap -- content of the pool file
+        """
+        self.buffer = buffer
+        view = memoryview(buffer)
+        magic, version, self.source_mtime, n_pools, n_strings, n_indexes, \
+            n_weights = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != POOL_VERSION:
+            raise ValueError("Not a names pool or pool version is outdated")
+        self.pools = {}
+        position = HEADER.size
+        for _ in range(n_pools):
+            [length] = struct.unpack_from("<H", view, position)
+            position += 2
+            key = bytes(view[position:position + length]).decode("utf-8")
+            position += length
+            self.pools[key] = POOL_ENTRY.unpack_from(view, position)
+            position += POOL_ENTRY.size
+        position += -position % 4
+        sections = []
+        for length, format_ in ((n_strings + 1, "I"), (n_indexes, "I"),
+                                (n_weights, "f")):
+            sections.append(view[position:position + 4 * length].cast(format_))
+            position += 4 * length
+        self.offsets, self.indexes, self.weights = sections
+        self.blob = view[position:]
+        self.n_strings = n_strings
+        self.alias_tables = {}
+
+    @classmethod
+    def from_banks(cls, banks: dict):
+        """
+        Build pool in memory, e.g. from banks of names loaded by other means.
+
+        :param banks: dict -- {ethnicity: [names]} or {ethnicity: {sex:
+         [names]}}
+        :return: NamePool
+        """
+        return cls(serialize_pools(flatten_banks(banks)))
+
+    @classmethod
+    def from_file(cls, file_path: str):
+        """
+        Map the pool file into memory.
+
+        :param file_path: str -- absolute path to the pool file
+        :return: NamePool
+        """
+        with open(file_path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        """Return number of unique strings shared by all the pools."""
+        return self.n_strings
+
+    def __contains__(self, key: str):
+        return key in self.pools
+
+    def __getitem__(self, string_id: int):
+        """Decode the string of required index in the strings table."""
+        offsets = self.offsets
+        return str(self.blob[offsets[string_id]:offsets[string_id + 1]],
+                   "utf-8")
+
+    def string_id(self, name: str):
+        """
+        Find index of the string in the strings table with binary search.
+
+        :param name: str
+        :return: int -- index or None if name is not in any pool
+        """
+        encoded, offsets, blob = name.encode("utf-8"), self.offsets, self.blob
+        low, high = 0, self.n_strings
+        while low < high:
+            middle = (low + high) // 2
+            if blob[offsets[middle]:offsets[middle + 1]].tobytes() < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.n_strings and self[low] == name:
+            return low
+        return None
+
+    def pool_indexes(self, *key):
+        """
+        Return indexes of the strings of the pool.
+
+        :param key: str -- ethnicity and sex, or only ethnicity
+        :return: memoryview -- of uint32, sorted
+        """
+        first, size, first_weight = self.pools[pool_key(*key)]
+        return self.indexes[first:first + size]
+
+    def size(self, *key):
+        """Return number of names in the pool."""
+        return self.pools[pool_key(*key)][1]
+
+    def names(self, *key):
+        """
+        Iterate over all the names of the pool.
+
+        :param key: str -- ethnicity and sex, or only ethnicity
+        """
+        return (self[i] for i in self.pool_indexes(*key))
+
+    def contains(self, name: str, *key):
+        """
+        Check if name belongs to the pool without decoding the whole pool.
+
+        :param name: str
+        :param key: str -- ethnicity and sex, or only ethnicity
+        :return: bool
+        """
+        string_id = self.string_id(name)
+        return string_id is not None and self.contains_id(string_id, *key)
+
+    def contains_id(self, string_id: int, *key):
+        """
+        Check if string of the index in the strings table belongs to the pool.
+
+        :param string_id: int
+        :param key: str -- ethnicity and sex, or only ethnicity
+        :return: bool
+        """
+        indexes = self.pool_indexes(*key)
+        i = bisect_left(indexes, string_id)
+        return i < len(indexes) and indexes[i] == string_id
+
+    def draw(self, rng, *key):
+        """
+        Draw random name from the pool, according to weights of the names.
+
+        :param rng: random.Random -- source of randomness
+        :param key: str -- ethnicity and sex, or only ethnicity
+        :return: str
+        """
+        key = pool_key(*key)
+        first, size, first_weight = self.pools[key]
+        if first_weight != UNWEIGHTED:
+            if key not in self.alias_tables:
+                self.alias_tables[key] = AliasTable(
+                    range(size),
+                    self.weights[first_weight:first_weight + size])
+            return self[self.indexes[first +
+                                     self.alias_tables[key].draw_index(rng)]]
+        return self[self.indexes[first + rng.randrange(size)]]
+
+    def close(self):
+        """
+        Release the memory views and unmap the file. If views returned by
+        pool_indexes() are still alive, file stays mapped until they are
+        garbage collected.
+        """
+        for view in (self.offsets, self.indexes, self.weights, self.blob):
+            view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass  # unmapped by the last view referencing the buffer
+
+
+def compile_pool(banks: dict, source_file: str, pool_file: str,
+                 source_mtime: int = None):
+    """
+    Write pool file atomically, so other processes never read half of it.
+
+    :param banks: dict -- {ethnicity: [names]} or {ethnicity: {sex: [names]}}
+    :param source_file: str -- absolute path to the text file of the names
+    :param pool_file: str -- absolute path to the pool file
+    :param source_mtime: int -- mtime (ns) of the text file read before it
+     was parsed, otherwise file edited in the meantime would get outdated
+     pool stamped with its new mtime; text file is checked now if None
+    """
+    if source_mtime is None:
+        source_mtime = os.stat(source_file).st_mtime_ns
+    os.makedirs(os.path.dirname(pool_file), exist_ok=True)
+    temporary_file = f"{pool_file}.{os.getpid()}.tmp"
+    with open(temporary_file, "wb") as file:
+        file.write(serialize_pools(flatten_banks(banks), source_mtime))
+    os.replace(temporary_file, pool_file)
+
+
+def load_pool(file_name: str, loader, file_path: str = None,
+              cache_path: str = None):
+    """
+    Open compiled pool of the text file, compiling it first if pool does not
+    exist or text file was modified after compilation.
+
+    :param file_name: str -- name of the text file, e.g. "names.txt"
+    :param loader: callable -- function parsing the text file, called with
+     file_name and file_path, e.g. load_names
+    :param file_path: str -- directory of the text file, CONFIGS_PATH default
+    :param cache_path: str -- directory of the pools, CACHE_PATH by default
+    :return: NamePool
+    """
+    file_path = file_path if file_path is not None else CONFIGS_PATH
+    cache_path = cache_path if cache_path is not None else CACHE_PATH
+    source_file = file_path + file_name
+    pool_file = cache_path + os.path.splitext(file_name)[0] + ".pool"
+    source_mtime = os.stat(source_file).st_mtime_ns
+    if os.path.isfile(pool_file):
+        try:
+            pool = NamePool.from_file(pool_file)
+        except ValueError:
+            pass  # outdated version of the pool, compile it again
+        else:
+            if pool.source_mtime == source_mtime:
+                return pool
+            pool.close()
+    compile_pool(loader(file_name, file_path), source_file, pool_file,
+                 source_mtime)
+    return NamePool.from_file(pool_file)
+
+
+def as_pool(banks):
+    """
+    Return NamePool of the banks of names, building it if required.
+
+    :param banks: NamePool or dict -- {ethnicity: [names]} or {ethnicity:
+     {sex: [names]}}
+    :return: NamePool
+    """
+    return banks if isinstance(banks, NamePool) else NamePool.from_banks(banks)
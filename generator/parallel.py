@@ -0,0 +1,85 @@
+"""
+Parallel generation of big batches of characters in many processes. Batch is
+split into chunks and each character is generated with random generator
+keyed with the master seed and its index in the batch, so merged output is
+identical no matter how many workers generated it, and any of the
+characters could be recomputed later with CharacterGenerator.character_at().
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from generator.generator import CharacterGenerator
+
+CHUNK_SIZE = 10000
+# number of chunks waiting for each worker, it bounds used memory:
+CHUNKS_PER_WORKER = 2
+
+_generator = None  # CharacterGenerator of the worker process
+
+
+def _init_worker(generator_kwargs: dict):
+    """Load banks of the worker once, before it gets any chunk."""
+    global _generator
+    _generator = CharacterGenerator(**generator_kwargs)
+
+
+def _generate_chunk(start: int, size: int, seed: int, locks, base,
+                    formatter=None):
+    """
+    Generate one chunk in the worker.
+
+    :return: list -- of Character records, or result of the formatter
+    """
+    characters = _generator.generate_range(seed, start, size, locks, base)
+    return formatter(characters) if formatter is not None else characters
+
+
+def generate_parallel(count: int, seed: int = None, workers: int = None,
+                      locks=(), base=None, chunk_size: int = CHUNK_SIZE,
+                      formatter=None, generator_kwargs: dict = None):
+    """
+    Yield chunks of characters, in order, generated by pool of processes.
+    Output depends only on the seed, not on the number of workers or
+    chunk_size. With one worker chunks are generated in the current process.
+
+    :param count: int -- total number of characters
+    :param seed: int -- 64-bit master seed, random if None
+    :param workers: int -- number of processes, number of CPUs by default
+    :param locks: iterable -- categories which should not be randomized
+    :param base: Character -- record providing values of locked categories
+    :param chunk_size: int -- number of characters in one chunk
+    :param formatter: callable -- module-level function applied to each
+     chunk in the worker, e.g. to serialize it there
+    :param generator_kwargs: dict -- arguments of CharacterGenerator
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers if workers is not None else os.cpu_count()
+    generator_kwargs = generator_kwargs or {}
+    locks = frozenset(locks)
+    tasks = ((start, min(chunk_size, count - start), seed, locks, base,
+              formatter) for start in range(0, count, chunk_size))
+    if workers <= 1:
+        _init_worker(generator_kwargs)
+        for task in tasks:
+            yield _generate_chunk(*task)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(generator_kwargs,)) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(_generate_chunk, *task))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,147 @@
+"""
+Background prefetching of the characters. Producer thread keeps a bounded
+queue of characters generated for the current locks and locked values, so
+drawing new character only pops one ready from the queue. When locks or
+locked values change, characters queued for the old ones are dropped.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import queue
+import random
+import threading
+
+from generator.character import Character
+from generator.generator import LOCKED_FIELDS
+
+PREFETCH_SIZE = 8
+# how often blocked producer checks if it should stop:
+STOP_CHECK_INTERVAL = 0.5  # seconds
+
+
+def locks_state(locks, base: Character = None):
+    """
+    Return hashable state deciding which characters could be generated:
+    locked categories and values of their fields in the base record.
+
+    :param locks: iterable -- categories which should not be randomized
+    :param base: Character -- record providing values of locked categories
+    :return: tuple
+    """
+    locks = frozenset(locks)
+    values = () if base is None else tuple(
+        getattr(base, field) for category in sorted(locks)
+        for field in LOCKED_FIELDS[category])
+    return locks, values
+
+
+class CharacterPrefetcher:
+    """
+    Bounded queue of characters filled by background thread.
+    """
+
+    def __init__(self, generator, size: int = PREFETCH_SIZE, rng=None):
+        """
+        :param generator: CharacterGenerator
+        :param size: int -- maximum number of queued characters
+        :param rng: random.Random -- source of randomness of the producer,
+         own instance by default, as it must not be shared with other threads
+        """
+        self.generator = generator
+        self.rng = rng or random.Random()
+        self.queue = queue.Queue(size)
+        self.changed = threading.Condition()
+        self.state = None
+        self.locks, self.base = frozenset(), None
+        self.epoch = 0  # incremented on each change of the state
+        self.stopped = False
+        self.thread = threading.Thread(target=self._produce, daemon=True,
+                                       name="CharacterPrefetcher")
+        self.thread.start()
+
+    def set_locks(self, locks, base: Character = None):
+        """
+        Make the producer generate characters for the locks and values of
+        the base, dropping already queued characters if they changed.
+
+        :param locks: iterable -- categories which should not be randomized
+        :param base: Character -- record providing values of locked categories
+        """
+        state = locks_state(locks, base)
+        with self.changed:
+            if state == self.state:
+                return
+            self.state = state
+            self.locks = state[0]
+            self.base = base
+            self.epoch += 1
+            self._drain()
+            self.changed.notify()
+
+    def set_generator(self, generator):
+        """
+        Make the producer use another generator, e.g. reloaded after its
+        config files changed, dropping characters drawn by the old one.
+
+        :param generator: CharacterGenerator
+        """
+        with self.changed:
+            self.generator = generator
+            self.epoch += 1
+            self._drain()
+            self.changed.notify()
+
+    def take(self, locks, base: Character = None):
+        """
+        Return character generated for the locks and values of the base,
+        popped from the queue, or generated at once if queue is empty.
+
+        :param locks: iterable -- categories which should not be randomized
+        :param base: Character -- record providing values of locked categories
+        :return: Character
+        """
+        self.set_locks(locks, base)
+        while True:
+            try:
+                epoch, character = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if epoch == self.epoch:
+                return character
+        return self.generator.new_character(self.locks, self.base)
+
+    def stop(self):
+        """Stop the producer thread."""
+        with self.changed:
+            self.stopped = True
+            self._drain()
+            self.changed.notify()
+
+    def _drain(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _produce(self):
+        with self.changed:
+            while self.state is None and not self.stopped:
+                self.changed.wait()
+        while not self.stopped:
+            with self.changed:
+                epoch, locks, base = self.epoch, self.locks, self.base
+                generator = self.generator
+            character = generator.new_character(locks, base, rng=self.rng)
+            while not self.stopped and epoch == self.epoch:
+                try:
+                    self.queue.put((epoch, character),
+                                   timeout=STOP_CHECK_INTERVAL)
+                    break
+                except queue.Full:
+                    pass
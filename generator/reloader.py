@@ -0,0 +1,170 @@
+"""
+Hot reload of the config and language files. Files are watched by polling
+their modification times, so it works everywhere without any extra
+dependency. Only the changed files are parsed again and only indexes
+derived from them rebuilt, into a new generator replacing the current one
+with a single assignment: batches already drawing keep the old generator,
+so they never see half of the change.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import sys
+import threading
+
+from generator.categories import CONFIGS_PATH
+from translator.translator import get_catalog, language_of
+
+POLL_INTERVAL = 1.0  # seconds
+WATCHED_EXTENSION = ".txt"
+# errors of the files edited by the user, which are reported and skipped:
+RELOAD_ERRORS = (OSError, ValueError, KeyError, IndexError, TypeError)
+
+
+class FileWatcher:
+    """
+    Finds files created, modified or deleted in the directories, comparing
+    their modification times and sizes with these seen by previous check.
+    """
+
+    def __init__(self, directories, extension: str = WATCHED_EXTENSION):
+        """
+        :param directories: iterable -- of str, paths of watched directories
+        :param extension: str -- only files of this extension are watched
+        """
+        self.directories = [os.path.normpath(d) for d in directories]
+        self.extension = extension
+        self.stamps = self.scan()
+
+    def scan(self):
+        """
+        :return: dict -- {path: (mtime in ns, size)} of all watched files
+        """
+        stamps = {}
+        for directory in self.directories:
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.endswith(self.extension) and \
+                            entry.is_file():
+                        stat = entry.stat()
+                        stamps[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def changes(self):
+        """
+        Return paths of the files changed since previous call.
+
+        :return: list -- of str, sorted
+        """
+        stamps = self.scan()
+        changed = sorted(path for path in stamps.keys() | self.stamps.keys()
+                         if stamps.get(path) != self.stamps.get(path))
+        self.stamps = stamps
+        return changed
+
+
+class ConfigReloader:
+    """
+    Keeps current generator, replacing it with reloaded one when its config
+    files change, and reloads changed language files of the translator.
+    """
+
+    def __init__(self, generator, configs_path: str = CONFIGS_PATH,
+                 languages_path: str = None, on_error=None):
+        """
+        :param generator: CharacterGenerator -- current generator
+        :param configs_path: str -- directory of the config files
+        :param languages_path: str -- directory of the language files, they
+         are not watched if None
+        :param on_error: callable -- called with file names and exception,
+         when files could not be reloaded, errors are printed if None
+        """
+        self.generator = generator
+        self.configs_path = os.path.normpath(configs_path)
+        self.languages_path = languages_path
+        self.on_error = on_error or self.print_error
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.watcher = FileWatcher(
+            [configs_path] + ([languages_path] if languages_path else []))
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def add_listener(self, callback):
+        """
+        Call the callback with the new generator each time it is replaced.
+        Callbacks are called in the thread which called poll().
+
+        :param callback: callable
+        """
+        self.listeners.append(callback)
+
+    def poll(self):
+        """
+        Reload files changed since the previous poll. If any of them could
+        not be loaded, current generator is kept and on_error is called.
+
+        :return: list -- of str, names of the reloaded files
+        """
+        with self.lock:
+            changed = self.watcher.changes()
+            config_files = [os.path.basename(path) for path in changed
+                            if os.path.dirname(path) == self.configs_path]
+            language_files = [os.path.basename(path) for path in changed
+                              if os.path.dirname(path) != self.configs_path]
+            reloaded = []
+            if config_files:
+                try:
+                    generator = self.generator.reloaded(config_files)
+                except RELOAD_ERRORS as error:
+                    self.on_error(config_files, error)
+                else:
+                    self.generator = generator
+                    reloaded.extend(config_files)
+                    for callback in self.listeners:
+                        callback(generator)
+            for file_name in language_files:
+                try:
+                    get_catalog(self.languages_path).reload(
+                        language_of(file_name))
+                except RELOAD_ERRORS as error:
+                    self.on_error([file_name], error)
+                else:
+                    reloaded.append(file_name)
+            return reloaded
+
+    def start(self, interval: float = POLL_INTERVAL):
+        """
+        Poll files in background thread, e.g. in long-running batch service.
+        GUI should rather call poll() from its own loop.
+
+        :param interval: float -- seconds between the polls
+        """
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._poll_until_stopped,
+                                       args=(interval,), daemon=True,
+                                       name="ConfigReloader")
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background polling."""
+        self.stopped.set()
+
+    def _poll_until_stopped(self, interval: float):
+        while not self.stopped.wait(interval):
+            self.poll()
+
+    @staticmethod
+    def print_error(file_names, error):
+        print(f"Could not reload {', '.join(file_names)}, previous version "
+              f"is kept: {error}", file=sys.stderr)
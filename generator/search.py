@@ -0,0 +1,108 @@
+"""
+Incremental search of the words of the banks, e.g. professions or names, for
+type-ahead filtering. Index is built once, when bank is loaded, from the
+words sorted by their normalized (case- and accent-folded) form:
+
+    words starting with the query are one range of the sorted words, found
+     by binary search, so it works as a prefix tree without nodes;
+    words containing it elsewhere are found through trigram index, which
+     keeps positions of the words containing each three letters.
+
+Results are indexes of the words in the original list, so they could be
+used as codes, e.g. of the professions.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+NGRAM = 3
+# bigger than any character, so query + LAST ends range of its prefix:
+LAST = chr(0x10FFFF)
+
+
+def normalize(text: str):
+    """Fold case and strip accents, so "Zoë" is found by "zoe"."""
+    if text.isascii():
+        return text.lower()
+    return "".join(c for c in unicodedata.normalize("NFKD", text.casefold())
+                   if not unicodedata.combining(c))
+
+
+class SearchIndex:
+    """
+    Prefix and trigram index of the words.
+    """
+
+    def __init__(self, words):
+        """
+        :param words: iterable -- of str
+        """
+        keys = [normalize(word) for word in words]
+        # index of the word in the original list at each sorted position:
+        self.order = array("I", sorted(range(len(keys)),
+                                       key=keys.__getitem__))
+        self.keys = [keys[i] for i in self.order]
+        # sorted positions of the words containing each trigram:
+        self.trigrams = {}
+        for position, key in enumerate(self.keys):
+            for trigram in {key[i:i + NGRAM]
+                            for i in range(len(key) - NGRAM + 1)}:
+                if trigram not in self.trigrams:
+                    self.trigrams[trigram] = array("I")
+                self.trigrams[trigram].append(position)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix_range(self, query: str):
+        """
+        Return range of sorted positions of the words starting with query.
+
+        :param query: str -- already normalized
+        :return: range
+        """
+        start = bisect_left(self.keys, query)
+        return range(start, bisect_left(self.keys, query + LAST, start))
+
+    def iter_search(self, query: str):
+        """
+        Iterate over indexes of the words matching the query: starting with
+        it first, then containing it, each group in alphabetical order.
+        Words containing queries shorter than NGRAM are not searched for.
+
+        :param query: str -- e.g. "eng"
+        """
+        query = normalize(query)
+        order = self.order
+        prefixed = self.prefix_range(query)
+        for position in prefixed:
+            yield order[position]
+        if len(query) < NGRAM:
+            return
+        # every matching word contains all trigrams of the query, so it is
+        # enough to check words of the rarest one:
+        candidates = min((self.trigrams.get(query[i:i + NGRAM], ())
+                          for i in range(len(query) - NGRAM + 1)), key=len)
+        keys = self.keys
+        for position in candidates:
+            if position not in prefixed and query in keys[position]:
+                yield order[position]
+
+    def search(self, query: str, limit: int = None):
+        """
+        Find words matching the query, see iter_search().
+
+        :param query: str
+        :param limit: int -- maximum number of results, all if None
+        :return: list -- of int, indexes of the words
+        """
+        return list(islice(self.iter_search(query), limit))
@@ -0,0 +1,399 @@
+"""
+Local HTTP server generating characters on demand, for virtual-tabletop
+plugins and other tools. It is a single asyncio event loop speaking minimal
+HTTP/1.1 with keep-alive, e.g.:
+
+    GET /character?ethnicity=LATINO&sex=FEMALE&count=500
+
+Small requests arriving at the same time are combined into one batch draw
+for each set of fixed values, drawn in the worker thread in chunks, so big
+batches never block the event loop serving other connections. Responses are
+JSON arrays of the characters, with categories translated to the language
+negotiated from the Accept-Language header. Big responses are streamed in
+chunks. Changed config and language files are reloaded without restarting
+the server.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from generator.generator import *
+from generator.export import character_rows, LANGUAGES_PATH
+from generator.prefetch import locks_state
+from generator.reloader import ConfigReloader, POLL_INTERVAL
+from translator.translator import get_catalog
+
+HOST = "127.0.0.1"  # local only by default
+PORT = 8080
+MAX_COUNT = 100000
+# requests up to this count are combined into batches, bigger ones are
+# generated and streamed in chunks of this size:
+STREAM_CHUNK = 1000
+# maximum number of characters drawn by one call of the worker thread:
+MAX_BATCH = 1000
+# codes of Accept-Language mapped to the names of the language files:
+LANGUAGE_CODES = {"en": "english", "pl": "polish"}
+# names of the language files mapped to the tags of Content-Language:
+LANGUAGE_TAGS = {language: code for code, language in LANGUAGE_CODES.items()}
+# query parameters fixing values, with their categories:
+FIXED_PARAMETERS = {category.lower(): category for category in
+                    tuple(CATEGORIES) + (PROFESSION,)}
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+class RequestError(ValueError):
+    """Raised when request could not be served, with its HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def negotiate_language(accept_language: str, languages):
+    """
+    Choose language of the response from the Accept-Language header.
+
+    :param accept_language: str -- e.g. "pl-PL,pl;q=0.9,en;q=0.8"
+    :param languages: sequence -- of str, names of available languages
+    :return: str -- name of the language, or None if none is acceptable
+    """
+    choices = []
+    for position, entry in enumerate(accept_language.split(",")):
+        tag, _, parameters = entry.strip().partition(";")
+        quality = 1.0
+        if parameters.strip().startswith("q="):
+            try:
+                quality = float(parameters.strip()[2:])
+            except ValueError:
+                continue
+        choices.append((quality, position, tag.split("-")[0].lower()))
+    choices.sort(key=lambda choice: (-choice[0], choice[1]))
+    for quality, _, code in choices:
+        language = LANGUAGE_CODES.get(code)
+        if quality > 0 and language in languages:
+            return language
+    return None
+
+
+def parse_character_query(query: str):
+    """
+    Read count and fixed values of the characters from the query string.
+
+    :param query: str -- e.g. "ethnicity=LATINO&count=5"
+    :return: tuple -- count, locks and base Character
+    :raises RequestError: if any of the parameters is invalid
+    """
+    parameters = parse_qs(query)
+    count = 1
+    locks, base = [], Character()
+    for name, values in parameters.items():
+        value = values[-1]
+        if name == "count":
+            try:
+                count = int(value)
+            except ValueError:
+                raise RequestError(400, f"count is not a number: {value}")
+            if not 0 < count <= MAX_COUNT:
+                raise RequestError(400, f"count must be from 1 to "
+                                        f"{MAX_COUNT}")
+        elif name in FIXED_PARAMETERS:
+            category = FIXED_PARAMETERS[name]
+            if category in CATEGORIES and value not in CATEGORIES[category]:
+                raise RequestError(400, f"{name} must be one of: "
+                                        f"{', '.join(CATEGORIES[category])}")
+            setattr(base, name, value)
+            locks.append(category)
+        else:
+            raise RequestError(400, f"Unknown parameter: {name}")
+    return count, frozenset(locks), base
+
+
+class CharacterServer:
+    """
+    Serves characters over HTTP, drawing concurrent requests in batches.
+    """
+
+    def __init__(self, generator: CharacterGenerator = None,
+                 languages_path: str = LANGUAGES_PATH):
+        """
+        :param generator: CharacterGenerator -- new one is created if None
+        :param languages_path: str -- directory of the language files
+        """
+        self.generator = generator or CharacterGenerator()
+        self.languages_path = languages_path
+        self.languages = get_catalog(languages_path).languages
+        self.pending = {}  # {state: (locks, base, [(count, future), ...])}
+        self.flush_scheduled = False
+        # characters are drawn in one worker thread, off the event loop:
+        self.executor = ThreadPoolExecutor(1, "CharacterServer")
+        self.encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    async def draw(self, count: int, locks, base: Character):
+        """
+        Return characters drawn together with all other requests of the same
+        locks and base, which arrived in the same iteration of the loop.
+
+        :param count: int -- number of characters
+        :param locks: frozenset -- categories which should not be randomized
+        :param base: Character -- record providing values of locked categories
+        :return: list -- of Character records
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        state = locks_state(locks, base)
+        if state not in self.pending:
+            self.pending[state] = (locks, base, [])
+        self.pending[state][2].append((count, future))
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        pending, self.pending = self.pending, {}
+        self.flush_scheduled = False
+        asyncio.ensure_future(self._draw_pending(pending))
+
+    async def _draw_pending(self, pending: dict):
+        for locks, base, requests in pending.values():
+            try:
+                characters = await self.generate(
+                    sum(count for count, _ in requests), locks, base)
+            except Exception as error:  # reported to each request
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            start = 0
+            for count, future in requests:
+                if not future.done():
+                    future.set_result(characters[start:start + count])
+                start += count
+
+    async def generate(self, count: int, locks, base: Character,
+                       generator: CharacterGenerator = None):
+        """
+        Draw characters in the worker thread, MAX_BATCH at once, letting the
+        event loop serve other requests between the batches.
+
+        :param count: int -- number of characters
+        :param locks: frozenset -- categories which should not be randomized
+        :param base: Character -- record providing values of locked categories
+        :param generator: CharacterGenerator -- current one if None
+        :return: list -- of Character records
+        """
+        generator = generator or self.generator
+        loop = asyncio.get_running_loop()
+        characters = []
+        for start in range(0, count, MAX_BATCH):
+            characters.extend(await loop.run_in_executor(
+                self.executor, generator.generate,
+                min(MAX_BATCH, count - start), locks, base))
+        return characters
+
+    def format_characters(self, characters, language: str = None):
+        """Serialize characters as JSON objects separated with commas."""
+        encode = self.encode
+        return ",".join([encode(dict(zip(CHARACTER_FIELDS, row))) for row in
+                         character_rows(characters, language,
+                                        self.languages_path)])
+
+    async def handle_connection(self, reader, writer):
+        """Serve all the requests sent through one connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = \
+                        request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self.send(writer, 400, b'{"error": "Bad request"}',
+                                    keep_alive=False)
+                    break
+                if length:
+                    await reader.readexactly(length)  # bodies are ignored
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or \
+                    (version == "HTTP/1.1" and connection != "close")
+                await self.respond(writer, method, target, headers,
+                                   keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away
+        finally:
+            writer.close()
+
+    async def respond(self, writer, method: str, target: str, headers: dict,
+                      keep_alive: bool):
+        url = urlsplit(target)
+        try:
+            if url.path != "/character":
+                raise RequestError(404, f"Not found: {url.path}")
+            if method != "GET":
+                raise RequestError(405, "Only GET is allowed")
+            count, locks, base = parse_character_query(url.query)
+        except RequestError as error:
+            body = self.encode({"error": str(error)}).encode()
+            return await self.send(writer, error.status, body, keep_alive)
+        language = negotiate_language(headers.get("accept-language", ""),
+                                      self.languages)
+        extra = {"Content-Language": LANGUAGE_TAGS[language]} \
+            if language else {}
+        # all the chunks of streamed response are drawn by the same
+        # generator, even if it is reloaded in the meantime:
+        generator = self.generator
+        try:
+            if count <= STREAM_CHUNK:
+                characters = await self.draw(count, locks, base)
+            else:  # first chunk is drawn before the status is sent
+                characters = await self.generate(STREAM_CHUNK, locks, base,
+                                                 generator)
+        except Exception as error:
+            self.report_error(error)
+            body = self.encode({"error": "Could not generate characters"})
+            return await self.send(writer, 500, body.encode(), keep_alive)
+        if count <= STREAM_CHUNK:
+            body = f"[{self.format_characters(characters, language)}]"
+            return await self.send(writer, 200, body.encode(), keep_alive,
+                                   extra)
+        await self.stream(writer, count, locks, base, language, keep_alive,
+                          extra, characters, generator)
+
+    async def send(self, writer, status: int, body: bytes, keep_alive: bool,
+                   extra: dict = None):
+        """Write complete response with the body."""
+        writer.write(self.head(status, keep_alive, extra,
+                               {"Content-Length": len(body)}) + body)
+        await writer.drain()
+
+    async def stream(self, writer, count: int, locks, base: Character,
+                     language: str, keep_alive: bool, extra: dict,
+                     first_chunk: list, generator: CharacterGenerator):
+        """
+        Write response with chunked body, generating characters chunk by
+        chunk and letting other requests be served between the chunks.
+
+        :param first_chunk: list -- characters drawn before the status was
+         sent, so failure to draw them could be reported with it
+        :param generator: CharacterGenerator -- draws all the chunks
+        """
+        writer.write(self.head(200, keep_alive, extra,
+                               {"Transfer-Encoding": "chunked"}))
+        characters, separator, sent = first_chunk, "[", 0
+        while True:
+            chunk = (separator + self.format_characters(characters, language)
+                     ).encode()
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            separator = ","
+            sent += len(characters)
+            await writer.drain()
+            if sent >= count:
+                break
+            try:
+                characters = await self.generate(
+                    min(STREAM_CHUNK, count - sent), locks, base, generator)
+            except Exception as error:
+                # status was sent already, so the response is cut off:
+                self.report_error(error)
+                raise ConnectionAbortedError from error
+        writer.write(b"1\r\n]\r\n0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def report_error(error: Exception):
+        print(f"Could not generate characters: {error!r}", file=sys.stderr)
+
+    @staticmethod
+    def head(status: int, keep_alive: bool, *headers):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}",
+                 f"Content-Type: {JSON_TYPE}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        for extra in headers:
+            if extra:
+                lines.extend(f"{name}: {value}"
+                             for name, value in extra.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def replace_generator(self, generator: CharacterGenerator):
+        """Draw next batches with the generator, e.g. reloaded one."""
+        self.generator = generator
+
+    async def watch(self, interval: float = POLL_INTERVAL):
+        """
+        Reload changed config and language files until cancelled. Files are
+        parsed in the executor, not to block serving the requests.
+
+        :param interval: float -- seconds between checks of the files
+        """
+        reloader = ConfigReloader(self.generator,
+                                  languages_path=self.languages_path)
+        reloader.add_listener(self.replace_generator)
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            if await loop.run_in_executor(None, reloader.poll):
+                self.languages = get_catalog(self.languages_path).languages
+
+    async def serve(self, host: str = HOST, port: int = PORT,
+                    reload_interval: float = POLL_INTERVAL):
+        """
+        Serve requests until cancelled.
+
+        :param host: str -- interface to listen on
+        :param port: int
+        :param reload_interval: float -- seconds between checks of changed
+         files, they are not reloaded if 0
+        """
+        server = await asyncio.start_server(self.handle_connection, host,
+                                            port)
+        watcher = asyncio.ensure_future(self.watch(reload_interval)) \
+            if reload_interval > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            self.executor.shutdown(wait=False)
+
+
+def run_server(host: str = HOST, port: int = PORT, generator_kwargs=None,
+               reload_interval: float = POLL_INTERVAL):
+    """
+    Start the server and block until it is interrupted.
+
+    :param host: str -- interface to listen on, local only by default
+    :param port: int
+    :param generator_kwargs: dict -- arguments of CharacterGenerator
+    :param reload_interval: float -- seconds between checks of changed
+     config and language files, they are not reloaded if 0
+    """
+    server = CharacterServer(CharacterGenerator(**(generator_kwargs or {})))
+    print(f"Serving characters on http://{host}:{port}/character")
+    try:
+        asyncio.run(server.serve(host, port, reload_interval))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+"""
+Character-sheets: txt files with "key = value" line for each field, as they
+are saved by the application to the characters directory. Values could span
+many lines, e.g. weapons, and fields could be saved in any order.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from generator.character import Character, CHARACTER_FIELDS, NUMERIC_FIELDS
+
+SHEET_EXTENSION = ".txt"
+SEPARATOR = " = "
+# sheet keys not being fields of the Character record:
+DESCRIPTIONS = ("short_desc", "description")
+SHEET_KEYS = CHARACTER_FIELDS + DESCRIPTIONS
+# only line starting with one of the keys begins new field, other lines
+# continue value of the previous one:
+FIELD_LINE = re.compile(rf"^({'|'.join(SHEET_KEYS)}){SEPARATOR}(.*)$")
+IMPORT_WORKERS = 8
+# number of sheets being read for each worker, it bounds used memory:
+SHEETS_PER_WORKER = 16
+
+
+class SheetError(ValueError):
+    """Raised when character-sheet could not be parsed."""
+
+
+def parse_sheet(lines, file_path: str = "<sheet>"):
+    """
+    Parse lines of the character-sheet.
+
+    :param lines: iterable -- of str
+    :param file_path: str -- path to the sheet, used in error messages
+    :return: tuple -- Character and dict of DESCRIPTIONS found in the sheet
+    :raises SheetError: if sheet has no fields or numeric value is invalid
+    """
+    values, key = {}, None
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        match = FIELD_LINE.match(line)
+        if match is not None:
+            key = match.group(1)
+            values[key] = [match.group(2), number]
+        elif key is not None:
+            values[key][0] += "\n" + line
+        elif line.strip():
+            raise SheetError(f"{file_path}:{number}: line without a key")
+    if not values:
+        raise SheetError(f"{file_path}: no fields found")
+    for entry in values.values():
+        # blank lines after multi-line value only separate it from the next:
+        entry[0] = entry[0].rstrip("\n")
+    character = Character()
+    for key, (value, number) in values.items():
+        if key in NUMERIC_FIELDS:
+            try:
+                value = int(value)
+            except ValueError:
+                raise SheetError(f"{file_path}:{number}: {key} is not "
+                                 f"a number: {value!r}") from None
+        if key in CHARACTER_FIELDS:
+            setattr(character, key, value)
+    if "surname" not in values:
+        # old sheets keep full name in the name field:
+        character.name, _, character.surname = character.name.partition(" ")
+    descriptions = {key: values[key][0] for key in DESCRIPTIONS
+                    if key in values}
+    return character, descriptions
+
+
+def read_sheet(file_path: str):
+    """
+    Read character from its sheet.
+
+    :param file_path: str -- path to the txt file
+    :return: Character
+    :raises SheetError: if sheet could not be parsed
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        return parse_sheet(file, file_path)[0]
+
+
+def write_sheet(file_path: str, character: Character, **descriptions):
+    """
+    Save character to its sheet.
+
+    :param file_path: str -- path to the txt file
+    :param character: Character
+    :param descriptions: str -- short_desc and description of the character
+    """
+    with open(file_path, "w", encoding="utf-8") as file:
+        for key, value in zip(CHARACTER_FIELDS, character.as_tuple()):
+            file.write(f"{key}{SEPARATOR}{value}\n")
+        for key in DESCRIPTIONS:
+            if key in descriptions:
+                file.write(f"{key}{SEPARATOR}{descriptions[key]}\n")
+
+
+def unique_sheet_path(directory: str, name: str):
+    """
+    Return path of the new sheet of the character, named as the character,
+    with a number added if sheet of other character of the same name exists,
+    e.g. "John Smith (2).txt".
+
+    :param directory: str -- path to the directory with the sheets
+    :param name: str -- full name of the character
+    :return: str
+    """
+    path = os.path.join(directory, name + SHEET_EXTENSION)
+    number = 1
+    while os.path.exists(path):
+        number += 1
+        path = os.path.join(directory, f"{name} ({number}){SHEET_EXTENSION}")
+    return path
+
+
+def find_sheets(directory: str):
+    """
+    Yield paths to all the sheets in the directory and its subdirectories.
+
+    :param directory: str -- path to the directory with the sheets
+    """
+    for path, directories, files in os.walk(directory):
+        directories.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(SHEET_EXTENSION):
+                yield os.path.join(path, file_name)
+
+
+def _read_or_error(file_path: str):
+    try:
+        return file_path, read_sheet(file_path)
+    except (OSError, UnicodeDecodeError, SheetError) as error:
+        return file_path, error
+
+
+def read_sheets(directory: str, workers: int = IMPORT_WORKERS):
+    """
+    Yield characters read from all the sheets found in the directory tree by
+    pool of threads, in order of the paths. Sheets which could not be read
+    do not stop the reading, their errors are yielded instead.
+
+    :param directory: str -- path to the directory with the sheets
+    :param workers: int -- number of threads reading the sheets
+    :return: generator -- of (path, Character or Exception) tuples
+    """
+    paths = find_sheets(directory)
+    if workers <= 1:
+        yield from map(_read_or_error, paths)
+        return
+    with ThreadPoolExecutor(workers) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append(executor.submit(_read_or_error, path))
+            if len(pending) >= workers * SHEETS_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
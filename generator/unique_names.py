@@ -0,0 +1,179 @@
+"""
+Allocation of unique full names. For each ethnicity and sex all the pairs of
+name and surname are visited in pseudo-random order given by a keyed Feistel
+permutation of the indexes of the pairs, so no full name repeats, each draw
+costs O(1) and only a counter is kept for each pool, instead of the set of
+already used names. Full names shared by many pools are allocated by one of
+them only, so they never repeat across ethnicities and sexes either.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import zlib
+import random
+
+from generator.counter_random import mix64, MASK64
+from generator.name_pool import pool_key, KEY_SEPARATOR
+
+FEISTEL_ROUNDS = 4
+
+
+class NamesExhaustedError(LookupError):
+    """Raised when all full names of the ethnicity and sex were allocated."""
+
+
+class FeistelPermutation:
+    """
+    Pseudo-random bijection of range(size). Balanced Feistel network permutes
+    the smallest range of even number of bits containing size, values out of
+    range(size) are permuted again (cycle-walking) until they fit.
+    """
+
+    def __init__(self, size: int, key: int):
+        """
+        :param size: int -- number of permuted values
+        :param key: int -- 64-bit key choosing one of the permutations
+        """
+        self.size = size
+        self.key = key
+        bits = max(2, (size - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+
+    def __getitem__(self, index: int):
+        """Return index-th value of the permutation."""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        value = index
+        while True:
+            value = self._encrypt(value)
+            if value < self.size:
+                return value
+
+    def _encrypt(self, value: int):
+        half_bits, half_mask = self.half_bits, self.half_mask
+        left, right = value >> half_bits, value & half_mask
+        for round_ in range(FEISTEL_ROUNDS):
+            mixed = mix64((self.key + (round_ << 32) + right) & MASK64)
+            left, right = right, left ^ (mixed & half_mask)
+        return (left << half_bits) | right
+
+
+class UniqueNameAllocator:
+    """
+    Allocates full names which never repeat, until all name and surname
+    pairs of the ethnicity and sex are used. Weights of the names are
+    ignored, every pair is allocated exactly once.
+
+    Pools could share names and surnames (e.g. banks of two ethnicities are
+    the same, or a name is both male and female), so each full name belongs
+    to one pool only: pools of the same names and surnames are allocated
+    together, and pair found also in an earlier pool (in order of the keys)
+    is skipped, as it is allocated by that pool.
+    """
+
+    def __init__(self, names, surnames, seed: int = None):
+        """
+        :param names: NamePool -- names of each ethnicity and sex
+        :param surnames: NamePool -- surnames of each ethnicity
+        :param seed: int -- seed of the order of the names, random if None
+        """
+        self.names = names
+        self.surnames = surnames
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.permutations = {}
+        self.allocated = {}
+        self.sizes = {}  # {group: number of full names owned by the group}
+        self.used = {}  # {group: number of full names allocated}
+        # pools of identical names and surnames form one group, keyed by the
+        # first of them:
+        self.groups = {}
+        self.group_keys = []
+        seen = {}
+        for key in sorted(names.pools):
+            ethnicity, sex = key.split(KEY_SEPARATOR)
+            content = (bytes(names.pool_indexes(ethnicity, sex)),
+                       bytes(surnames.pool_indexes(ethnicity)))
+            if content not in seen:
+                seen[content] = (ethnicity, sex)
+                self.group_keys.append((ethnicity, sex))
+            self.groups[(ethnicity, sex)] = seen[content]
+        # groups which own full names found also in the group:
+        self.earlier = {group: self.group_keys[:i] for i, group in
+                        enumerate(self.group_keys)}
+
+    def _permutation(self, ethnicity: str, sex: str):
+        group = self.groups[(ethnicity, sex)]
+        if group not in self.permutations:
+            size = self.names.size(*group) * self.surnames.size(group[0])
+            key = pool_key(*group)
+            self.permutations[group] = FeistelPermutation(
+                size, mix64((self.seed + zlib.crc32(key.encode())) & MASK64))
+            self.allocated[group] = 0
+            self.sizes[group] = self._owned_size(group)
+            self.used[group] = 0
+        return group, self.permutations[group]
+
+    def _owned_size(self, group):
+        """Count pairs of the group not belonging to any earlier group."""
+        earlier = [(set(self.names.pool_indexes(*other)),
+                    set(self.surnames.pool_indexes(other[0])))
+                   for other in self.earlier[group]]
+        surnames = set(self.surnames.pool_indexes(group[0]))
+        size = 0
+        for name_id in self.names.pool_indexes(*group):
+            taken = set()
+            for other_names, other_surnames in earlier:
+                if name_id in other_names:
+                    taken |= other_surnames
+            size += len(surnames - taken)
+        return size
+
+    def _owner(self, group, name_id: int, surname_id: int):
+        """Return the first group containing the pair."""
+        for other in self.earlier[group]:
+            if self.names.contains_id(name_id, *other) and \
+                    self.surnames.contains_id(surname_id, other[0]):
+                return other
+        return group
+
+    def remaining(self, ethnicity: str, sex: str):
+        """Return number of full names which could still be allocated."""
+        group, permutation = self._permutation(ethnicity, sex)
+        return self.sizes[group] - self.used[group]
+
+    def _pair(self, group, index: int):
+        name_index, surname_index = divmod(index,
+                                           self.surnames.size(group[0]))
+        return self.names.pool_indexes(*group)[name_index], \
+            self.surnames.pool_indexes(group[0])[surname_index]
+
+    def allocate(self, ethnicity: str, sex: str):
+        """
+        Return next unique name and surname of the ethnicity and sex.
+
+        :param ethnicity: str
+        :param sex: str
+        :return: tuple -- name and surname
+        :raises NamesExhaustedError: if all the pairs were already allocated
+        """
+        group, permutation = self._permutation(ethnicity, sex)
+        allocated = self.allocated[group]
+        # pairs of earlier groups are skipped, as values out of range are
+        # skipped by the permutation itself:
+        while allocated < permutation.size:
+            name_id, surname_id = self._pair(group, permutation[allocated])
+            allocated += 1
+            if self._owner(group, name_id, surname_id) == group:
+                self.allocated[group] = allocated
+                self.used[group] += 1
+                return self.names[name_id], self.surnames[surname_id]
+        self.allocated[group] = allocated
+        raise NamesExhaustedError(
+            f"All {self.sizes[group]} full names of {ethnicity} {sex} "
+            f"characters were already allocated")
@@ -0,0 +1,90 @@
+"""
+Bulk sampler of the body traits (age, height and weight) of the characters.
+If NumPy is installed whole batch is drawn with a few array operations,
+otherwise it falls back to the pure-python path using random module.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from generator.categories import *
+from generator.distributions import compile_distributions
+
+NUMPY_AVAILABLE = np is not None
+TRAITS = ("age", "years", "height", "centimeters", "weight", "kilograms")
+
+
+def sample_traits(n: int, seed: int = None, distributions: dict = None):
+    """
+    Draw age, height and weight of n characters at once. Categories are
+    returned as indexes to the AGES, HEIGHTS and WEIGHTS tuples and weight of
+    each character depends on its height, as in random_gaussian().
+
+    :param n: int -- number of characters
+    :param seed: int -- seed of the random generator, random if None
+    :param distributions: dict -- {category: AliasTable}, DEFAULT_WEIGHTS are
+     used if not provided
+    :return: dict -- {trait: sequence of n values} for each of TRAITS, NumPy
+     arrays if NumPy is available, lists otherwise
+    """
+    if distributions is None:
+        distributions = compile_distributions(DEFAULT_WEIGHTS)
+    if NUMPY_AVAILABLE:
+        return _sample_traits_numpy(n, seed, distributions)
+    return _sample_traits_python(n, seed, distributions)
+
+
+def _draw_indexes_numpy(rng, table, n: int):
+    """Draw n indexes from AliasTable with two array operations."""
+    columns = rng.integers(0, len(table), size=n)
+    accepted = rng.random(n) < np.array(table.probabilities)[columns]
+    return np.where(accepted, columns, np.array(table.aliases)[columns])
+
+
+def _sample_gaussian_numpy(rng, categories: tuple, codes):
+    """Draw gaussian value for each category code in codes array."""
+    means, deviations = (np.array(column) for column in
+                         zip(*(GAUSSIAN_PARAMS[c] for c in categories)))
+    return rng.standard_normal(len(codes)) * deviations[codes] + means[codes]
+
+
+def _sample_traits_numpy(n: int, seed: int, distributions: dict):
+    rng = np.random.default_rng(seed)
+    ages = _draw_indexes_numpy(rng, distributions[AGE], n)
+    heights = _draw_indexes_numpy(rng, distributions[HEIGHT], n)
+    weights = _draw_indexes_numpy(rng, distributions[WEIGHT], n)
+    # astype truncates towards zero, the same as int() in random_gaussian:
+    years = _sample_gaussian_numpy(rng, AGES, ages).astype(np.int64)
+    centimeters = _sample_gaussian_numpy(rng, HEIGHTS, heights).astype(
+        np.int64)
+    kilograms = (_sample_gaussian_numpy(rng, WEIGHTS, weights) +
+                 centimeters).astype(np.int64)
+    return dict(zip(TRAITS, (ages, years, heights, centimeters, weights,
+                             kilograms)))
+
+
+def _sample_traits_python(n: int, seed: int, distributions: dict):
+    rng = random.Random(seed)
+    ages, heights, weights = (
+        [distributions[c].draw_index(rng) for _ in range(n)]
+        for c in (AGE, HEIGHT, WEIGHT))
+    gauss = rng.gauss
+    years = [int(gauss(*GAUSSIAN_PARAMS[AGES[a]])) for a in ages]
+    centimeters = [int(gauss(*GAUSSIAN_PARAMS[HEIGHTS[h]])) for h in heights]
+    kilograms = []
+    for w, cm in zip(weights, centimeters):
+        mean, deviation = GAUSSIAN_PARAMS[WEIGHTS[w]]
+        kilograms.append(int(gauss(mean + cm, deviation)))
+    return dict(zip(TRAITS, (ages, years, heights, centimeters, weights,
+                             kilograms)))
@@ -0,0 +1,232 @@
+"""
+Cache of the portraits displayed by the application. Files are read and
+scaled on a worker thread and only turned into PhotoImage on the Tk main
+thread, so loading portrait does not block the window. Recently displayed
+portraits are kept in a bounded LRU cache keyed by path and mtime, and
+thumbnails of the whole portraits directory could be generated in advance.
+
+Pillow is optional: with it images are decoded and scaled in the worker and
+thumbnails could be pre-generated, without it worker only reads files, which
+are decoded and subsampled by Tk.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import sys
+from math import ceil
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from tkinter import PhotoImage, TclError
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:
+    Image = ImageTk = None
+
+PILLOW_AVAILABLE = Image is not None
+THUMBNAIL_SIZE = (150, 150)
+CACHE_SIZE = 64
+THUMBNAILS_DIRECTORY = "thumbnails"
+THUMBNAIL_EXTENSION = ".png"
+# formats Tk reads without Pillow:
+TK_EXTENSIONS = (".gif", ".png", ".ppm", ".pgm")
+IMAGE_EXTENSIONS = TK_EXTENSIONS + ((".jpg", ".jpeg", ".bmp", ".webp")
+                                    if PILLOW_AVAILABLE else ())
+# how often Tk checks if the worker finished reading image:
+POLL_INTERVAL = 15  # milliseconds
+
+
+def thumbnail_file(file_path: str, thumbnails_path: str = None):
+    """
+    Return path to the thumbnail of the image.
+
+    :param file_path: str -- path to the image
+    :param thumbnails_path: str -- directory of the thumbnails, THUMBNAILS_
+     DIRECTORY subdirectory of the image directory by default
+    :return: str
+    """
+    directory, file_name = os.path.split(file_path)
+    if thumbnails_path is None:
+        thumbnails_path = os.path.join(directory, THUMBNAILS_DIRECTORY)
+    return os.path.join(thumbnails_path,
+                        os.path.splitext(file_name)[0] + THUMBNAIL_EXTENSION)
+
+
+def is_outdated(thumbnail: str, file_path: str):
+    """Check if thumbnail is missing or older than its image."""
+    return not os.path.isfile(thumbnail) or \
+        os.stat(thumbnail).st_mtime_ns < os.stat(file_path).st_mtime_ns
+
+
+def read_image(file_path: str, size=THUMBNAIL_SIZE):
+    """
+    Read the image in the worker thread, using its thumbnail if it is up to
+    date.
+
+    :param file_path: str -- path to the image
+    :param size: tuple -- maximum width and height of the portrait
+    :return: PIL.Image if Pillow is available, else bytes of the file
+    """
+    thumbnail = thumbnail_file(file_path)
+    if not is_outdated(thumbnail, file_path):
+        file_path = thumbnail
+    if PILLOW_AVAILABLE:
+        with Image.open(file_path) as image:
+            image.thumbnail(size)
+            image.load()
+            return image.copy()
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def photo_image(image, size=THUMBNAIL_SIZE):
+    """
+    Turn image read by read_image() into PhotoImage, on the Tk main thread.
+
+    :param image: PIL.Image or bytes
+    :param size: tuple -- maximum width and height of the portrait
+    :return: PhotoImage
+    """
+    if PILLOW_AVAILABLE:
+        return ImageTk.PhotoImage(image)
+    photo = PhotoImage(data=image)
+    factor = ceil(max(photo.width() / size[0], photo.height() / size[1]))
+    return photo.subsample(factor) if factor > 1 else photo
+
+
+def generate_thumbnails(directory: str, size=THUMBNAIL_SIZE,
+                        thumbnails_path: str = None):
+    """
+    Write thumbnails of all the images in the directory, which have no up
+    to date thumbnail yet. Requires Pillow.
+
+    :param directory: str -- path to the portraits
+    :param size: tuple -- maximum width and height of the thumbnails
+    :param thumbnails_path: str -- directory of the thumbnails
+    :return: int -- number of written thumbnails
+    """
+    if not PILLOW_AVAILABLE:
+        raise RuntimeError("Generating thumbnails requires Pillow")
+    count = 0
+    for file_name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, file_name)
+        if not file_name.lower().endswith(IMAGE_EXTENSIONS) or \
+                not os.path.isfile(file_path):
+            continue
+        thumbnail = thumbnail_file(file_path, thumbnails_path)
+        if is_outdated(thumbnail, file_path):
+            os.makedirs(os.path.dirname(thumbnail), exist_ok=True)
+            with Image.open(file_path) as image:
+                image.thumbnail(size)
+                image.save(thumbnail)
+            count += 1
+    return count
+
+
+def report_thumbnails_error(future):
+    """
+    Print error which stopped generate_thumbnails() submitted to the
+    executor, as exception of the future is lost if no one asks for it.
+
+    :param future: Future -- of the generate_thumbnails() call
+    """
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Could not generate thumbnails: {future.exception()!r}",
+              file=sys.stderr)
+
+
+class PortraitCache:
+    """
+    LRU cache of the portraits, loading missing ones in background.
+    """
+
+    def __init__(self, master, size=THUMBNAIL_SIZE, capacity=CACHE_SIZE):
+        """
+        :param master: Tk -- window which main loop receives loaded images
+        :param size: tuple -- maximum width and height of the portraits
+        :param capacity: int -- maximum number of cached portraits
+        """
+        self.master = master
+        self.size = size
+        self.capacity = capacity
+        self.images = OrderedDict()  # {(path, mtime): PhotoImage}
+        self.executor = ThreadPoolExecutor(1)
+
+    @staticmethod
+    def key(file_path: str):
+        """Return cache key of the image, or None if file does not exist."""
+        try:
+            return file_path, os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, file_path: str):
+        """
+        Return cached portrait of the file, if it is cached and file did not
+        change since.
+
+        :param file_path: str -- path to the image
+        :return: PhotoImage or None
+        """
+        key = self.key(file_path)
+        if key is None or key not in self.images:
+            return None
+        self.images.move_to_end(key)
+        return self.images[key]
+
+    def load(self, file_path: str, callback):
+        """
+        Pass portrait of the file to the callback, at once if it is cached,
+        else when worker reads it. Callback is always called on the Tk main
+        thread, with None if file does not exist or could not be read.
+
+        :param file_path: str -- path to the image
+        :param callback: callable -- receiving PhotoImage or None
+        """
+        key = self.key(file_path)
+        if key is None:
+            print(f"Image {file_path} does not exist!")
+            return callback(None)
+        if key in self.images:
+            self.images.move_to_end(key)
+            return callback(self.images[key])
+        future = self.executor.submit(read_image, file_path, self.size)
+        self.master.after(POLL_INTERVAL, self._receive, key, future, callback)
+
+    def prefetch(self, file_paths):
+        """
+        Load portraits in background, so they are displayed at once later.
+        Only first capacity of them are loaded, as only these could stay
+        cached.
+
+        :param file_paths: iterable -- of str, paths to the images
+        """
+        for file_path in islice(file_paths, self.capacity):
+            self.load(file_path, lambda image: None)
+
+    def _receive(self, key, future, callback):
+        if not future.done():
+            self.master.after(POLL_INTERVAL, self._receive, key, future,
+                              callback)
+            return
+        try:
+            image = photo_image(future.result(), self.size)
+        except (OSError, ValueError, TclError) as error:  # corrupted file
+            print(f"Image {key[0]} could not be read: {error}")
+            return callback(None)
+        self.images[key] = image
+        self.images.move_to_end(key)
+        while len(self.images) > self.capacity:
+            self.images.popitem(last=False)
+        callback(image)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
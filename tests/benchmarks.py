@@ -0,0 +1,277 @@
+"""
+Headless benchmarks of the generator, loaders of the banks, translator and
+saving of the characters. No display is needed, Tk is never imported.
+
+Each benchmark reports best time of one operation (character, call or round-
+trip). Results are saved as JSON, so two runs could be compared:
+
+    python -m tests.benchmarks --out before.json
+    python -m tests.benchmarks --out after.json --compare before.json
+
+Run fails, if any benchmark got slower than the threshold allows.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import timeit
+import argparse
+import platform
+import tempfile
+
+from generator.generator import *
+from generator.export import export, JSONL
+from generator.library import CharacterLibrary, MEMORY
+from generator.name_pool import load_pool
+from generator.search import SearchIndex
+from generator.sheets import write_sheet, read_sheet
+from generator.vectorized import NUMPY_AVAILABLE
+from translator.translator import setup_translator, translate, \
+    translate_column
+
+LANGUAGES_PATH = PATH + "/languages/"
+BANK_SIZES = (100, 1000, 10000)
+BATCH_SIZE = 10000
+ROUND_TRIP_SIZE = 1000
+REPEAT = 5
+THRESHOLD = 0.25  # 25% slower than the baseline fails the run
+# GUI passes unchecked "randomize" checkboxes as locks:
+GUI_LOCKS = (SEX, AGE)
+# professions named by the rules of model.txt and loot.txt:
+RULED_PROFESSIONS = ["doctor", "mercenary", "policeman", "priest", "retired",
+                     "soldier", "student"]
+WEAPONS_SIZE = 20
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """
+    Register function yielding (name, callable, operations) tuples, where
+    operations is number of operations done by one call of the callable.
+    """
+    BENCHMARKS.append(function)
+    return function
+
+
+def random_words(count: int, rng: random.Random):
+    return [f"Name{rng.getrandbits(32):08x}" for _ in range(count)]
+
+
+def write_banks(directory: str, size: int, rng: random.Random):
+    """
+    Write synthetic names.txt, surnames.txt and professions.txt with size
+    entries in each list.
+    """
+    with open(os.path.join(directory, "names.txt"), "w") as file:
+        for ethnicity in ETHNICITIES:
+            file.write(f"{ethnicity}:\n")
+            for sex in SEXES:
+                file.write(f"{sex} = [{', '.join(random_words(size, rng))}]\n")
+        file.write("\nEOF\n")
+    with open(os.path.join(directory, "surnames.txt"), "w") as file:
+        file.write("SURNAMES:\n")
+        for ethnicity in ETHNICITIES:
+            file.write(f"{ethnicity} = "
+                       f"[{', '.join(random_words(size, rng))}]\n")
+        file.write("\nEOF\n")
+    with open(os.path.join(directory, "professions.txt"), "w") as file:
+        file.write(", ".join(random_words(size, rng)) + "\n")
+
+
+def workspace_banks(workspace: str):
+    """
+    Return banks of CharacterGenerator: names and surnames pools compiled
+    into the workspace, so the benchmarks never write caches next to the
+    real config files, and synthetic professions and weapons, which are not
+    shipped with the config files.
+    """
+    rng = random.Random(0)
+    cache = os.path.join(workspace, "cache", "")
+    return {"names": load_pool("names.txt", load_names, cache_path=cache),
+            "surnames": load_pool("surnames.txt", load_surnames,
+                                  cache_path=cache),
+            "professions": sorted(RULED_PROFESSIONS +
+                                  random_words(BANK_SIZES[0], rng)),
+            "pistols": random_words(WEAPONS_SIZE, rng),
+            "rifles": random_words(WEAPONS_SIZE, rng)}
+
+
+@benchmark
+def generation(workspace: str):
+    banks = workspace_banks(workspace)
+    generator = CharacterGenerator(**banks)
+    base = generator.new_character()
+    yield "generate/new_character", \
+        lambda: generator.new_character((), base), 1
+    yield "generate/new_character_locked", \
+        lambda: generator.new_character(GUI_LOCKS, base), 1
+    yield f"generate/batch[{BATCH_SIZE}]", \
+        lambda: generator.generate(BATCH_SIZE), BATCH_SIZE
+    yield "generate/character_at", \
+        lambda: generator.character_at(1, random.getrandbits(32)), 1
+    synthesizing = CharacterGenerator(synthesize=True, **banks)
+    yield "generate/synthesized_name", \
+        lambda: synthesizing.name_generator(WHITE, MALE), 1
+
+
+@benchmark
+def loaders(workspace: str):
+    rng = random.Random(0)
+    for size in BANK_SIZES:
+        directory = os.path.join(workspace, f"banks{size}", "")
+        os.makedirs(directory)
+        write_banks(directory, size, rng)
+        yield f"load/names[{size}]", \
+            lambda d=directory: load_names("names.txt", d), 1
+        yield f"load/surnames[{size}]", \
+            lambda d=directory: load_surnames("surnames.txt", d), 1
+        yield f"load/list_from_file[{size}]", \
+            lambda d=directory: load_list_from_file(PROFFESIONS, d), 1
+
+
+@benchmark
+def translation(workspace: str):
+    # catalogs are compiled into cache of the copied language files:
+    languages = os.path.join(workspace, "languages", "")
+    shutil.copytree(LANGUAGES_PATH, languages,
+                    ignore=shutil.ignore_patterns("cache"))
+    setup_translator(languages, "english.txt")
+    yield "translate/word", lambda: translate(ETHNICITY), 1
+    yield "translate/words", lambda: translate(NAME, AND, SURNAME), 1
+    codes = [random.randrange(len(ETHNICITIES)) for _ in range(BATCH_SIZE)]
+    yield f"translate/column[{BATCH_SIZE}]", \
+        lambda: translate_column(codes, ETHNICITIES), BATCH_SIZE
+
+
+@benchmark
+def search(workspace: str):
+    words = random_words(BANK_SIZES[-1], random.Random(0))
+    index = SearchIndex(words)
+    yield f"search/build[{len(words)}]", lambda: SearchIndex(words), 1
+    # prefix of many words, prefix of few and trigram inside the words:
+    for query in ("name", "name0a", "a1b"):
+        yield f"search/query[{query}]", \
+            lambda q=query: index.search(q), 1
+
+
+@benchmark
+def round_trips(workspace: str):
+    banks = workspace_banks(workspace)
+    characters = CharacterGenerator(**banks).generate(ROUND_TRIP_SIZE)
+    sheet = os.path.join(workspace, "sheet.txt")
+
+    def sheet_round_trip():
+        for character in characters:
+            write_sheet(sheet, character)
+            read_sheet(sheet)
+
+    def library_round_trip():
+        with CharacterLibrary(MEMORY) as library:
+            library.add_many(characters)
+            for _ in library.pages():
+                pass
+
+    output = os.path.join(workspace, "characters.jsonl")
+    yield "round_trip/sheet", sheet_round_trip, ROUND_TRIP_SIZE
+    yield "round_trip/library", library_round_trip, ROUND_TRIP_SIZE
+    yield "save/export_jsonl", \
+        lambda: export(ROUND_TRIP_SIZE, JSONL, output,
+                       generator_kwargs=banks), ROUND_TRIP_SIZE
+
+
+def measure(function, operations: int, repeat: int = REPEAT):
+    """
+    Return best time of one operation done by the function, in seconds.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number / operations
+
+
+def run(pattern: str = "", repeat: int = REPEAT):
+    """
+    Run all the benchmarks which names contain the pattern.
+
+    :param pattern: str -- part of the names of the benchmarks to run
+    :param repeat: int -- number of measurements, the best one is reported
+    :return: dict -- {name: seconds per operation}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        for suite in BENCHMARKS:
+            for name, function, operations in suite(workspace):
+                if pattern in name:
+                    results[name] = measure(function, operations, repeat)
+                    print(f"{name:<36}{results[name] * 1e6:12.2f} us/op",
+                          file=sys.stderr)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD):
+    """
+    Find benchmarks slower than in the baseline more than threshold allows.
+
+    :param results: dict -- {name: seconds per operation}
+    :param baseline: dict -- {name: seconds per operation}
+    :param threshold: float -- allowed slowdown, 0.25 means 25%
+    :return: list -- of (name, baseline time, current time) tuples
+    """
+    return [(name, baseline[name], seconds) for name, seconds in
+            results.items() if name in baseline and
+            seconds > baseline[name] * (1 + threshold)]
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument("--out", help="save results to the JSON file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="JSON file of previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown, 0.25 means 25%%")
+    parser.add_argument("--filter", default="",
+                        help="run only benchmarks which names contain it")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    """
+    Run benchmarks, save and compare results.
+
+    :return: int -- exit status, 1 if any benchmark regressed
+    """
+    arguments = parse_arguments(arguments)
+    results = run(arguments.filter, arguments.repeat)
+    if arguments.out is not None:
+        with open(arguments.out, "w") as file:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "numpy": NUMPY_AVAILABLE,
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": results}, file, indent=2, sort_keys=True)
+    if arguments.compare is None:
+        return 0
+    with open(arguments.compare) as file:
+        baseline = json.load(file)["results"]
+    regressions = compare(results, baseline, arguments.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1e6:.2f} -> {after * 1e6:.2f} "
+              f"us/op ({after / before - 1:+.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
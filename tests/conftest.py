@@ -0,0 +1,39 @@
+"""
+Fixtures shared by the tests. Generator gets small banks of names,
+professions and weapons, as these config files are not shipped with the
+repository, while distributions, model and loot tables are loaded from it.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import pytest
+
+from generator.categories import ETHNICITIES, SEXES
+from generator.generator import CharacterGenerator
+
+BANKS = {"names": {ethnicity: {sex: [f"{ethnicity.title()}{sex.title()}{i}"
+                                     for i in range(10)] for sex in SEXES}
+                   for ethnicity in ETHNICITIES},
+         "surnames": {ethnicity: [f"{ethnicity.title()}Surname{i}"
+                                  for i in range(10)]
+                      for ethnicity in ETHNICITIES},
+         "professions": ["doctor", "mercenary", "nurse", "policeman",
+                         "priest", "retired", "soldier", "student"],
+         "pistols": ["Beretta 92", "Glock 17"],
+         "rifles": ["AK-47", "Remington 700"]}
+
+
+@pytest.fixture
+def banks():
+    """Return arguments of CharacterGenerator with the test banks."""
+    return dict(BANKS)
+
+
+@pytest.fixture
+def generator(banks):
+    return CharacterGenerator(**banks)
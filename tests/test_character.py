@@ -0,0 +1,65 @@
+"""
+Tests of the Character record and the columnar CharacterStore.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import pytest
+
+from generator import character as character_module
+from generator.categories import *
+from generator.character import Character, CharacterStore, CHARACTER_FIELDS
+
+
+@pytest.fixture(params=["numpy", "python"])
+def filter_path(request, monkeypatch):
+    """Run the test with and without NumPy filtering the store."""
+    if request.param == "python":
+        monkeypatch.setattr(character_module, "np", None)
+    elif character_module.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+def test_character_has_no_instance_dict():
+    character = Character("John", "Smith")
+    with pytest.raises(AttributeError):
+        character.nickname = "Johnny"
+    assert character.as_dict()["surname"] == "Smith"
+    assert list(character.as_dict()) == list(CHARACTER_FIELDS)
+
+
+def test_store_returns_stored_characters(generator):
+    characters = generator.generate(200)
+    store = CharacterStore(characters)
+    assert len(store) == 200
+    assert list(store) == characters
+    assert store[17] == characters[17]
+    assert store.column("years") == [c.years for c in characters]
+    assert store.column("profession") == [c.profession for c in characters]
+
+
+def test_text_values_are_interned(generator):
+    store = CharacterStore(generator.generate(300))
+    assert store.vocabularies["age"] == list(AGES)
+    professions = store.vocabularies["profession"]
+    assert len(professions) == len(set(professions)) <= 8
+
+
+def test_filter(generator, filter_path):
+    characters = generator.generate(500)
+    store = CharacterStore(characters)
+    rows = store.filter(age=OLD, sex=FEMALE, centimeters=(170, None))
+    assert list(rows) == [i for i, c in enumerate(characters)
+                          if c.age == OLD and c.sex == FEMALE and
+                          c.centimeters >= 170]
+    assert rows
+    rows = store.filter(years=(None, 30), profession="priest")
+    assert list(rows) == [i for i, c in enumerate(characters)
+                          if c.years < 30 and c.profession == "priest"]
+    assert list(store.filter(profession="astronaut")) == []
@@ -0,0 +1,50 @@
+"""
+Tests of the random access to the characters of the seeded populations.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+from generator import generator as generator_module
+from generator.categories import SEX
+from generator.character import Character
+from generator.counter_random import character_random
+from generator.generator import CharacterGenerator
+
+SEED = 0x5EED
+
+
+def test_keyed_stream_is_stable():
+    # saved (seed, index) references must give the same stream forever:
+    assert character_random(1, 2).getrandbits(32) == 3379791934
+    assert character_random(1, 2).random() != character_random(1, 3).random()
+
+
+def test_character_at_is_stable(generator, banks):
+    characters = [generator.character_at(SEED, i) for i in range(50)]
+    # fresh generator and draws of the global generator change nothing:
+    other = CharacterGenerator(**banks)
+    other.generate(10)
+    assert [other.character_at(SEED, i) for i in range(50)] == characters
+    assert len({c.name + c.surname for c in characters}) > 1
+
+
+def test_generate_range_equals_character_at(generator):
+    assert generator.generate_range(SEED, 1000, 20) == \
+        [generator.character_at(SEED, i) for i in range(1000, 1020)]
+
+
+def test_character_at_does_not_depend_on_numpy(generator, monkeypatch):
+    with_numpy = generator.generate_range(SEED, 0, 20)
+    monkeypatch.setattr(generator_module, "NUMPY_AVAILABLE", False)
+    assert generator.generate_range(SEED, 0, 20) == with_numpy
+
+
+def test_locked_categories_are_kept(generator):
+    base = Character(sex="FEMALE")
+    assert {generator.character_at(SEED, i, [SEX], base).sex
+            for i in range(20)} == {"FEMALE"}
@@ -0,0 +1,82 @@
+"""
+Tests of the weighted distributions compiled to alias tables.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+import pytest
+
+from generator.categories import *
+from generator.distributions import (
+    AliasTable, compile_distributions, load_distributions, parse_weights
+)
+
+
+def exact_probabilities(table: AliasTable):
+    """Return probability of drawing each value, read from the columns."""
+    n = len(table)
+    probabilities = [0.0] * n
+    for column, (p, alias) in enumerate(zip(table.probabilities,
+                                            table.aliases)):
+        probabilities[column] += p / n
+        probabilities[alias] += (1.0 - p) / n
+    return probabilities
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1], [2, 4, 1], [4, 3, 1, 0, 8],
+                                     [0, 0, 5], [0.1, 1000, 3.5, 7]])
+def test_table_keeps_weights(weights):
+    table = AliasTable(range(len(weights)), weights)
+    expected = [w / sum(weights) for w in weights]
+    assert exact_probabilities(table) == pytest.approx(expected)
+
+
+def test_values_with_zero_weight_are_never_drawn():
+    table = AliasTable("abc", [0, 1, 0])
+    rng = random.Random(1)
+    assert {table.draw(rng) for _ in range(1000)} == {"b"}
+
+
+def test_draws_follow_weights():
+    table = AliasTable((SHORT, AVERAGE, TALL), [2, 4, 1])
+    rng = random.Random(2)
+    draws = [table.draw(rng) for _ in range(70000)]
+    assert draws.count(AVERAGE) / len(draws) == pytest.approx(4 / 7, 0.02)
+    assert draws.count(TALL) / len(draws) == pytest.approx(1 / 7, 0.05)
+
+
+@pytest.mark.parametrize("values, weights", [([], None), ("ab", [1]),
+                                             ("ab", [1, -1]), ("ab", [0, 0])])
+def test_invalid_tables_are_rejected(values, weights):
+    with pytest.raises(ValueError):
+        AliasTable(values, weights)
+
+
+def test_parse_weights():
+    assert parse_weights(["SHORT: 2", " ", "TALL:0.5"]) == {SHORT: 2.0,
+                                                            TALL: 0.5}
+
+
+def test_file_overrides_default_weights(tmp_path):
+    tmp_path.joinpath("distributions.txt").write_text(
+        "DISTRIBUTIONS:\nSEX = [MALE: 3, FEMALE: 1]\n"
+        "PROFESSION = [doctor: 2]\n")
+    weights = load_distributions(file_path=str(tmp_path) + "/")
+    assert weights[SEX] == {MALE: 3.0, FEMALE: 1.0}
+    assert weights[HEIGHT] == DEFAULT_WEIGHTS[HEIGHT]
+    tables = compile_distributions(weights, ["doctor", "nurse"])
+    assert exact_probabilities(tables[PROFESSION]) == pytest.approx(
+        [2 / 3, 1 / 3])
+    assert exact_probabilities(tables[SEX]) == pytest.approx([0.75, 0.25])
+
+
+def test_missing_file_keeps_default_weights(tmp_path):
+    assert load_distributions(file_path=str(tmp_path) + "/") == \
+        DEFAULT_WEIGHTS
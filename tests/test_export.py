@@ -0,0 +1,77 @@
+"""
+Tests of the streaming export of the characters to JSONL and CSV files.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from generator.categories import *
+from generator.character import Character, CHARACTER_FIELDS
+from generator.export import CSV, JSONL, export, format_csv, format_jsonl
+
+SEED = 2019
+
+
+@pytest.fixture
+def characters(generator):
+    return generator.generate_range(SEED, 0, 25)
+
+
+def test_jsonl_rows_are_characters(generator, banks, tmp_path):
+    path = str(tmp_path / "characters.jsonl")
+    assert export(25, JSONL, path, seed=SEED, batch_size=10,
+                  generator_kwargs=banks) == 25
+    with open(path, encoding="utf-8") as file:
+        rows = [Character(**json.loads(line)) for line in file]
+    assert rows == generator.generate_range(SEED, 0, 25)
+
+
+def test_csv_has_header_and_rows(generator, banks, tmp_path):
+    path = str(tmp_path / "characters.csv")
+    export(25, CSV, path, seed=SEED, batch_size=7, generator_kwargs=banks)
+    with open(path, encoding="utf-8", newline="") as file:
+        header, *rows = list(csv.reader(file))
+    assert header == list(CHARACTER_FIELDS)
+    expected = generator.generate_range(SEED, 0, 25)
+    assert [row[0] for row in rows] == [c.name for c in expected]
+    assert [int(row[5]) for row in rows] == [c.years for c in expected]
+
+
+def test_compressed_export(banks, tmp_path):
+    plain, compressed = str(tmp_path / "plain"), str(tmp_path / "gzip")
+    for path, compress in ((plain, False), (compressed, True)):
+        export(30, JSONL, path, compress, seed=SEED, generator_kwargs=banks)
+    with open(plain, "rb") as file, gzip.open(compressed, "rb") as archive:
+        assert archive.read() == file.read()
+
+
+def test_locked_categories_are_exported(banks, tmp_path):
+    path = str(tmp_path / "characters.jsonl")
+    base = Character(ethnicity=LATINO, sex=FEMALE)
+    export(20, JSONL, path, locks={ETHNICITY, SEX}, base=base, seed=SEED,
+           generator_kwargs=banks)
+    with open(path, encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert {(row["ethnicity"], row["sex"]) for row in rows} == {
+        (LATINO, FEMALE)}
+
+
+def test_formatters_keep_all_the_fields(characters):
+    lines = format_jsonl(characters).splitlines()
+    assert [json.loads(line) for line in lines] == \
+        [c.as_dict() for c in characters]
+    assert format_csv([]) == ""
+    # weapons are separated by newlines, quoted by csv module:
+    rows = list(csv.reader(format_csv(characters).splitlines(True)))
+    assert rows == [[str(value) for value in c.as_tuple()]
+                    for c in characters]
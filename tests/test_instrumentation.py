@@ -0,0 +1,68 @@
+"""
+Tests of the instrumentation of the stages of the generation.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import io
+import random
+import pstats
+
+import pytest
+
+from generator import instrumentation
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_stages_are_not_recorded():
+    instrumentation.reset()
+    with instrumentation.measured("batch"):
+        pass
+    assert instrumentation.stats() == {}
+
+
+def test_stages_are_counted(enabled, generator):
+    generator.generate(20)
+    stats = instrumentation.stats()
+    assert {"ethnicity_sex", "body", "profession", "weapon", "loot",
+            "names"} <= set(stats)
+    assert stats["names"]["count"] == 20
+    assert 0 <= stats["names"]["p50"] <= stats["names"]["p99"]
+    report = io.StringIO()
+    instrumentation.report(report)
+    assert "names" in report.getvalue()
+
+
+def test_stats_do_not_change_generated_characters(generator, monkeypatch):
+    # small sample, so reservoir sampling replaces durations:
+    monkeypatch.setattr(instrumentation, "SAMPLES", 10)
+    random.seed(7)
+    expected = generator.generate(50)
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        random.seed(7)
+        assert generator.generate(50) == expected
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+def test_profiled_saves_stats(tmp_path, generator):
+    path = str(tmp_path / "generate.prof")
+    with instrumentation.profiled(path):
+        generator.generate(10)
+    assert pstats.Stats(path).total_calls > 0
@@ -0,0 +1,82 @@
+"""
+Tests of the library of the saved characters.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+
+import pytest
+
+from generator.character import Character
+from generator.library import CharacterLibrary, MEMORY
+from generator.sheets import unique_sheet_path, write_sheet
+
+
+def character(name: str, years: int, profession: str = "nurse"):
+    return Character(name, "Smith", "WHITE", "MALE", "ADULT", years,
+                     "AVERAGE", 175, "AVERAGE", 70, profession)
+
+
+@pytest.fixture
+def library():
+    with CharacterLibrary(MEMORY) as library:
+        yield library
+
+
+def test_saving_sheet_again_updates_its_character(library):
+    id_ = library.save(character("John", 30), "characters/John Smith.txt")
+    assert library.save(character("John", 31, "doctor"),
+                        "characters/John Smith.txt") == id_
+    assert len(library) == 1
+    assert library.get(id_) == character("John", 31, "doctor")
+    # characters of the same names saved by add() are kept separately:
+    library.add(character("John", 30))
+    assert len(library) == 2
+
+
+def test_removed_character_is_saved_again(library):
+    id_ = library.save(character("John", 30), "John Smith.txt")
+    library.remove(id_)
+    new_id = library.save(character("John", 32), "John Smith.txt")
+    assert library.get(new_id).years == 32
+    assert len(library) == 1
+
+
+def test_query_pages(library):
+    library.add_many(character(f"John{i}", 20 + i) for i in range(25))
+    pages = list(library.pages(page_size=10, years=(25, None)))
+    assert [len(page) for page in pages] == [10, 10]
+    assert library.count(name=("John0", "John24")) == 2
+    with pytest.raises(ValueError):
+        library.count(nickname="Johnny")
+
+
+def test_importing_sheets_again_updates_them(library, tmp_path):
+    write_sheet(tmp_path / "John Smith.txt", character("John", 30))
+    write_sheet(tmp_path / "John Smith (2).txt", character("John", 50))
+    (tmp_path / "broken.txt").write_text("no fields here\n")
+    skipped = []
+    assert library.import_sheets(str(tmp_path), on_error=lambda path, error:
+                                 skipped.append(path)) == 2
+    write_sheet(tmp_path / "John Smith.txt", character("John", 31))
+    library.import_sheets(str(tmp_path))
+    assert len(library) == 2
+    assert sorted(c.years for _, c in library.query()) == [31, 50]
+    assert [os.path.basename(path) for path in skipped] == ["broken.txt"]
+    # sheet saved from the application is the same imported sheet:
+    library.save(character("John", 32), tmp_path / "John Smith.txt")
+    assert len(library) == 2
+
+
+def test_sheets_of_the_same_name_get_unique_paths(tmp_path):
+    first = unique_sheet_path(str(tmp_path), "John Smith")
+    write_sheet(first, character("John", 30))
+    second = unique_sheet_path(str(tmp_path), "John Smith")
+    assert os.path.basename(first) == "John Smith.txt"
+    assert os.path.basename(second) == "John Smith (2).txt"
@@ -0,0 +1,76 @@
+"""
+Tests of parsing and rolling of the loot tables.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+import pytest
+
+from generator.categories import CLOTHES, POCKETS, WEAPONS
+from generator.loot import LootTables, parse_entries, parse_part
+
+
+@pytest.mark.parametrize("text, part", [
+    ("cap", ("cap", False, 1, 1)),
+    ("coins x1-20", ("coins", False, 1, 20)),
+    ("@POCKET_ITEM x3", ("POCKET_ITEM", True, 3, 3)),
+    ("NONE", None),
+])
+def test_parse_part(text, part):
+    assert parse_part(text) == part
+
+
+def test_invalid_quantity_range():
+    with pytest.raises(ValueError):
+        parse_part("coins x5-1")
+
+
+def test_parse_entries():
+    assert parse_entries(["@RIFLE + @PISTOL: 2", "NONE: 1", "note: urgent",
+                          " "]) == [
+        ((("RIFLE", True, 1, 1), ("PISTOL", True, 1, 1)), 2.0),
+        ((), 1.0),
+        ((("note: urgent", False, 1, 1),), 1.0)]
+
+
+def test_professions_use_their_tables():
+    rules = {(CLOTHES, None): parse_entries(["@HEAD + jeans"]),
+             ("HEAD", None): parse_entries(["cap"]),
+             (CLOTHES, "soldier"): parse_entries(["uniform"])}
+    loot = LootTables(rules, professions=["nurse", "soldier"])
+    rng = random.Random(0)
+    assert loot.roll(CLOTHES, 0, rng) == "cap, jeans"
+    assert loot.roll(CLOTHES, 1, rng) == "uniform"
+    assert loot.roll(CLOTHES, None, rng) == "cap, jeans"
+    assert loot.roll(POCKETS, None, rng) == ""
+
+
+def test_weapon_banks_fill_default_tables():
+    loot = LootTables({(WEAPONS, None): parse_entries(["@PISTOL + @RIFLE"])},
+                      pistols=["Glock 17"], rifles=["AK-47"])
+    assert loot.roll(WEAPONS, None, random.Random(0)) == "Glock 17\n\nAK-47"
+
+
+def test_quantities_of_the_same_item_are_summed():
+    rules = {(POCKETS, None): parse_entries(["@ITEM x3 + coins x2"]),
+             ("ITEM", None): parse_entries(["magazine + coins x5"])}
+    loot = LootTables(rules)
+    assert loot.roll(POCKETS, None, random.Random(0)) == \
+        "magazine ×3, coins ×17"
+
+
+@pytest.mark.parametrize("rules", [
+    {(POCKETS, None): parse_entries(["@MISSING"])},
+    {(POCKETS, None): parse_entries(["@BAG"]),
+     ("BAG", None): parse_entries(["@POCKETS"])},
+])
+def test_invalid_references(rules):
+    with pytest.raises(ValueError):
+        LootTables(rules)
@@ -0,0 +1,91 @@
+"""
+Tests of the Markov-chain synthesis of the names.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import random
+
+import pytest
+
+from generator.generator import CharacterGenerator
+from generator.markov import (
+    BOUNDARY, MARKOV_EXTENSION, NameSynthesizer, train
+)
+from generator.name_pool import NamePool, pool_key
+
+NAMES = {"WHITE": {"MALE": ["Adam", "Adrian", "Albert", "Alan", "Arnold",
+                            "Bernard", "Brian", "Conrad", "Daniel", "Martin"],
+                   "FEMALE": ["Eve"]}}
+
+
+@pytest.fixture
+def pool():
+    return NamePool.from_banks(NAMES)
+
+
+def test_train_counts_next_letters():
+    transitions = train(["ana", "an"], order=2)
+    assert dict(zip(*transitions["an"])) == {"a": 1, BOUNDARY: 1}
+    assert dict(zip(*transitions[BOUNDARY])) == {"a": 2}
+    assert dict(zip(*transitions[BOUNDARY * 2])) == {"a": 2}
+
+
+def test_synthesized_names_are_new(pool):
+    synthesizer = NameSynthesizer(pool, lengths=(3, 8))
+    rng = random.Random(5)
+    names = [synthesizer.draw(rng, "WHITE", "MALE") for _ in range(200)]
+    new = [name for name in names if name not in NAMES["WHITE"]["MALE"]]
+    assert len(set(new)) > 10
+    assert all(3 <= len(name) <= 8 for name in new)
+    # letters of the names follow letters seen in the bank:
+    assert all(name[0] in "ABCDM" for name in names)
+
+
+def test_same_seed_gives_same_names(pool):
+    synthesizer = NameSynthesizer(pool)
+    first, second = random.Random(1), random.Random(1)
+    assert [synthesizer.draw(first, "WHITE", "MALE") for _ in range(20)] == \
+        [synthesizer.draw(second, "WHITE", "MALE") for _ in range(20)]
+
+
+def test_bank_name_is_drawn_if_no_new_one_exists(pool):
+    synthesizer = NameSynthesizer(pool)
+    rng = random.Random(2)
+    assert {synthesizer.draw(rng, "WHITE", "FEMALE")
+            for _ in range(20)} == {"Eve"}
+
+
+def test_transitions_are_cached_until_source_changes(pool, tmp_path):
+    source = tmp_path / "names.txt"
+    source.write_text("first version")
+    cache_path = str(tmp_path / "cache") + "/"
+    cache_file = cache_path + "names.3" + MARKOV_EXTENSION
+    trained = NameSynthesizer(pool, str(source), cache_path=cache_path)
+    assert os.path.isfile(cache_file)
+    # other bank would be trained to other chains, these are read from file:
+    other = NamePool.from_banks({"BLACK": {"MALE": ["Zed"]}})
+    cached = NameSynthesizer(other, str(source), cache_path=cache_path)
+    assert cached.chains.keys() == trained.chains.keys()
+    source.write_text("second version")
+    retrained = NameSynthesizer(other, str(source), cache_path=cache_path)
+    assert list(retrained.chains) == [pool_key("BLACK", "MALE")]
+    with open(cache_file, "wb") as file:
+        file.write(b"\x00")
+    corrupt = NameSynthesizer(pool, str(source), cache_path=cache_path)
+    assert corrupt.chains.keys() == trained.chains.keys()
+
+
+def test_generator_synthesizes_names(banks):
+    generator = CharacterGenerator(**banks, synthesize=True,
+                                   rng=random.Random(3))
+    names = {generator.new_character().name for _ in range(100)}
+    bank = {name for pools in banks["names"].values()
+            for pool in pools.values() for name in pool}
+    assert names - bank
@@ -0,0 +1,65 @@
+"""
+Tests of the conditional model of the attributes.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+import pytest
+
+from generator.categories import *
+from generator.distributions import compile_distributions
+from generator.generator import CharacterGenerator
+from generator.model import CompiledModel, DEFAULT
+
+PROFESSIONS = ["retired", "soldier", "student"]
+RULES = {(HEIGHT, MALE): {WHITE: 5},
+         (HEIGHT, FEMALE): {JAPANESE: -15},
+         (PROFESSION, OLD): {"retired": 100, "student": 0},
+         (ARMED, None): {DEFAULT: 0, "soldier": 1}}
+
+
+@pytest.fixture
+def model():
+    return CompiledModel(compile_distributions(DEFAULT_WEIGHTS, PROFESSIONS),
+                         RULES, PROFESSIONS)
+
+
+def test_height_offsets(model):
+    assert model.height_offset(MALE, WHITE) == 5
+    assert model.height_offset(FEMALE, JAPANESE) == -15
+    assert model.height_offset(MALE, JAPANESE) == 0
+    assert model.height_offset("unknown", WHITE) == 0
+
+
+def test_professions_depend_on_age(model):
+    rng = random.Random(0)
+    old = [model.draw_profession(OLD, rng)[1] for _ in range(500)]
+    assert "student" not in old
+    assert old.count("retired") > 450
+
+
+def test_armed_depends_on_profession(model):
+    rng = random.Random(0)
+    soldier = model.profession_codes["soldier"]
+    assert all(model.is_armed(soldier, rng) for _ in range(100))
+    assert not any(model.is_armed(None, rng) for _ in range(100))
+
+
+def test_centimeters_are_shifted_by_offset(banks):
+    generator = CharacterGenerator(rules=RULES, **banks)
+    # the same gaussian draw shifted by offsets of 5 and -15 cm:
+    assert generator.random_centimeters(
+        AVERAGE, MALE, WHITE, random.Random(1)) - \
+        generator.random_centimeters(
+            AVERAGE, FEMALE, JAPANESE, random.Random(1)) == 20
+    rng = random.Random(2)
+    heights = [generator.random_centimeters(AVERAGE, FEMALE, JAPANESE, rng)
+               for _ in range(2000)]
+    assert 158 < sum(heights) / len(heights) < 162
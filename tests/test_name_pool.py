@@ -0,0 +1,81 @@
+"""
+Tests of the compiled pools of names.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import random
+
+import pytest
+
+from generator.name_pool import NamePool, compile_pool, load_pool
+
+NAMES = {"WHITE": {"MALE": ["John", "Adam: 3"], "FEMALE": ["Zoë", "Anna"]},
+         "CHINESE": {"MALE": ["Wei", "An"], "FEMALE": ["An", "Mei"]}}
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "names.txt"
+    path.write_text("banks are given by the loader\n")
+    return str(path)
+
+
+def test_pool_file_round_trip(tmp_path, source_file):
+    pool_file = str(tmp_path / "cache" / "names.pool")
+    compile_pool(NAMES, source_file, pool_file)
+    pool = NamePool.from_file(pool_file)
+    try:
+        assert pool.source_mtime == os.stat(source_file).st_mtime_ns
+        assert list(pool.names("WHITE", "MALE")) == ["Adam", "John"]
+        assert list(pool.names("WHITE", "FEMALE")) == ["Anna", "Zoë"]
+        # names shared by the pools are stored once:
+        assert len(pool) == 7
+        assert pool.contains("An", "CHINESE", "FEMALE")
+        assert not pool.contains("Mei", "CHINESE", "MALE")
+        assert pool.string_id("Nobody") is None
+    finally:
+        pool.close()
+
+
+def test_weighted_draw_follows_weights():
+    pool = NamePool.from_banks(NAMES)
+    rng = random.Random(0)
+    drawn = [pool.draw(rng, "WHITE", "MALE") for _ in range(4000)]
+    assert set(drawn) == {"John", "Adam"}
+    assert 0.7 < drawn.count("Adam") / len(drawn) < 0.8
+
+
+def test_close_with_live_views(tmp_path, source_file):
+    pool_file = str(tmp_path / "names.pool")
+    compile_pool(NAMES, source_file, pool_file)
+    pool = NamePool.from_file(pool_file)
+    indexes = pool.pool_indexes("CHINESE", "MALE")
+    pool.close()
+    assert len(indexes) == 2
+
+
+def test_load_pool_compiles_only_changed_file(tmp_path, source_file):
+    calls = []
+
+    def loader(file_name, file_path):
+        calls.append(file_name)
+        return NAMES
+
+    cache_path = str(tmp_path / "cache") + os.sep
+    file_path = os.path.dirname(source_file) + os.sep
+    load_pool("names.txt", loader, file_path, cache_path).close()
+    load_pool("names.txt", loader, file_path, cache_path).close()
+    assert calls == ["names.txt"]
+    mtime = os.stat(source_file).st_mtime_ns
+    os.utime(source_file, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+    pool = load_pool("names.txt", loader, file_path, cache_path)
+    assert calls == ["names.txt", "names.txt"]
+    assert pool.source_mtime == mtime + 10 ** 9
+    pool.close()
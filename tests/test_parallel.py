@@ -0,0 +1,48 @@
+"""
+Tests of the batch generation in pool of processes.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import pytest
+
+from generator.export import CSV, JSONL, export
+from generator.parallel import generate_parallel
+
+SEED = 12345
+
+
+def test_characters_do_not_depend_on_workers_or_chunks(generator, banks):
+    expected = generator.generate_range(SEED, 0, 50)
+    for workers, chunk_size in ((1, 50), (1, 7), (2, 10), (3, 4)):
+        chunks = list(generate_parallel(50, SEED, workers,
+                                        chunk_size=chunk_size,
+                                        generator_kwargs=banks))
+        assert [len(chunk) for chunk in chunks[:-1]] == \
+            [chunk_size] * (len(chunks) - 1)
+        assert [c for chunk in chunks for c in chunk] == expected
+
+
+@pytest.mark.parametrize("format_", [JSONL, CSV])
+def test_export_is_identical_for_any_number_of_workers(banks, tmp_path,
+                                                       format_):
+    outputs = []
+    for workers, batch_size in ((1, 100), (2, 9), (4, 16)):
+        path = tmp_path / f"{workers}.{format_}"
+        export(60, format_, str(path), seed=SEED, workers=workers,
+               batch_size=batch_size, generator_kwargs=banks)
+        outputs.append(path.read_bytes())
+    assert outputs[0] and outputs[1] == outputs[0] and \
+        outputs[2] == outputs[0]
+
+
+def test_other_seed_gives_other_characters(banks):
+    first, second = (
+        [c for chunk in generate_parallel(20, seed, 1, generator_kwargs=banks)
+         for c in chunk] for seed in (1, 2))
+    assert first != second
@@ -0,0 +1,63 @@
+"""
+Tests of the portrait cache helpers, which do not need Tk window.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from portrait_cache.portrait_cache import (
+    is_outdated, read_image, report_thumbnails_error, thumbnail_file,
+    PILLOW_AVAILABLE, THUMBNAILS_DIRECTORY
+)
+
+
+def fail(directory: str):
+    raise OSError(f"{directory} is read-only")
+
+
+def test_error_of_thumbnails_task_is_printed(capsys):
+    with ThreadPoolExecutor(1) as executor:
+        executor.submit(fail, "portraits").add_done_callback(
+            report_thumbnails_error)
+        executor.submit(len, "portraits").add_done_callback(
+            report_thumbnails_error)
+    error = capsys.readouterr().err
+    assert "portraits is read-only" in error
+    assert error.count("Could not generate thumbnails") == 1
+
+
+def test_thumbnail_is_outdated_until_written_after_image(tmp_path):
+    image = tmp_path / "hero.gif"
+    image.write_bytes(b"GIF89a")
+    thumbnail = thumbnail_file(str(image))
+    assert thumbnail == os.path.join(tmp_path, THUMBNAILS_DIRECTORY,
+                                     "hero.png")
+    assert is_outdated(thumbnail, str(image))
+    os.makedirs(os.path.dirname(thumbnail))
+    with open(thumbnail, "wb") as file:
+        file.write(b"PNG")
+    mtime = image.stat().st_mtime_ns + 10 ** 9
+    os.utime(thumbnail, ns=(mtime, mtime))
+    assert not is_outdated(thumbnail, str(image))
+
+
+@pytest.mark.skipif(PILLOW_AVAILABLE, reason="worker decodes images")
+def test_image_is_read_from_up_to_date_thumbnail(tmp_path):
+    image = tmp_path / "hero.gif"
+    image.write_bytes(b"image")
+    thumbnail = thumbnail_file(str(image))
+    os.makedirs(os.path.dirname(thumbnail))
+    with open(thumbnail, "wb") as file:
+        file.write(b"thumbnail")
+    mtime = image.stat().st_mtime_ns + 10 ** 9
+    os.utime(thumbnail, ns=(mtime, mtime))
+    assert read_image(str(image)) == b"thumbnail"
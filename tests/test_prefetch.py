@@ -0,0 +1,68 @@
+"""
+Tests of the background prefetching of the characters.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import time
+
+import pytest
+
+from generator.categories import *
+from generator.character import Character
+from generator.prefetch import CharacterPrefetcher, locks_state
+
+TIMEOUT = 5.0  # seconds
+
+
+@pytest.fixture
+def prefetcher(generator):
+    prefetcher = CharacterPrefetcher(generator, size=4)
+    yield prefetcher
+    prefetcher.stop()
+    prefetcher.thread.join(TIMEOUT)
+
+
+def wait_until_full(prefetcher):
+    deadline = time.monotonic() + TIMEOUT
+    while not prefetcher.queue.full():
+        assert time.monotonic() < deadline, "producer did not fill queue"
+        time.sleep(0.01)
+
+
+def test_locks_state_ignores_unlocked_values():
+    first = Character(ethnicity=WHITE, sex=MALE, age=OLD)
+    second = Character(ethnicity=WHITE, sex=FEMALE, age=YOUNG)
+    assert locks_state({ETHNICITY}, first) == locks_state([ETHNICITY],
+                                                          second)
+    assert locks_state({SEX}, first) != locks_state({SEX}, second)
+
+
+def test_queued_characters_are_dropped_when_locks_change(prefetcher):
+    males = Character(sex=MALE, ethnicity=WHITE)
+    prefetcher.set_locks({SEX}, males)
+    wait_until_full(prefetcher)
+    queued = [character for _, character in list(prefetcher.queue.queue)]
+    assert prefetcher.take({SEX}, males) in queued
+
+    females = Character(sex=FEMALE, ethnicity=BLACK)
+    for _ in range(3):
+        # each time queue is full of characters, maybe including one put
+        # by the producer blocked before the change:
+        for _ in range(prefetcher.queue.maxsize + 1):
+            character = prefetcher.take({SEX, ETHNICITY}, females)
+            assert (character.sex, character.ethnicity) == (FEMALE, BLACK)
+        wait_until_full(prefetcher)
+
+
+def test_stopped_prefetcher_still_generates(prefetcher):
+    prefetcher.stop()
+    prefetcher.thread.join(TIMEOUT)
+    assert not prefetcher.thread.is_alive()
+    character = prefetcher.take({AGE}, Character(age=OLD))
+    assert character.age == OLD
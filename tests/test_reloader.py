@@ -0,0 +1,114 @@
+"""
+Tests of the hot reload of the config and language files.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+
+import pytest
+
+from generator.distributions import DISTRIBUTIONS_FILE
+from generator.reloader import ConfigReloader, FileWatcher
+from translator.translator import get_catalog
+
+
+class ReloadedGenerator:
+    """Generator recording which files it was reloaded from."""
+
+    def __init__(self, files=(), error: Exception = None):
+        self.files = list(files)
+        self.error = error
+
+    def reloaded(self, file_names):
+        if self.error is not None:
+            raise self.error
+        return ReloadedGenerator(self.files + list(file_names))
+
+
+def touch(path, content: str):
+    """Write the file, making its mtime differ from the previous one."""
+    mtime = os.stat(path).st_mtime_ns + 10 ** 9 if os.path.exists(path) \
+        else None
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def directories(tmp_path):
+    configs, languages = tmp_path / "configs", tmp_path / "languages"
+    configs.mkdir()
+    languages.mkdir()
+    touch(configs / "names.txt", "NAMES:\n")
+    touch(languages / "english.txt", "english:\nQUIT = Quit\n")
+    return str(configs), str(languages) + "/"
+
+
+def test_watcher_finds_created_modified_and_deleted_files(tmp_path):
+    touch(tmp_path / "kept.txt", "a")
+    touch(tmp_path / "modified.txt", "a")
+    touch(tmp_path / "deleted.txt", "a")
+    touch(tmp_path / "ignored.json", "a")
+    watcher = FileWatcher([str(tmp_path), str(tmp_path / "missing")])
+    assert watcher.changes() == []
+    touch(tmp_path / "modified.txt", "b")
+    touch(tmp_path / "created.txt", "a")
+    touch(tmp_path / "ignored.json", "b")
+    os.remove(tmp_path / "deleted.txt")
+    assert [os.path.basename(path) for path in watcher.changes()] == [
+        "created.txt", "deleted.txt", "modified.txt"]
+    assert watcher.changes() == []
+
+
+def test_changed_config_files_replace_generator(directories):
+    configs, _ = directories
+    reloader = ConfigReloader(ReloadedGenerator(), configs)
+    replaced = []
+    reloader.add_listener(replaced.append)
+    assert reloader.poll() == []
+    touch(os.path.join(configs, "names.txt"), "NAMES:\nJohn\n")
+    assert reloader.poll() == ["names.txt"]
+    assert reloader.generator.files == ["names.txt"]
+    assert replaced == [reloader.generator]
+
+
+def test_generator_is_kept_if_files_could_not_be_loaded(directories):
+    configs, _ = directories
+    generator = ReloadedGenerator(error=ValueError("broken file"))
+    errors = []
+    reloader = ConfigReloader(generator, configs,
+                              on_error=lambda *error: errors.append(error))
+    touch(os.path.join(configs, "names.txt"), "broken")
+    assert reloader.poll() == []
+    assert reloader.generator is generator
+    assert errors == [(["names.txt"], generator.error)]
+
+
+def test_changed_language_file_is_reloaded(directories):
+    configs, languages = directories
+    catalog = get_catalog(languages)
+    assert catalog.translate("QUIT", language="english") == "Quit"
+    reloader = ConfigReloader(ReloadedGenerator(), configs, languages)
+    touch(os.path.join(languages, "english.txt"), "english:\nQUIT = Exit\n")
+    assert reloader.poll() == ["english.txt"]
+    assert catalog.translate("QUIT", language="english") == "Exit"
+    assert reloader.generator.files == []
+
+
+def test_reloaded_generator_rebuilds_only_derived_attributes(generator):
+    distributions, loot = generator.distributions, generator.loot
+    reloaded = generator.reloaded([DISTRIBUTIONS_FILE, "unknown.txt"])
+    assert reloaded is not generator
+    assert generator.distributions is distributions
+    assert reloaded.distributions is not distributions
+    assert reloaded.loot is loot
+    assert reloaded.names is generator.names
+    # banks given to the generator are never reloaded from files:
+    assert generator.reloaded(["names.txt"]).names is generator.names
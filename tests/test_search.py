@@ -0,0 +1,74 @@
+"""
+Tests of the incremental search of the words of the banks.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import random
+
+import pytest
+
+from generator.categories import *
+from generator.search import SearchIndex, normalize
+
+WORDS = ["Engineer", "engine driver", "Zoë", "Mechanical engineer", "Nurse",
+         "Zookeeper", "Software Engineer", "Mechanic", "zoologist"]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(WORDS)
+
+
+def found(index, query: str, limit: int = None):
+    return [WORDS[i] for i in index.search(query, limit)]
+
+
+def test_normalize_folds_case_and_accents():
+    assert normalize("Zoë") == normalize("ZOE") == "zoe"
+    assert normalize("Straße") == "strasse"
+
+
+def test_prefix_matches_come_first(index):
+    assert found(index, "eng") == ["engine driver", "Engineer",
+                                   "Mechanical engineer", "Software Engineer"]
+    assert found(index, "ENGINEER") == ["Engineer", "Mechanical engineer",
+                                        "Software Engineer"]
+
+
+def test_short_query_matches_only_prefixes(index):
+    assert found(index, "zo") == ["Zoë", "Zookeeper", "zoologist"]
+    assert found(index, "e") == ["engine driver", "Engineer"]
+    assert found(index, "") == sorted(WORDS, key=normalize)
+
+
+def test_limit_and_missing_words(index):
+    assert found(index, "eng", limit=2) == ["engine driver", "Engineer"]
+    assert found(index, "astronaut") == []
+    assert SearchIndex([]).search("eng") == []
+
+
+def test_search_agrees_with_scanning_all_words():
+    rng = random.Random(3)
+    words = ["".join(rng.choice("abcde") for _ in range(rng.randint(1, 8)))
+             for _ in range(500)]
+    index = SearchIndex(words)
+    for query in ("a", "ab", "abc", "cab", "dead", "eeee"):
+        expected = {i for i, word in enumerate(words) if word.startswith(
+            query) or (len(query) >= 3 and query in word)}
+        results = index.search(query)
+        assert len(results) == len(set(results))
+        assert set(results) == expected
+
+
+def test_generator_finds_banks(generator):
+    assert generator.find_professions("SOLD") == ["soldier"]
+    assert generator.find_professions("ice", limit=1) == ["policeman"]
+    assert generator.find_names("whitemale1", WHITE, MALE) == ["WhiteMale1"]
+    assert generator.find_names("whitemale1", sex=FEMALE) == []
+    assert generator.find_surnames("Surname3", LATINO) == ["LatinoSurname3"]
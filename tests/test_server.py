@@ -0,0 +1,170 @@
+"""
+Tests of the HTTP server generating characters on demand.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import json
+import shutil
+import asyncio
+
+import pytest
+
+from generator.categories import ETHNICITY, SEX
+from generator.character import Character
+from generator.export import LANGUAGES_PATH
+from generator.server import (
+    CharacterServer, RequestError, negotiate_language, parse_character_query,
+    STREAM_CHUNK
+)
+
+LANGUAGES = ["english", "polish"]
+
+
+@pytest.fixture
+def server(generator, tmp_path):
+    # catalogs are compiled into cache of the copied language files:
+    languages = str(tmp_path / "languages") + "/"
+    shutil.copytree(LANGUAGES_PATH, languages,
+                    ignore=shutil.ignore_patterns("cache"))
+    return CharacterServer(generator, languages)
+
+
+async def request(server, target: str, **headers):
+    """Send GET request to the server, return status, headers and body."""
+    listening = await asyncio.start_server(server.handle_connection,
+                                           "127.0.0.1", 0)
+    port = listening.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"GET {target} HTTP/1.1", "Host: localhost", "Connection: close"]
+    lines.extend(f"{name.replace('_', '-')}: {value}"
+                 for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    response = await reader.read()
+    writer.close()
+    listening.close()
+    await listening.wait_closed()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {name.lower(): value.strip() for name, _, value in
+                        (line.partition(":") for line in header_lines)}
+    if response_headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while body:
+            size, _, body = body.partition(b"\r\n")
+            chunks.append(body[:int(size, 16)])
+            body = body[int(size, 16) + 2:]
+        body = b"".join(chunks)
+    return int(status_line.split()[1]), response_headers, body
+
+
+def get(server, target: str, **headers):
+    return asyncio.run(request(server, target, **headers))
+
+
+@pytest.mark.parametrize("accept_language, language", [
+    ("pl-PL,pl;q=0.9,en;q=0.8", "polish"),
+    ("de, en;q=0.5", "english"),
+    ("pl;q=0, en;q=0.1", "english"),
+    ("de", None),
+    ("", None),
+])
+def test_negotiate_language(accept_language, language):
+    assert negotiate_language(accept_language, LANGUAGES) == language
+
+
+def test_parse_character_query():
+    count, locks, base = parse_character_query("ethnicity=LATINO&count=5")
+    assert (count, locks, base.ethnicity) == (5, {ETHNICITY}, "LATINO")
+
+
+@pytest.mark.parametrize("query", ["count=0", "count=many", "count=1000001",
+                                   "ethnicity=MARTIAN", "nickname=Bob"])
+def test_invalid_query(query):
+    with pytest.raises(RequestError) as error:
+        parse_character_query(query)
+    assert error.value.status == 400
+
+
+def test_characters_are_served(server):
+    status, headers, body = get(server, "/character?count=3&sex=FEMALE")
+    characters = json.loads(body)
+    assert status == 200
+    assert "content-language" not in headers
+    assert [c["sex"] for c in characters] == ["FEMALE"] * 3
+
+
+def test_characters_are_translated(server):
+    status, headers, body = get(server, "/character?ethnicity=WHITE",
+                                accept_language="pl-PL,pl;q=0.9")
+    assert status == 200
+    assert headers["content-language"] == "pl"
+    assert json.loads(body)[0]["ethnicity"] == "Biały"
+
+
+@pytest.mark.parametrize("target, status", [
+    ("/characters", 404), ("/character?count=0", 400),
+    ("/character?age=ANCIENT", 400)])
+def test_errors(server, target, status):
+    assert get(server, target)[0] == status
+    assert "error" in json.loads(get(server, target)[2])
+
+
+def test_big_response_is_streamed(server):
+    status, headers, body = get(server, f"/character?count="
+                                        f"{2 * STREAM_CHUNK + 1}")
+    assert status == 200
+    assert headers["transfer-encoding"] == "chunked"
+    assert len(json.loads(body)) == 2 * STREAM_CHUNK + 1
+
+
+def test_failed_generation_is_reported(server, monkeypatch):
+    def fail(*args):
+        raise ValueError("broken bank")
+
+    monkeypatch.setattr(server.generator, "generate", fail)
+    status, _, body = get(server, "/character?count=2")
+    assert status == 500
+    assert json.loads(body) == {"error": "Could not generate characters"}
+
+
+def test_failed_stream_is_cut_off(server, monkeypatch):
+    generate = server.generate
+
+    async def fail_later(count, *args):
+        if fail_later.calls:
+            raise ValueError("broken bank")
+        fail_later.calls += 1
+        return await generate(count, *args)
+
+    fail_later.calls = 0
+    monkeypatch.setattr(server, "generate", fail_later)
+    status, _, body = get(server, f"/character?count={2 * STREAM_CHUNK}")
+    assert status == 200
+    assert body.startswith(b"[") and not body.endswith(b"]")
+
+
+def test_concurrent_requests_are_drawn_in_one_batch(server, monkeypatch):
+    counts = []
+    generate = server.generate
+
+    async def counted(count, *args):
+        counts.append(count)
+        return await generate(count, *args)
+
+    monkeypatch.setattr(server, "generate", counted)
+
+    async def draw_together():
+        base = Character(sex="MALE")
+        return await asyncio.gather(
+            *(server.draw(count, frozenset([SEX]), base)
+              for count in (1, 2, 3)))
+
+    batches = asyncio.run(draw_together())
+    assert [len(batch) for batch in batches] == [1, 2, 3]
+    assert counts == [6]
@@ -0,0 +1,56 @@
+"""
+Tests of reading and writing of the character-sheets.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import pytest
+
+from generator.character import Character
+from generator.sheets import SheetError, parse_sheet, write_sheet
+
+CHARACTER = Character("John", "Smith", "WHITE", "MALE", "ADULT", 34,
+                      "TALL", 189, "AVERAGE", 82, "nurse", "cap, jeans",
+                      "keys ×2, wallet", "Glock 17\n\nAK-47")
+
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return parse_sheet(file, str(path))
+
+
+def test_sheet_round_trip(tmp_path):
+    path = tmp_path / "John Smith.txt"
+    descriptions = {"short_desc": "Night shift nurse",
+                    "description": "Quiet.\n\nKeeps a gun in the locker."}
+    write_sheet(path, CHARACTER, **descriptions)
+    assert read(path) == (CHARACTER, descriptions)
+
+
+def test_blank_lines_after_values_are_stripped():
+    lines = ["name = John\n", "surname = Smith\n", "weapons = Glock 17\n",
+             "\n", "description = Quiet.\n", "\n", "\n"]
+    character, descriptions = parse_sheet(lines)
+    assert character.weapons == "Glock 17"
+    assert descriptions == {"description": "Quiet."}
+
+
+def test_old_sheet_keeps_full_name_in_name_field():
+    character, _ = parse_sheet(["name = John Smith\n", "years = 34\n"])
+    assert (character.name, character.surname) == ("John", "Smith")
+    assert character.years == 34
+
+
+@pytest.mark.parametrize("lines, message", [
+    ([], "no fields found"),
+    (["John Smith\n"], "line without a key"),
+    (["name = John\n", "years = old\n"], "years is not a number"),
+])
+def test_invalid_sheet(lines, message):
+    with pytest.raises(SheetError, match=message):
+        parse_sheet(lines)
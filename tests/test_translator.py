@@ -0,0 +1,118 @@
+"""
+Tests of the translator compiling language files to catalogs.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import os
+import shutil
+
+import pytest
+
+from generator.character import CHARACTER_FIELDS
+from generator.export import LANGUAGES_PATH, translated_rows
+from translator.translator import Catalog, PLACEHOLDER, translate_column
+
+
+def write_language(path, language: str, **translations):
+    lines = [f"{language}:"] + [f"{k} = {v}" for k, v in translations.items()]
+    path.joinpath(language + ".txt").write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def languages(tmp_path):
+    write_language(tmp_path, "english", MENU="Menu", QUIT="Quit")
+    write_language(tmp_path, "polish", MENU="Menu", QUIT="Wyjdź")
+    return tmp_path
+
+
+def test_switching_language_at_runtime(languages):
+    catalog = Catalog(str(languages) + "/")
+    catalog.set_language("english")
+    assert catalog.translate("QUIT") == "Quit"
+    catalog.set_language("polish")
+    assert catalog.translate("QUIT") == "Wyjdź"
+    assert catalog.translate("QUIT", language="english") == "Quit"
+    assert catalog.translate("MISSING") == PLACEHOLDER
+
+
+def test_unknown_language_is_rejected(languages):
+    with pytest.raises(KeyError):
+        Catalog(str(languages) + "/").set_language("german")
+
+
+def test_catalog_is_reused_until_language_file_changes(languages):
+    catalog = Catalog(str(languages) + "/")
+    catalog.dictionary("english")
+    catalog_file = catalog.catalog_file("english")
+    compiled = os.stat(catalog_file).st_mtime_ns
+    assert Catalog(str(languages) + "/").load("english") is not None
+    Catalog(str(languages) + "/").dictionary("english")
+    assert os.stat(catalog_file).st_mtime_ns == compiled
+
+
+def test_language_file_restored_with_older_mtime_is_compiled(languages):
+    Catalog(str(languages) + "/").dictionary("english")
+    source = languages / "english.txt"
+    old_mtime = source.stat().st_mtime_ns - 10 ** 9
+    write_language(languages, "english", QUIT="Exit")
+    os.utime(source, ns=(old_mtime, old_mtime))
+    catalog = Catalog(str(languages) + "/")
+    assert catalog.load("english") is None
+    assert catalog.translate("QUIT", language="english") == "Exit"
+
+
+@pytest.mark.parametrize("content", [b"", b"\x00garbage", b"\xe9"])
+def test_corrupt_catalog_is_compiled_again(languages, content):
+    catalog = Catalog(str(languages) + "/")
+    catalog.dictionary("english")
+    with open(catalog.catalog_file("english"), "wb") as file:
+        file.write(content)
+    catalog = Catalog(str(languages) + "/")
+    assert catalog.translate("QUIT", language="english") == "Quit"
+    assert catalog.load("english") is not None
+
+
+def test_reload_replaces_used_translations(languages):
+    catalog = Catalog(str(languages) + "/")
+    catalog.set_language("english")
+    assert catalog.translate("QUIT") == "Quit"
+    write_language(languages, "english", QUIT="Exit")
+    catalog.reload("english")
+    assert catalog.translate("QUIT") == "Exit"
+
+
+def test_translate_column(languages):
+    catalog = Catalog(str(languages) + "/")
+    vocabulary = ["QUIT", "MENU", "nurse"]
+    codes = [2, 0, 0, 1]
+    assert translate_column(codes, vocabulary, "polish",
+                            catalog=catalog) == [PLACEHOLDER, "Wyjdź",
+                                                 "Wyjdź", "Menu"]
+    assert translate_column(codes, vocabulary, "polish", True,
+                            catalog) == ["nurse", "Wyjdź", "Wyjdź", "Menu"]
+    assert translate_column([], vocabulary, "english", catalog=catalog) == []
+
+
+def test_translated_rows(generator, tmp_path):
+    languages = str(tmp_path / "languages") + "/"
+    shutil.copytree(LANGUAGES_PATH, languages,
+                    ignore=shutil.ignore_patterns("cache"))
+    characters = generator.generate(30)
+    rows = translated_rows(characters, "polish", languages)
+    catalog = Catalog(languages)
+    for character, row in zip(characters, rows):
+        values = dict(zip(CHARACTER_FIELDS, row))
+        assert values["sex"] == catalog.translate(character.sex,
+                                                  language="polish")
+        assert values["sex"] in ("Mężczyzna", "Kobieta")
+        # professions without translation are kept:
+        assert values["profession"] == catalog.dictionary("polish").get(
+            character.profession, character.profession)
+        assert values["name"] == character.name
+        assert values["years"] == character.years
@@ -0,0 +1,66 @@
+"""
+Tests of the allocation of unique full names.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+import pytest
+
+from generator.name_pool import NamePool
+from generator.unique_names import (
+    UniqueNameAllocator, FeistelPermutation, NamesExhaustedError
+)
+
+# WHITE and BLACK banks are the same, and "An" is male and female name:
+NAMES = {"WHITE": {"MALE": ["John", "Adam"], "FEMALE": ["Anna", "Eve"]},
+         "BLACK": {"MALE": ["John", "Adam"], "FEMALE": ["Anna", "Eve"]},
+         "CHINESE": {"MALE": ["An", "Bai", "Wei"],
+                     "FEMALE": ["An", "Bai", "Mei"]}}
+SURNAMES = {"WHITE": ["Smith", "Brown"], "BLACK": ["Smith", "Brown"],
+            "CHINESE": ["Li", "Wang"]}
+POOLS = [(ethnicity, sex) for ethnicity in NAMES for sex in NAMES[ethnicity]]
+
+
+@pytest.fixture
+def allocator():
+    return UniqueNameAllocator(NamePool.from_banks(NAMES),
+                               NamePool.from_banks(SURNAMES), seed=1)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 10, 255, 1000])
+def test_feistel_permutation_is_bijection(size):
+    permutation = FeistelPermutation(size, key=12345)
+    assert sorted(permutation[i] for i in range(size)) == list(range(size))
+
+
+def test_full_names_are_unique_across_pools(allocator):
+    allocated = []
+    for ethnicity, sex in POOLS:
+        while allocator.remaining(ethnicity, sex):
+            allocated.append(allocator.allocate(ethnicity, sex))
+    assert len(allocated) == len(set(allocated))
+    # every distinct full name of the banks is allocated once:
+    assert set(allocated) == {(name, surname) for ethnicity, sex in POOLS
+                              for name in NAMES[ethnicity][sex]
+                              for surname in SURNAMES[ethnicity]}
+
+
+def test_allocation_is_exhausted(allocator):
+    for _ in range(allocator.remaining("CHINESE", "FEMALE")):
+        allocator.allocate("CHINESE", "FEMALE")
+    with pytest.raises(NamesExhaustedError):
+        allocator.allocate("CHINESE", "FEMALE")
+
+
+def test_same_seed_allocates_same_names():
+    def allocate(seed):
+        allocator = UniqueNameAllocator(NamePool.from_banks(NAMES),
+                                        NamePool.from_banks(SURNAMES), seed)
+        return [allocator.allocate("WHITE", "MALE") for _ in range(4)]
+
+    assert allocate(7) == allocate(7)
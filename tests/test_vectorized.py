@@ -0,0 +1,68 @@
+"""
+Tests of the bulk sampler of the body traits, on both of its paths.
+"""
+__author__ = "akapkotel"
+__copyright__ = "Copyright 2019"
+__credits__ = []
+__license__ = "Share Alike Attribution-NonCommercial-ShareAlike 4.0"
+__version__ = "0.0.1"
+__maintainer__ = "akapkotel"
+__email__ = "btcuserbtc@gmail.com"
+
+from statistics import mean
+
+import pytest
+
+from generator.categories import *
+from generator.distributions import compile_distributions
+from generator.vectorized import (
+    NUMPY_AVAILABLE, TRAITS, sample_traits, _sample_traits_numpy,
+    _sample_traits_python
+)
+
+SAMPLERS = [_sample_traits_python]
+if NUMPY_AVAILABLE:
+    SAMPLERS.append(_sample_traits_numpy)
+
+
+@pytest.fixture(params=SAMPLERS, ids=lambda sampler: sampler.__name__)
+def sampler(request):
+    return request.param
+
+
+def test_same_seed_gives_same_traits():
+    first, second = sample_traits(100, 7), sample_traits(100, 7)
+    assert all(list(first[t]) == list(second[t]) for t in TRAITS)
+    assert list(sample_traits(100, 8)["years"]) != list(first["years"])
+
+
+def test_traits_follow_their_categories(sampler):
+    distributions = compile_distributions(DEFAULT_WEIGHTS)
+    traits = {t: list(map(int, values)) for t, values in
+              sampler(20000, 3, distributions).items()}
+    assert all(len(values) == 20000 for values in traits.values())
+    assert set(traits["age"]) == {0, 1, 2}
+    # HEIGHT weights are 2:4:1, so AVERAGE is drawn most often:
+    assert traits["height"].count(1) / 20000 == pytest.approx(4 / 7, 0.05)
+    for codes, values, categories in (("age", "years", AGES),
+                                      ("height", "centimeters", HEIGHTS)):
+        for code, category in enumerate(categories):
+            drawn = [v for c, v in zip(traits[codes], traits[values])
+                     if c == code]
+            assert mean(drawn) == pytest.approx(
+                GAUSSIAN_PARAMS[category][0], abs=1.0)
+
+
+def test_weight_depends_on_height(sampler):
+    distributions = compile_distributions(DEFAULT_WEIGHTS)
+    traits = sampler(5000, 4, distributions)
+    for w, cm, kg in zip(traits["weight"], traits["centimeters"],
+                         traits["kilograms"]):
+        assert abs(kg - cm - GAUSSIAN_PARAMS[WEIGHTS[w]][0]) < 6 * 5
+
+
+def test_categories_with_zero_weight_are_never_drawn(sampler):
+    weights = {c: dict(w) for c, w in DEFAULT_WEIGHTS.items()}
+    weights[AGE] = {YOUNG: 0, ADULT: 0, OLD: 1}
+    traits = sampler(1000, 5, compile_distributions(weights))
+    assert set(map(int, traits["age"])) == {AGES.index(OLD)}
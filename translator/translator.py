@@ -2,7 +2,9 @@
 This modle translates input text from one language to other by simply
 replacing original words with corresponding words of desired language.
 
-It needs txt or xml files with all the words to read them and replace.
+It needs txt or xml files with all the words to read them and replace. All
+the language files are compiled once into binary catalogs, which are loaded
+only when the language is used, so language could be switched at runtime.
 """
 __author__ = "akapkotel"
 __copyright__ = "Copyright 2019"
@@ -14,11 +16,185 @@ __email__ = "rafal.trabski@mises.pl"
 __status__ = "Development"
 
 import os
+import marshal
 from config_loader.config_loader import load_config_from_file
 
 PLACEHOLDER = "<not translated>"
-DICT = None
-INPUTS = None
+LANGUAGE_EXTENSION = ".txt"
+CATALOG_EXTENSION = ".cat"
+CATALOG_VERSION = 2
+CATALOG = None  # catalog of the translator set-up by setup_translator
+CATALOGS = {}  # {files_path: Catalog}
+
+
+class Catalog:
+    """
+    Translations of all the languages found in the languages directory, with
+    one of them active.
+    """
+
+    def __init__(self, files_path: str, cache_path: str = None):
+        """
+        Find all the language files. Each one is compiled when its language
+        is used first time, if its catalog is missing, corrupt or was
+        compiled from other version of the file.
+
+        :param files_path: str -- absolute path to the language files
+        :param cache_path: str -- directory of compiled catalogs, "cache"
+         subdirectory of files_path by default
+        """
+        self.files_path = files_path
+        self.cache_path = cache_path if cache_path is not None else \
+            os.path.join(files_path, "cache", "")
+        self.languages = self.find_languages()
+        self.dictionaries = {}
+        self.translations = {}  # {language: {args: translation}}
+        self.language = None
+
+    def find_languages(self):
+        """Return names of all the language files, without extension."""
+        return available_languages(self.files_path)
+
+    def source_file(self, language: str):
+        return self.files_path + language + LANGUAGE_EXTENSION
+
+    def catalog_file(self, language: str):
+        return self.cache_path + language + CATALOG_EXTENSION
+
+    def load(self, language: str):
+        """
+        Read translations of the language from its compiled catalog.
+
+        :param language: str -- name of the language file without extension
+        :return: dict -- or None if catalog is missing, corrupt or language
+         file was modified after compilation
+        """
+        try:
+            with open(self.catalog_file(language), "rb") as file:
+                version, source_mtime, dictionary = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        # equal, not older, so language file restored from backup is
+        # compiled again too:
+        if version != CATALOG_VERSION or source_mtime != os.stat(
+                self.source_file(language)).st_mtime_ns:
+            return None
+        return dictionary
+
+    def compile(self, language: str):
+        """
+        Parse language file and write its dict to the binary catalog.
+
+        :param language: str -- name of the language file without extension
+        :return: dict -- translations of the language
+        """
+        # mtime is read before parsing, so file modified in the meantime is
+        # compiled again next time:
+        source_mtime = os.stat(self.source_file(language)).st_mtime_ns
+        [dictionary] = load_config_from_file(
+            self.files_path, language + LANGUAGE_EXTENSION)
+        os.makedirs(self.cache_path, exist_ok=True)
+        temporary_file = f"{self.catalog_file(language)}.{os.getpid()}.tmp"
+        with open(temporary_file, "wb") as file:
+            marshal.dump((CATALOG_VERSION, source_mtime, dictionary), file)
+        os.replace(temporary_file, self.catalog_file(language))
+        return dictionary
+
+    def dictionary(self, language: str):
+        """
+        Return translations of the language, loading them from its compiled
+        catalog if language was not used before.
+
+        :param language: str -- name of the language
+        :return: dict
+        """
+        if language not in self.dictionaries:
+            if language not in self.languages:
+                raise KeyError(f"Language {language} is not available")
+            dictionary = self.load(language)
+            if dictionary is None:
+                dictionary = self.compile(language)
+            self.dictionaries[language] = dictionary
+            self.translations[language] = {}
+        return self.dictionaries[language]
+
+    def reload(self, language: str):
+        """
+        Compile the language file again after it was changed, created or
+        deleted, and replace its translations if the language was used.
+
+        :param language: str -- name of the language file without extension
+        """
+        self.languages = self.find_languages()
+        if language not in self.languages:
+            return  # deleted, translations already loaded are kept
+        dictionary = self.compile(language)
+        if language in self.dictionaries:
+            # dictionary is replaced first, so translations memoized after
+            # the swap are never made from the old one:
+            self.dictionaries[language] = dictionary
+            self.translations[language] = {}
+
+    def set_language(self, language: str):
+        """
+        Make the language active, without reloading already used languages.
+
+        :param language: str -- name of the language, e.g. "polish"
+        """
+        self.dictionary(language)
+        self.language = language
+
+    def translate(self, *args, language: str = None):
+        """
+        Translate and join the words, results are memoized for each language.
+
+        :param args: str -- words to be translated
+        :param language: str -- language of the translation, active if None
+        :return: str
+        """
+        language = language or self.language
+        translations = self.translations.get(language)
+        if translations is None:
+            self.dictionary(language)
+            translations = self.translations[language]
+        if args not in translations:
+            dictionary = self.dictionaries[language]
+            translations[args] = "".join(
+                [dictionary.get(word, PLACEHOLDER) for word in args])
+        return translations[args]
+
+    def lookup_table(self, vocabulary, language: str = None,
+                     keep_untranslated: bool = False):
+        """
+        Translate each word of the vocabulary, so translation of the word
+        could be found by its index (code) in the vocabulary.
+
+        :param vocabulary: sequence -- of str
+        :param language: str -- language of the translation, active if None
+        :param keep_untranslated: bool -- keep words without translation
+         unchanged, instead of replacing them with PLACEHOLDER
+        :return: list -- of str
+        """
+        if keep_untranslated:
+            dictionary = self.dictionary(language or self.language)
+            return [dictionary.get(word, word) for word in vocabulary]
+        return [self.translate(word, language=language) for word in vocabulary]
+
+
+def language_of(file_name: str):
+    """Return name of the language of the language file."""
+    return os.path.splitext(file_name)[0]
+
+
+def available_languages(files_path: str):
+    """
+    Return names of all the language files in the directory.
+
+    :param files_path: str -- absolute path to the language files
+    :return: list -- of str, sorted names without extension
+    """
+    return sorted(f[:-len(LANGUAGE_EXTENSION)] for f in os.listdir(files_path)
+                  if f.endswith(LANGUAGE_EXTENSION))
 
 
 def setup_translator(files_path: str, file_name: str):
@@ -30,50 +206,81 @@ def setup_translator(files_path: str, file_name: str):
     :param files_path: str -- absolute path to the language files
     :param file_name: str -- name of the language file
     """
+    global CATALOG
     if check_if_language_file_exists(files_path + file_name):
-        prepare_translation_dict(files_path, file_name)
+        CATALOG = get_catalog(files_path)
+        CATALOG.set_language(language_of(file_name))
 
 
-def prepare_translation_dict(files_path: str, file_name: str):
+def get_catalog(files_path: str):
     """
-    Read language file line-by-line and fill the language translation dict
-    with the keys (inputs to be translated) and values (target language).
+    Return Catalog of the language files, creating it when they are used
+    first time, e.g. in worker process. It becomes the catalog of the
+    translator, if translator was not set-up yet.
 
     :param files_path: str -- absolute path to the language files
-    :param file_name: str -- name of the language file
-    :return: dict -- hashtable made from those strings
+    :return: Catalog
     """
-    global DICT, INPUTS
-    [DICT] = load_config_from_file(files_path, file_name)
-    INPUTS = DICT.keys()
+    global CATALOG
+    catalog = CATALOGS.get(files_path)
+    if catalog is None:
+        catalog = CATALOGS[files_path] = Catalog(files_path)
+    if CATALOG is None:
+        CATALOG = catalog
+    return catalog
+
+
+def set_language(language: str):
+    """
+    Switch active language at runtime, setup_translator must be called first.
+
+    :param language: str -- name of the language, e.g. "english"
+    """
+    CATALOG.set_language(language)
 
 
 def check_if_language_file_exists(file_name: str):
     """
-    TODO:
+    Check if the language file exists.
+
     :param file_name: str -- desired language file name
     :return: bool
     """
-    try:
-        os.path.isfile(file_name)
+    if os.path.isfile(file_name):
         return True
-    except FileNotFoundError:
-        print(f"File: {file_name} does not exist!")
-        return False
+    print(f"File: {file_name} does not exist!")
+    return False
 
 
-def translate(*args):
+def translate(*args, language: str = None):
     """
     Check if input exists in current dict and return it, otherwise, return
     placeholder.
 
     :param: args -- string or strings to be translated, if no translation
     for the input is found <not translated> would be returned
+    :param language: str -- language of the translation, active if None
     :return: str
     """
-    translation = ""
-    for word in args:
-        analogue = DICT[word] if word in INPUTS else PLACEHOLDER
-        translation += analogue
-    return translation
+    return CATALOG.translate(*args, language=language)
+
 
+def translate_column(codes, vocabulary, language: str = None,
+                     keep_untranslated: bool = False, catalog=None):
+    """
+    Translate whole column of category codes at once, through lookup table
+    built once for the vocabulary. Words without translation become
+    PLACEHOLDER, unless keep_untranslated is set, e.g. for free-text columns
+    such as professions.
+
+    :param codes: sequence -- of int, indexes of the words in vocabulary
+    :param vocabulary: sequence -- of str, words to be translated
+    :param language: str -- language of the translation, active if None
+    :param keep_untranslated: bool -- keep words without translation
+     unchanged
+    :param catalog: Catalog -- translations, these of the translator if None
+    :return: list -- of str, translated words
+    """
+    catalog = catalog if catalog is not None else CATALOG
+    lookup = catalog.lookup_table(vocabulary, language, keep_untranslated)
+    return list(map(lookup.__getitem__, codes))